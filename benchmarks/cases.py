@@ -0,0 +1,91 @@
+"""
+Benchmark cases for the generator's hot paths, shared by run_benchmarks.py and test_benchmarks.py.
+
+Every case is a setup function returning the callable to time, along with the number of
+sentences one call of that callable produces (0 if it doesn't produce sentences).
+"""
+
+from typing import Callable, Dict, Tuple
+
+import nabg
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.formatter import SentenceFormatter
+
+Case = Callable[[], Tuple[Callable[[], object], int]]
+
+SAMPLE_PATTERN = "We are in the midst of a ${adj} ${ing} of ${nMass} that will ${vOpenUp} the ${nCosmos} itself."
+SAMPLE_SENTENCE = "we are in the midst of a intergalactic awakening of love that will empower the cosmos itself."
+SAMPLE_TEXT = "Who are we?Where on the great path will we be awakened?" * 50
+
+
+def _generator() -> BullshitGenerator:
+    return BullshitGenerator(patterns, vocabulary, seed=0)
+
+
+def bench_init():
+    return (lambda: BullshitGenerator(patterns, vocabulary)), 0
+
+
+def bench_ionize_1():
+    bullshit_generator = _generator()
+    return (lambda: bullshit_generator.ionize(1)), 1
+
+
+def bench_ionize_10000():
+    bullshit_generator = _generator()
+    return (lambda: bullshit_generator.ionize(10_000)), 10_000
+
+
+def bench_generate_sentence():
+    bullshit_generator = _generator()
+
+    def generate_sentence():
+        try:
+            return bullshit_generator.generate_sentence("explain")
+        except KeyError:
+            bullshit_generator.reset_sentence_patterns()
+
+    return generate_sentence, 1
+
+
+def bench_replace_vocab_patterns():
+    bullshit_generator = _generator()
+    return (lambda: bullshit_generator.replace_vocab_patterns(SAMPLE_PATTERN)), 1
+
+
+def bench_clean_sentence():
+    return (lambda: BullshitGenerator.clean_sentence(SAMPLE_SENTENCE)), 1
+
+
+def bench_format_sentence():
+    bullshit_generator = _generator()
+    template = bullshit_generator.compile_template(SAMPLE_PATTERN)
+    formatter = SentenceFormatter()
+    return (lambda: formatter.render(template, bullshit_generator.rng)), 1
+
+
+def bench_insert_space_between_sentences():
+    return (lambda: BullshitGenerator.insert_space_between_sentences(SAMPLE_TEXT)), 0
+
+
+def bench_reset_sentence_patterns():
+    bullshit_generator = _generator()
+    return bullshit_generator.reset_sentence_patterns, 0
+
+
+def bench_module_ionize():
+    return (lambda: nabg.ionize(1)), 1
+
+
+CASES: Dict[str, Case] = {
+    "BullshitGenerator.__init__": bench_init,
+    "ionize(1)": bench_ionize_1,
+    "ionize(10_000)": bench_ionize_10000,
+    "generate_sentence": bench_generate_sentence,
+    "replace_vocab_patterns": bench_replace_vocab_patterns,
+    "clean_sentence": bench_clean_sentence,
+    "format_sentence": bench_format_sentence,
+    "insert_space_between_sentences": bench_insert_space_between_sentences,
+    "reset_sentence_patterns": bench_reset_sentence_patterns,
+    "nabg.ionize": bench_module_ionize,
+}
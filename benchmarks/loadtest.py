@@ -0,0 +1,112 @@
+"""
+Load test for `nabg serve`.
+
+Hammers a running server with keep-alive connections and reports requests per second and
+latency percentiles. Pass --spawn to start a server in-process on a free local port instead.
+
+    python benchmarks/loadtest.py --spawn --requests 20000 --concurrency 8
+    python benchmarks/loadtest.py --port 8000 --path "/ionize?n=10&topic=warn"
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from typing import List, Optional
+
+
+def run_client(
+    host: str,
+    port: int,
+    method: str,
+    path: str,
+    body: Optional[bytes],
+    count: int,
+    latencies: List[float],
+    errors: List[int],
+):
+    connection = http.client.HTTPConnection(host, port)
+    headers = {"Content-Type": "application/json"} if body else {}
+    for _ in range(count):
+        start = time.perf_counter()
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--path", default="/ionize?n=1")
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help='JSON body to POST to /batch, e.g. \'[{"n": 1}, {"n": 2}]\'',
+    )
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--spawn", action="store_true", help="Start a server in this process."
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        from nabg.server import BullshitServer
+
+        server = BullshitServer((args.host, 0))
+        args.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    method, path, body = "GET", args.path, None
+    if args.batch is not None:
+        method, path, body = "POST", "/batch", json.dumps(json.loads(args.batch))
+        body = body.encode("utf-8")
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    per_client = args.requests // args.concurrency
+    clients = [
+        threading.Thread(
+            target=run_client,
+            args=(
+                args.host,
+                args.port,
+                method,
+                path,
+                body,
+                per_client,
+                latencies,
+                errors,
+            ),
+        )
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    latencies.sort()
+    print(f"requests:    {len(latencies)} ({len(errors)} errors)")
+    print(f"throughput:  {len(latencies) / elapsed:.0f} requests/s")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"latency p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark the generator's hot paths on the default corpus.
+
+Reports the time per call, sentences per second and peak memory allocated per call of every
+case in cases.py, and optionally saves the results as JSON to compare runs across versions.
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import nabg  # noqa: E402
+from cases import CASES  # noqa: E402
+
+
+def measure(name: str, repeat: int, min_time: float) -> Dict[str, Any]:
+    function, sentences_per_call = CASES[name]()
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    seconds_per_call = min(timer.repeat(repeat, number)) / number
+
+    tracemalloc.start()
+    function()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds_per_call": seconds_per_call,
+        "calls_per_second": 1 / seconds_per_call,
+        "sentences_per_second": sentences_per_call / seconds_per_call,
+        "peak_allocated_bytes": peak - before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", "-o", help="Save the results to this JSON file.")
+    parser.add_argument("--compare", "-c", help="Compare with results saved earlier.")
+    parser.add_argument(
+        "--filter", "-k", default="", help="Only run cases containing this text."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Seconds per repetition."
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+
+    results = {}
+    for name in CASES:
+        if args.filter not in name:
+            continue
+        result = measure(name, args.repeat, args.min_time)
+        results[name] = result
+        line = (
+            f"{name:32} {result['seconds_per_call'] * 1e6:12.2f} us/call"
+            f" {result['sentences_per_second']:14.0f} sentences/s"
+            f" {result['peak_allocated_bytes'] / 1024:10.1f} KiB peak"
+        )
+        if name in baseline:
+            ratio = result["seconds_per_call"] / baseline[name]["seconds_per_call"]
+            line += f"  {ratio:6.2f}x time"
+        print(line)
+
+    if args.output:
+        report = {
+            "nabg_version": nabg.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput of generators drawing from a SharedPatternPool, on 1 to N processes.
+
+Every process generates the same number of sentences, either from a pattern pool of its own
+(patterns repeat across processes) or from one pool shared by all processes (no pattern is handed
+out twice in a run). The difference is the cost of the shared lock.
+
+    python benchmarks/shared_pool.py --processes 4 --sentences 50000
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from typing import Any, Optional
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.shared import SharedPatternPool
+
+
+def generate(
+    pool: Optional[SharedPatternPool], count: int, start: Any, done: Any
+) -> None:
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, pool=pool)
+    sentences = bullshit_generator.iter_sentences()
+    start.wait()
+    for _ in range(count):
+        next(sentences)
+    done.put(None)
+
+
+def measure(context: Any, processes: int, count: int, shared: bool) -> float:
+    sizes = {topic: len(sentences) for topic, sentences in patterns.items()}
+    pool = SharedPatternPool(sizes, lock=context.RLock()) if shared else None
+    start, done = context.Event(), context.Queue()
+    workers = [
+        context.Process(target=generate, args=(pool, count, start, done))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # Let every worker build its generator before the clock starts
+    time.sleep(0.5)
+    began = time.perf_counter()
+    start.set()
+    for _ in workers:
+        done.get()
+    elapsed = time.perf_counter() - began
+    for worker in workers:
+        worker.join()
+    if pool is not None:
+        pool.close()
+        pool.unlink()
+    return processes * count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sentences", type=int, default=50_000)
+    parser.add_argument(
+        "--start-method",
+        default=None,
+        help="multiprocessing start method. Defaults to the platform's default.",
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context(args.start_method)
+    print(f"{'processes':>9}  {'private pools':>15}  {'shared pool':>15}")
+    for processes in range(1, args.processes + 1):
+        private = measure(context, processes, args.sentences, shared=False)
+        shared = measure(context, processes, args.sentences, shared=True)
+        print(f"{processes:>9}  {private:>11.0f} s/s  {shared:>11.0f} s/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+pytest-benchmark cases for the generator's hot paths. Run with:
+
+    pytest benchmarks --benchmark-json=results.json
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from cases import CASES  # noqa: E402
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_benchmark(benchmark, name):
+    function, sentences_per_call = CASES[name]()
+    benchmark.extra_info["sentences_per_call"] = sentences_per_call
+    benchmark(function)
@@ -3,4 +3,59 @@
 # Version of the nabg package
 __version__ = "1.0.2"
 
-from .bullshit_generator import *
+import importlib
+
+# Public names and the modules defining them. They are imported on first use, so that
+# `import nabg` doesn't pay for the default corpus, asyncio or multiprocessing up front
+# (nor for typing, which is why this module has no annotations).
+_EXPORTS = {
+    "BullshitGenerator": "bullshit_generator",
+    "agenerate": "bullshit_generator",
+    "aionize": "bullshit_generator",
+    "get_default_generator": "bullshit_generator",
+    "ionize": "bullshit_generator",
+    "ionize_to": "bullshit_generator",
+    "list_topics": "bullshit_generator",
+    "patterns": "bullshit_generator",
+    "use_per_thread_generators": "bullshit_generator",
+    "vocabulary": "bullshit_generator",
+    "generate_parallel": "parallel",
+    "Corpus": "sessions",
+    "Session": "sessions",
+    "SessionCache": "sessions",
+    "SharedPatternPool": "shared",
+}
+
+# Submodules that used to be imported along with the package
+_SUBMODULES = (
+    "bullshit_generator",
+    "corpus",
+    "default_patterns",
+    "default_vocabulary",
+    "errors",
+    "expansions",
+    "formatter",
+    "parallel",
+    "pool",
+    "sampling",
+    "sessions",
+    "stats",
+    "wordlists",
+)
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
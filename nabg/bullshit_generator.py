@@ -13,18 +13,104 @@ Copyright Naveen Unnikrishnan, January 2021.
 Licensed under the MIT License.
 """
 
-import copy
+import contextlib
+import itertools
 import random
 import re
+import sys
+import threading
+import time
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from . import formatter
+from .errors import (
+    Error,
+    InsufficientCapacityError,
+    InvalidStateError,
+    InvalidTopicError,
+    InvalidVocabularyTypeError,
+    NoPatternsAvailableError,
+)
+from .expansions import ExpansionRange, expansion_counts, unrank
+from .formatter import SentenceFormatter
+from .pool import PatternPool
+from .stats import GeneratorStats
+from .wordlists import CompactWordList, WeightedWordList
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .shared import SharedPatternPool
+
+
+__all__ = [
+    "BullshitGenerator",
+    "agenerate",
+    "aionize",
+    "get_default_generator",
+    "ionize",
+    "ionize_to",
+    "list_topics",
+    "patterns",
+    "use_per_thread_generators",
+    "vocabulary",
+]
+
+# A parsed sentence pattern: its literal segments and the vocabulary types between them.
+ParsedPattern = Tuple[List[str], List[str]]
+
+# A compiled sentence pattern: the leading literal, followed by (word list, literal)
+# pairs for every placeholder in the pattern.
+Template = Tuple[str, Tuple[Tuple[Sequence[str], str], ...]]
+
+_PLACEHOLDER = re.compile(r"\$\{([^\}]*)\}")
+_WORD_START = re.compile(r"\w")
+
+
+def parse_pattern(pattern: str) -> ParsedPattern:
+    """
+    Split a sentence pattern into its literal segments and placeholder types.
+
+    Args:
+        pattern (str): Sentence pattern to parse
+
+    Returns:
+        ParsedPattern: Literal segments and vocabulary types. There is always
+            one more literal segment than there are types.
+    """
+    parts = _PLACEHOLDER.split(pattern)
+    return parts[0::2], parts[1::2]
 
-from .default_patterns import sentence_patterns as patterns
-from .default_vocabulary import bullshit_words as vocabulary
-from .errors import InvalidTopicError, NoPatternsAvailableError
 
+def _extend_words(
+    word_list: Optional[Sequence[str]], words: Iterable[str]
+) -> Sequence[str]:
+    # Copy of a word list with words appended, keeping compact lists compact
+    if isinstance(word_list, CompactWordList):
+        extended = CompactWordList(word_list)
+        extended.extend(words)
+        return extended
+    return list(itertools.chain(word_list or (), words))
 
-__all__ = ["BullshitGenerator", "ionize", "list_topics", "patterns", "vocabulary"]
+
+def _finish_sentence(sentence: str) -> str:
+    # Clean a rendered pattern into a sentence, as iter_topic_sentences() does
+    return formatter.insert_space_between_sentences(formatter.clean_sentence(sentence))
 
 
 class BullshitGenerator:
@@ -36,24 +122,168 @@ class BullshitGenerator:
         sentence_pool (Dict[str, List[str]]): The complete corpus of sentence patterns separated into topics.
         sentence_patterns (Dict[str, List[str]]): The remaining sentence patterns yet to be used in a run.
         vocabulary (Dict[str, List[str]]): The vocabulary of terms separated into types.
+        rng (random.Random): The random number generator behind every random choice of the generator.
+        thread_safe (bool): Whether the generator can be shared between threads.
     """
 
     def __init__(
-        self, sentence_patterns: Dict[str, List[str]], vocabulary: Dict[str, List[str]]
+        self,
+        sentence_patterns: Dict[str, List[str]],
+        vocabulary: Dict[str, List[str]],
+        seed: Optional[Any] = None,
+        rng: Optional[random.Random] = None,
+        thread_safe: bool = False,
+        parsed_patterns: Optional[Dict[str, List[ParsedPattern]]] = None,
+        topic_weights: Optional[Dict[str, float]] = None,
+        pattern_weights: Optional[Dict[str, Sequence[float]]] = None,
+        pool: Optional["SharedPatternPool"] = None,
     ):
         """
         Constructor for BullshitGenerator.
 
         Args:
             sentence_patterns (Dict[str, List[str]]): The corpus of sentence patterns separated into topics.
-            vocabulary (Dict[str, List[str]]): The vocabulary of terms separated into types.
+            vocabulary (Dict[str, List[str]]): The vocabulary of terms separated into types. Any sequence
+                of strings can stand in for a list, such as nabg.wordlists.CompactWordList.
+            seed (Any, optional): Seed for the generator's own random number generator. Generators built
+                with the same seed and corpus produce identical output. Ignored if rng is provided.
+            rng (random.Random, optional): Random number generator to use instead of a seeded one.
+            thread_safe (bool, optional): Guard the pattern pool with a lock so that the generator can be
+                shared between threads without handing out a pattern twice. Defaults to False.
+            parsed_patterns (Dict[str, List[ParsedPattern]], optional): The sentence patterns already parsed
+                with parse_pattern(), to skip parsing. Used when loading compiled corpora.
+            topic_weights (Dict[str, float], optional): Weights of topics chosen at random
+                (see set_topic_weights()).
+            pattern_weights (Dict[str, Sequence[float]], optional): Weights of the sentence patterns of
+                some topics (see set_pattern_weights()). Words are weighed with nabg.wordlists.WeightedWordList.
+            pool (SharedPatternPool, optional): Pattern pool shared with generators in other processes,
+                instead of a pool of the generator's own. It must have the topics of the sentence patterns,
+                in the same order and with the same numbers of patterns. The generator then guards its
+                pool with the pool's lock, which also makes it thread-safe.
+
+        Raises:
+            InvalidVocabularyTypeError: If a pattern uses a type that has no words in the vocabulary
+            ValueError: If the shared pool doesn't match the sentence patterns
         """
         self.sentence_pool = sentence_patterns
-        self.sentence_patterns = copy.deepcopy(self.sentence_pool)
         self.vocabulary = vocabulary
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.thread_safe = thread_safe or pool is not None
+        if pool is not None:
+            self._lock = pool.lock
+        elif thread_safe:
+            self._lock = threading.RLock()
+        else:
+            self._lock = contextlib.nullcontext()
+        self._templates: Dict[str, List[Template]] = {}
+        # Topics and types whose lists belong to this generator and can be changed in place.
+        # Everything else may be shared with the caller (e.g. the default corpus) and is copied first.
+        self._owns_corpus = False
+        self._owned_topics: Set[str] = set()
+        self._owned_types: Set[str] = set()
+        self._expansion_spaces: Dict[
+            Optional[str], Tuple[List[Template], List[int]]
+        ] = {}
+        self._formatter = SentenceFormatter()
+        self._stats = GeneratorStats()
+        self.compile_sentence_pool(parsed_patterns)
+        sizes = {
+            topic: len(sentences) for topic, sentences in self.sentence_pool.items()
+        }
+        if pool is None:
+            self._pool = PatternPool(sizes, self.rng)
+        elif list(pool.sizes.items()) != list(sizes.items()):
+            raise ValueError("The shared pool doesn't match the sentence patterns")
+        else:
+            # A view of the pool with this generator's own random choices
+            self._pool = pool.bind(self.rng)
         self._auto_reset_patterns = True
         self._out_of_patterns_behavior = self.OutOfPatternsBehavior.RANDOM_TOPIC
-        self.shuffle_sentence_patterns()
+        self._timing = False
+        self._on_sentence: Tuple[Callable[[str, str], Any], ...] = ()
+        self._on_reset: Tuple[Callable[[str], Any], ...] = ()
+        self._on_topic_fallback: Tuple[Callable[[str, str], Any], ...] = ()
+        if topic_weights is not None:
+            self.set_topic_weights(topic_weights)
+        for topic, weights in (pattern_weights or {}).items():
+            self.set_pattern_weights(topic, weights)
+
+    @classmethod
+    def from_files(
+        cls,
+        patterns_path: str,
+        vocabulary_path: str,
+        mmap_threshold: Optional[int] = None,
+        compact: bool = False,
+        **kwargs: Any,
+    ) -> "BullshitGenerator":
+        """
+        Create a BullshitGenerator from sentence patterns and a vocabulary stored in files.
+        Each path can be a directory with one file per topic or type, a JSONL file or a JSON file
+        (see nabg.corpus).
+
+        Args:
+            patterns_path (str): Path of the sentence patterns
+            vocabulary_path (str): Path of the vocabulary
+            mmap_threshold (int, optional): In a vocabulary directory, memory-map the word files of at
+                least this many bytes instead of loading them into Python strings.
+            compact (bool, optional): Store loaded word lists as CompactWordList instead of lists of
+                strings. Defaults to False.
+            **kwargs: Further arguments for the constructor
+
+        Returns:
+            BullshitGenerator: Generator using the loaded corpus
+        """
+        from .corpus import load_patterns, load_vocabulary
+
+        return cls(
+            load_patterns(patterns_path),
+            load_vocabulary(vocabulary_path, mmap_threshold, compact),
+            **kwargs,
+        )
+
+    @classmethod
+    def load_compiled(
+        cls, path: str, expected_hash: Optional[str] = None, **kwargs: Any
+    ) -> "BullshitGenerator":
+        """
+        Create a BullshitGenerator from a corpus compiled with `nabg compile` (see nabg.compiled).
+        The patterns are already parsed and validated, so neither step is repeated.
+
+        Args:
+            path (str): Path of the compiled corpus
+            expected_hash (str, optional): Content hash the corpus must have been compiled from, as
+                returned by nabg.compiled.source_hash() or nabg.compiled.corpus_hash().
+            **kwargs: Further arguments for the constructor
+
+        Raises:
+            CompiledCorpusError: If the file isn't a compiled corpus of a supported version
+            StaleCorpusError: If the corpus was compiled from a source with a different hash
+
+        Returns:
+            BullshitGenerator: Generator using the compiled corpus
+        """
+        from .compiled import read_compiled
+
+        sentence_patterns, parsed_patterns, vocabulary = read_compiled(
+            path, expected_hash
+        )
+        return cls(
+            sentence_patterns, vocabulary, parsed_patterns=parsed_patterns, **kwargs
+        )
+
+    @property
+    def sentence_patterns(self) -> Dict[str, List[str]]:
+        """
+        The remaining sentence patterns yet to be used in a run, in the order they will be used.
+        """
+        with self._lock:
+            return {
+                topic: [
+                    self.sentence_pool[topic][i] for i in self._pool.remaining(topic)
+                ]
+                for topic in self._pool.available_topics()
+            }
 
     class OutOfPatternsBehavior(Enum):
         """
@@ -69,6 +299,20 @@ class BullshitGenerator:
         RESET_POOL = 2
         RAISE_ERROR = 3
 
+    class Hook(Enum):
+        """
+        Events that callbacks can be registered for.
+
+        Options:
+            ON_SENTENCE -- Called with the topic and the sentence after every generated sentence
+            ON_RESET -- Called with the reason after every pool reset ("manual", "exhausted" or "out_of_patterns")
+            ON_TOPIC_FALLBACK -- Called with the requested and the new topic when the RANDOM_TOPIC behavior switches topics
+        """
+
+        ON_SENTENCE = "on_sentence"
+        ON_RESET = "on_reset"
+        ON_TOPIC_FALLBACK = "on_topic_fallback"
+
     def list_topics(self) -> List[str]:
         """
         Get available topics.
@@ -85,7 +329,8 @@ class BullshitGenerator:
         Returns:
             List[str]: List of available topics
         """
-        return list(self.sentence_patterns.keys())
+        with self._lock:
+            return self._pool.available_topics()
 
     def enable_auto_reset(self):
         """
@@ -118,6 +363,100 @@ class BullshitGenerator:
         """
         self._out_of_patterns_behavior = self.OutOfPatternsBehavior.RAISE_ERROR
 
+    def set_topic_weights(self, weights: Optional[Dict[str, float]]):
+        """
+        Weigh the topics chosen at random, i.e. when no topic is requested and when the RANDOM_TOPIC
+        behavior switches topics. Topics without a weight weigh 1. Each choice costs O(1).
+
+        Args:
+            weights (Dict[str, float], optional): Weight of every topic, or None to choose uniformly
+
+        Raises:
+            InvalidTopicError: If a weighted topic is not present in the pattern pool
+            ValueError: If a weight is negative or not finite
+        """
+        with self._lock, self._counting_errors():
+            for topic in weights or ():
+                self.validate_topic(topic)
+            self._pool.set_topic_weights(weights)
+
+    def set_pattern_weights(self, topic: str, weights: Optional[Sequence[float]]):
+        """
+        Weigh the sentence patterns of a topic. Patterns are still used once per run, but heavier
+        patterns tend to come up earlier in the run, and so more often when runs are cut short by
+        resets. Weighted topics are reordered on every reset, which costs O(n log n) in their size.
+
+        Args:
+            topic (str): Topic whose patterns to weigh
+            weights (Sequence[float], optional): Weight of every pattern of the topic, in the order of
+                sentence_pool[topic], or None for a uniform order
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+            SharedPoolError: If weights are given and the generator draws from a shared pattern pool
+            ValueError: If there isn't one weight per pattern, or if a weight is negative
+        """
+        with self._lock, self._counting_errors():
+            self.validate_topic(topic)
+            self._pool.set_pattern_weights(topic, weights)
+
+    def add_hook(self, hook: "BullshitGenerator.Hook", callback: Callable[..., Any]):
+        """
+        Register a callback for an event. Events without callbacks cost nothing.
+
+        Args:
+            hook (BullshitGenerator.Hook): Event to listen to
+            callback (Callable[..., Any]): Function to call when the event happens
+        """
+        name = f"_{hook.value}"
+        setattr(self, name, getattr(self, name) + (callback,))
+
+    def remove_hook(self, hook: "BullshitGenerator.Hook", callback: Callable[..., Any]):
+        """
+        Unregister a callback for an event.
+
+        Args:
+            hook (BullshitGenerator.Hook): Event the callback was registered for
+            callback (Callable[..., Any]): Function to unregister
+
+        Raises:
+            ValueError: If the callback isn't registered for the event
+        """
+        name = f"_{hook.value}"
+        callbacks = list(getattr(self, name))
+        callbacks.remove(callback)
+        setattr(self, name, tuple(callbacks))
+
+    def enable_timing(self):
+        """
+        Measure the time spent drawing, rendering and cleaning sentences, reported by stats().
+        """
+        self._timing = True
+
+    def disable_timing(self):
+        """
+        Stop measuring the time spent per stage of sentence generation.
+        """
+        self._timing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics of the generator.
+
+        Returns:
+            Dict[str, Any]: Sentences generated per topic, pool resets per reason, topic fallbacks,
+                errors raised per exception class and seconds spent per stage. See GeneratorStats.
+        """
+        with self._lock:
+            return self._stats.as_dict()
+
+    def reset_stats(self):
+        """
+        Zero the runtime statistics of the generator.
+        """
+        with self._lock:
+            self._stats.reset()
+
     # ---------------------------------------------------------------------------- #
     #                               Utility functions                              #
     # ---------------------------------------------------------------------------- #
@@ -133,8 +472,7 @@ class BullshitGenerator:
         Returns:
             str: Sentence with 'a [vowel]' replaced with 'an [vowel]'
         """
-        p = re.compile(r"(^|\W)([Aa]) ([aeiou])")
-        return p.sub(r"\1\2n \3", sentence)
+        return formatter.replace_a_with_an(sentence)
 
     @staticmethod
     def insert_space_between_sentences(text: str) -> str:
@@ -147,8 +485,71 @@ class BullshitGenerator:
         Returns:
             str: Formatted paragraph.
         """
-        p = re.compile(r"([\.\?])(\w)")
-        return p.sub(r"\1 \2", text)
+        return formatter.insert_space_between_sentences(text)
+
+    @staticmethod
+    def space_sentences(sentences: Iterable[str]) -> Iterator[str]:
+        """
+        Prefix each sentence with the space insert_space_between_sentences would put before it.
+
+        Args:
+            sentences (Iterable[str]): Sentences to be formatted
+
+        Yields:
+            str: Sentences, prefixed with a space where needed
+        """
+        previous_end = ""
+        for sentence in sentences:
+            if previous_end in (".", "?") and _WORD_START.match(sentence):
+                yield " " + sentence
+            else:
+                yield sentence
+            previous_end = sentence[-1:]
+
+    @staticmethod
+    def join_sentences(sentences: Iterable[str]) -> str:
+        """
+        Assemble sentences into a paragraph, inserting a space after periods and question marks.
+
+        Args:
+            sentences (Iterable[str]): Sentences to be joined
+
+        Returns:
+            str: Formatted paragraph.
+        """
+        return "".join(BullshitGenerator.space_sentences(sentences))
+
+    @staticmethod
+    def write_sentences(
+        fp: TextIO,
+        sentences: Iterable[str],
+        chunk_size: int = 1000,
+        one_per_line: bool = False,
+    ):
+        """
+        Write sentences to a file in buffered chunks, without assembling the whole text in memory.
+
+        Args:
+            fp (TextIO): File to write to
+            sentences (Iterable[str]): Sentences to be written
+            chunk_size (int, optional): Number of sentences written at once. Defaults to 1000.
+            one_per_line (bool, optional): Write every sentence on its own line instead of joining
+                them into a paragraph. Defaults to False.
+
+        Raises:
+            ValueError: If chunk_size is less than 1
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        if one_per_line:
+            pieces = (sentence + "\n" for sentence in sentences)
+        else:
+            pieces = BullshitGenerator.space_sentences(sentences)
+        while True:
+            chunk = "".join(itertools.islice(pieces, chunk_size))
+            if not chunk:
+                break
+            fp.write(chunk)
 
     @staticmethod
     def clean_sentence(sentence: str) -> str:
@@ -161,9 +562,227 @@ class BullshitGenerator:
         Returns:
             str: Cleaned-up sentence
         """
-        result = BullshitGenerator.replace_a_with_an(sentence)
-        result = result[0].upper() + result[1:]
-        return result
+        return formatter.clean_sentence(sentence)
+
+    # ---------------------------------------------------------------------------- #
+    #                         Changing the corpus in place                         #
+    # ---------------------------------------------------------------------------- #
+
+    def add_patterns(
+        self,
+        topic: str,
+        patterns: Iterable[str],
+        weights: Optional[Sequence[float]] = None,
+    ):
+        """
+        Add sentence patterns to a topic, creating the topic if needed. The new patterns join the
+        unused patterns of the current run right away; used patterns stay used.
+
+        Args:
+            topic (str): Topic to add the patterns to
+            patterns (Iterable[str]): Sentence patterns to add
+            weights (Sequence[float], optional): Weight of every new pattern (see set_pattern_weights()).
+                Existing patterns weigh 1 if the topic wasn't weighted yet, and new patterns weigh 1
+                if it was.
+
+        Raises:
+            InvalidVocabularyTypeError: If a pattern uses a type that has no words in the vocabulary.
+                No pattern is added in that case.
+            SharedPoolError: If the generator draws from a shared pattern pool
+            ValueError: If there isn't one weight per pattern, or if a weight is negative
+        """
+        patterns = list(patterns)
+        if not patterns:
+            return
+        with self._lock, self._counting_errors():
+            templates = [self.compile_template(pattern, topic) for pattern in patterns]
+            self._pool.add(topic, len(patterns), weights)
+            self._expansion_spaces.clear()
+            self._formatter.invalidate()
+            self._own_topic(topic).extend(patterns)
+            self._templates.setdefault(topic, []).extend(templates)
+
+    def remove_patterns(self, topic: str, patterns: Iterable[str]) -> int:
+        """
+        Remove every occurrence of the given sentence patterns from a topic, whether they have been
+        used in the current run or not. A topic left without patterns is removed.
+
+        Args:
+            topic (str): Topic to remove the patterns from
+            patterns (Iterable[str]): Sentence patterns to remove
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+            SharedPoolError: If the generator draws from a shared pattern pool and a pattern is
+                present in the topic
+
+        Returns:
+            int: Number of patterns removed
+        """
+        patterns = set(patterns)
+        with self._lock, self._counting_errors():
+            self.validate_topic(topic)
+            sentences = self.sentence_pool[topic]
+            removed = [i for i, pattern in enumerate(sentences) if pattern in patterns]
+            if not removed:
+                return 0
+            self._pool.remove(topic, removed)
+            self._expansion_spaces.clear()
+            self._formatter.invalidate()
+            if len(removed) == len(sentences):
+                self._own_corpus()
+                del self.sentence_pool[topic]
+                del self._templates[topic]
+                self._owned_topics.discard(topic)
+                return len(removed)
+            keep = [pattern not in patterns for pattern in sentences]
+            self._own_corpus()
+            self.sentence_pool[topic] = list(itertools.compress(sentences, keep))
+            self._owned_topics.add(topic)
+            self._templates[topic] = list(
+                itertools.compress(self._templates[topic], keep)
+            )
+            return len(removed)
+
+    def add_words(
+        self,
+        vocab_type: str,
+        words: Iterable[str],
+        weights: Optional[Sequence[float]] = None,
+    ):
+        """
+        Add words to a vocabulary type, creating the type if needed. Existing patterns pick the new
+        words from their next sentence on.
+
+        Args:
+            vocab_type (str): Vocabulary type to add the words to
+            words (Iterable[str]): Words to add
+            weights (Sequence[float], optional): Weight of every new word. Existing words weigh 1
+                if the type wasn't weighted yet, and new words weigh 1 if the type was.
+
+        Raises:
+            ValueError: If there isn't one weight per word, or if a weight is negative
+        """
+        with self._lock, self._counting_errors():
+            word_list = self.vocabulary.get(vocab_type)
+            if weights is None and not isinstance(word_list, WeightedWordList):
+                if vocab_type in self._owned_types:
+                    word_list.extend(words)
+                    self._expansion_spaces.clear()
+                    self._formatter.invalidate()
+                else:
+                    self._replace_words(vocab_type, _extend_words(word_list, words))
+                return
+            # Alias tables can't be extended, so weighted lists are rebuilt
+            words = list(words)
+            if weights is None:
+                weights = [1.0] * len(words)
+            elif len(weights) != len(words):
+                raise ValueError(f"Got {len(weights)} weights for {len(words)} words")
+            if isinstance(word_list, WeightedWordList):
+                old_weights: Iterable[float] = word_list.weights
+                word_list = word_list.words
+            else:
+                old_weights = [1.0] * len(word_list or ())
+            self._replace_words(
+                vocab_type,
+                WeightedWordList(
+                    _extend_words(word_list, words),
+                    itertools.chain(old_weights, weights),
+                ),
+            )
+
+    def remove_words(self, vocab_type: str, words: Iterable[str]) -> int:
+        """
+        Remove every occurrence of the given words from a vocabulary type.
+
+        Args:
+            vocab_type (str): Vocabulary type to remove the words from
+            words (Iterable[str]): Words to remove
+
+        Raises:
+            InvalidVocabularyTypeError: If the type is not in the vocabulary, or if removing the words
+                would leave a type used by a pattern without words. No word is removed in that case.
+
+        Returns:
+            int: Number of words removed
+        """
+        words = set(words)
+        with self._lock:
+            if vocab_type not in self.vocabulary:
+                raise self._count_error(
+                    InvalidVocabularyTypeError(
+                        None,
+                        vocab_type,
+                        f"Could not find type {vocab_type} in the vocabulary",
+                    )
+                )
+            word_list = self.vocabulary[vocab_type]
+            unweighted = (
+                word_list.words
+                if isinstance(word_list, WeightedWordList)
+                else word_list
+            )
+            keep = [word not in words for word in unweighted]
+            kept: Sequence[str] = list(itertools.compress(unweighted, keep))
+            if len(kept) == len(word_list):
+                return 0
+            if not kept and any(
+                slot[0] is word_list
+                for templates in self._templates.values()
+                for _, slots in templates
+                for slot in slots
+            ):
+                raise self._count_error(
+                    InvalidVocabularyTypeError(
+                        None,
+                        vocab_type,
+                        f"Removing the words would leave type {vocab_type} without words",
+                    )
+                )
+            if isinstance(unweighted, CompactWordList):
+                kept = CompactWordList(kept)
+            if isinstance(word_list, WeightedWordList) and kept:
+                kept = WeightedWordList(
+                    kept, itertools.compress(word_list.weights, keep)
+                )
+            self._replace_words(vocab_type, kept)
+            return len(word_list) - len(kept)
+
+    def _own_corpus(self):
+        # Copy the corpus dictionaries the first time they are changed
+        if not self._owns_corpus:
+            self.sentence_pool = dict(self.sentence_pool)
+            self.vocabulary = dict(self.vocabulary)
+            self._owns_corpus = True
+
+    def _own_topic(self, topic: str) -> List[str]:
+        self._own_corpus()
+        if topic not in self._owned_topics:
+            self.sentence_pool[topic] = list(self.sentence_pool.get(topic, ()))
+            self._owned_topics.add(topic)
+        return self.sentence_pool[topic]
+
+    def _replace_words(self, vocab_type: str, word_list: Sequence[str]):
+        # Rebind the templates that picked words from the replaced list
+        self._own_corpus()
+        self._expansion_spaces.clear()
+        self._formatter.invalidate()
+        old_list = self.vocabulary.get(vocab_type)
+        self.vocabulary[vocab_type] = word_list
+        self._owned_types.add(vocab_type)
+        if old_list is None:
+            return
+        for templates in self._templates.values():
+            for i, (lead, slots) in enumerate(templates):
+                if any(words is old_list for words, _ in slots):
+                    templates[i] = (
+                        lead,
+                        tuple(
+                            (word_list if words is old_list else words, literal)
+                            for words, literal in slots
+                        ),
+                    )
 
     # ---------------------------------------------------------------------------- #
     #                 Support routines related to the main program                 #
@@ -171,17 +790,62 @@ class BullshitGenerator:
 
     def shuffle_sentence_patterns(self):
         """
-        Shuffle sentence patterns.
+        Shuffle sentence patterns of topics that haven't been used yet in the run.
         """
-        for sentenceList in self.sentence_patterns.values():
-            random.shuffle(sentenceList)
+        with self._lock:
+            self._pool.shuffle()
 
     def reset_sentence_patterns(self):
         """
         Reset sentence patterns for a new run.
         """
-        self.sentence_patterns = copy.deepcopy(self.sentence_pool)
-        self.shuffle_sentence_patterns()
+        self._reset_pool("manual")
+
+    def _reset_pool(self, reason: str):
+        with self._lock:
+            self._pool.reset()
+            self._stats.resets[reason] += 1
+            for callback in self._on_reset:
+                callback(reason)
+
+    def get_state(self) -> bytes:
+        """
+        Save the progress of the current run: which patterns have been used and the state of the
+        random number generator, in a few bytes per topic plus 2.5 kB for the random number
+        generator. Patterns and vocabulary aren't saved.
+
+        Raises:
+            ValueError: If the generator's random number generator isn't a random.Random
+
+        Returns:
+            bytes: Saved state, to be restored with set_state()
+        """
+        from .state import encode_state
+
+        with self._lock:
+            return encode_state(self._pool.get_state(), self.rng.getstate())
+
+    def set_state(self, state: bytes):
+        """
+        Restore the progress of a run saved by get_state(), possibly in another process. The
+        generator must have the same topics, with the same numbers of patterns, and the same
+        weights. It then generates exactly what the saved generator would have generated.
+
+        Args:
+            state (bytes): Saved state
+
+        Raises:
+            InvalidStateError: If the state is corrupt or was saved on another corpus
+        """
+        from .state import decode_state
+
+        with self._lock:
+            pool_state, rng_state = decode_state(state, list(self._pool.sizes.items()))
+            try:
+                self._pool.set_state(pool_state)
+            except ValueError as error:
+                raise InvalidStateError(message=f"Corrupt generator state: {error}")
+            self.rng.setstate(rng_state)
 
     def get_random_topic(self) -> str:
         """
@@ -190,7 +854,105 @@ class BullshitGenerator:
         Returns:
             str: Randomly chosen topic
         """
-        return random.choice(list(self.sentence_patterns.keys()))
+        with self._lock:
+            return self._pool.random_topic()
+
+    def compile_template(self, pattern: str, topic: Optional[str] = None) -> Template:
+        """
+        Compile a sentence pattern into a template bound to the vocabulary.
+
+        Args:
+            pattern (str): Sentence pattern to compile
+            topic (str, optional): Topic the pattern belongs to, used for error reporting
+
+        Raises:
+            InvalidVocabularyTypeError: If the pattern uses a type that has no words in the vocabulary
+
+        Returns:
+            Template: Compiled template
+        """
+        return self.bind_template(parse_pattern(pattern), topic)
+
+    def bind_template(
+        self, parsed_pattern: ParsedPattern, topic: Optional[str] = None
+    ) -> Template:
+        """
+        Bind a parsed sentence pattern to the vocabulary.
+
+        Args:
+            parsed_pattern (ParsedPattern): Literal segments and vocabulary types, as returned by parse_pattern()
+            topic (str, optional): Topic the pattern belongs to, used for error reporting
+
+        Raises:
+            InvalidVocabularyTypeError: If the pattern uses a type that has no words in the vocabulary
+
+        Returns:
+            Template: Compiled template
+        """
+        literals, types = parsed_pattern
+        slots = []
+        for vocab_type, literal in zip(types, literals[1:]):
+            words = self.vocabulary.get(vocab_type)
+            if not words:
+                raise self._count_error(
+                    InvalidVocabularyTypeError(
+                        topic,
+                        vocab_type,
+                        f"Could not find words in the vocabulary for type {vocab_type}",
+                    )
+                )
+            slots.append((words, literal))
+        return literals[0], tuple(slots)
+
+    def compile_sentence_pool(
+        self, parsed_patterns: Optional[Dict[str, List[ParsedPattern]]] = None
+    ):
+        """
+        Compile every pattern in the sentence pool into a template.
+
+        Args:
+            parsed_patterns (Dict[str, List[ParsedPattern]], optional): The sentence pool already parsed
+                with parse_pattern(), to skip parsing.
+
+        Raises:
+            InvalidVocabularyTypeError: If a pattern uses a type that has no words in the vocabulary
+        """
+        self._expansion_spaces = {}
+        self._formatter.invalidate()
+        if parsed_patterns is None:
+            self._templates = {
+                topic: [self.compile_template(pattern, topic) for pattern in sentences]
+                for topic, sentences in self.sentence_pool.items()
+            }
+        else:
+            self._templates = {
+                topic: [self.bind_template(parsed, topic) for parsed in parsed_list]
+                for topic, parsed_list in parsed_patterns.items()
+            }
+
+    def render_template(self, template: Template) -> str:
+        """
+        Render a compiled template with random words from the vocabulary.
+
+        Args:
+            template (Template): Compiled template to render
+
+        Returns:
+            str: Rendered sentence
+        """
+        text, slots = template
+        if not slots:
+            return text
+        choice = self.rng.choice
+        weighted = WeightedWordList
+        parts = [text]
+        for words, literal in slots:
+            if words.__class__ is weighted:
+                parts.append(words.pick(self.rng.random))
+            else:
+                parts.append(choice(words))
+            parts.append(literal)
+        return "".join(parts)
 
     def retrieve_random_word_of_type(self, type: str) -> str:
         """
@@ -202,7 +964,10 @@ class BullshitGenerator:
         Returns:
             str: A vocabulary word of the requested type
         """
-        return random.choice(self.vocabulary[type])
+        words = self.vocabulary[type]
+        if isinstance(words, WeightedWordList):
+            return words.pick(self.rng.random)
+        return self.rng.choice(words)
 
     def replace_vocab_patterns(self, sentence: str) -> str:
         """
@@ -211,15 +976,13 @@ class BullshitGenerator:
         Args:
             sentence (str): Sentence to be modified
 
+        Raises:
+            InvalidVocabularyTypeError: If the sentence uses a type that has no words in the vocabulary
+
         Returns:
             str: Sentence where type placeholders have been replaced with random words from the vocabulary
         """
-        sentence = re.sub(
-            r"\$\{([^\}]*)\}",
-            lambda matchobj: self.retrieve_random_word_of_type(matchobj.group(1)),
-            sentence,
-        )
-        return sentence
+        return self.render_template(self.compile_template(sentence))
 
     def generate_sentence(self, topic: str) -> str:
         """
@@ -234,14 +997,157 @@ class BullshitGenerator:
         Returns:
             str: Generated sentence
         """
-        sentences = self.sentence_patterns[topic]
-        pattern = sentences.pop()
-        result = self.replace_vocab_patterns(pattern)
-        if len(sentences) == 0:
-            self.sentence_patterns.pop(topic, None)
-        result = self.clean_sentence(result)
+        with self._lock:
+            template = self._templates[topic][self._pool.draw(topic)]
+            self._stats.sentences[topic] += 1
+        return self._build_sentence(topic, template)
+
+    def _build_sentence(self, topic: str, template: Template) -> str:
+        if self._timing:
+            start = time.perf_counter()
+            words = self._formatter.pick_words(template, self.rng)
+            rendered = time.perf_counter()
+            result = self._formatter.format(template, words)
+            with self._lock:
+                self._stats.timings["render"] += rendered - start
+                self._stats.timings["clean"] += time.perf_counter() - rendered
+        else:
+            result = self._formatter.render(template, self.rng)
+        for callback in self._on_sentence:
+            callback(topic, result)
         return result
 
+    def _count_error(self, error: Exception) -> Exception:
+        # An error is counted once, however many checks it passes through on its way out
+        if not getattr(error, "_nabg_counted", False):
+            setattr(error, "_nabg_counted", True)
+            with self._lock:
+                self._stats.errors[type(error).__name__] += 1
+        return error
+
+    @contextlib.contextmanager
+    def _counting_errors(self) -> Iterator[None]:
+        # Count the error rejecting a call, wherever in the call it was raised
+        try:
+            yield
+        except (Error, ValueError) as error:
+            self._count_error(error)
+            raise
+
+    def validate_topic(self, topic: str):
+        """
+        Check that a topic is present in the pattern pool.
+
+        Args:
+            topic (str): Topic to check
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+        """
+        if topic not in self.sentence_pool:
+            raise self._count_error(
+                InvalidTopicError(
+                    topic, f"Topic {topic} is not present in the pattern pool"
+                )
+            )
+
+    def resolve_sentence_topic(self, sentence_topic: str) -> str:
+        """
+        Pick the topic for the next sentence, applying the configured out-of-patterns behavior.
+
+        Args:
+            sentence_topic (str): Requested topic, which must be present in the pattern pool
+
+        Raises:
+            NoPatternsAvailableError: If no unused patterns are available and the configured
+                behavior is to raise an error
+
+        Returns:
+            str: Topic to generate the next sentence in
+        """
+        resolved_topic = self._choose_topic(
+            self._pool,
+            sentence_topic,
+            self._out_of_patterns_behavior,
+            self.handle_empty_patterns_set,
+            lambda: self._reset_pool("out_of_patterns"),
+            self._count_error,
+        )
+        if resolved_topic != sentence_topic:
+            self._stats.topic_fallbacks += 1
+            for callback in self._on_topic_fallback:
+                callback(sentence_topic, resolved_topic)
+        return resolved_topic
+
+    @classmethod
+    def _choose_topic(
+        cls,
+        pool: PatternPool,
+        sentence_topic: str,
+        behavior: "BullshitGenerator.OutOfPatternsBehavior",
+        handle_exhausted: Callable[[], None],
+        reset: Callable[[], None],
+        count_error: Callable[[Exception], Exception] = lambda error: error,
+    ) -> str:
+        # The out-of-patterns rules, shared with sessions.Session, which has no statistics or
+        # hooks. Returns another topic only when falling back to a random one.
+        if len(pool) == 0:
+            handle_exhausted()
+        if pool.is_available(sentence_topic):
+            return sentence_topic
+        if behavior == cls.OutOfPatternsBehavior.RAISE_ERROR:
+            raise count_error(
+                NoPatternsAvailableError(
+                    sentence_topic, f"Ran out of pattern in topic {sentence_topic}"
+                )
+            )
+        if behavior == cls.OutOfPatternsBehavior.RESET_POOL:
+            reset()
+            return sentence_topic
+        return pool.random_topic()
+
+    def _frozen_templates(
+        self,
+    ) -> Tuple[Dict[str, Tuple[Template, ...]], SentenceFormatter]:
+        # The compiled templates of every topic and the formatter that renders them, for
+        # sessions.Corpus. The formatter stays valid as long as the corpus doesn't change.
+        with self._lock:
+            templates = {
+                topic: tuple(templates) for topic, templates in self._templates.items()
+            }
+        return templates, self._formatter
+
+    def iter_topic_sentences(self, sentence_topic: str) -> Iterator[str]:
+        """
+        Endlessly generate sentences in a topic, switching topics as the out-of-patterns behavior dictates.
+
+        Args:
+            sentence_topic (str): Topic to generate sentences in
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+
+        Yields:
+            str: Generated sentences, with spaces inserted after inner periods and question marks
+        """
+        self.validate_topic(sentence_topic)
+        while True:
+            sentence_topic, template = self._next_pattern(sentence_topic)
+            yield self._build_sentence(sentence_topic, template)
+
+    def _next_pattern(self, sentence_topic: str) -> Tuple[str, Template]:
+        # Resolving the topic and drawing from it happen atomically, so no other
+        # thread can exhaust or reset the topic in between.
+        with self._lock:
+            if self._timing:
+                start = time.perf_counter()
+            sentence_topic = self.resolve_sentence_topic(sentence_topic)
+            template = self._templates[sentence_topic][self._pool.draw(sentence_topic)]
+            self._stats.sentences[sentence_topic] += 1
+            if self._timing:
+                self._stats.timings["draw"] += time.perf_counter() - start
+            return sentence_topic, template
+
     def generate_text(self, number_of_sentences: int, sentence_topic: str) -> str:
         """
         Generate a set of sentences.
@@ -253,36 +1159,11 @@ class BullshitGenerator:
         Returns:
             str: Generated text
         """
-        full_text: str = ""
-        for _ in range(number_of_sentences):
-            if sentence_topic not in self.sentence_pool:
-                raise InvalidTopicError(
-                    sentence_topic,
-                    f"Topic {sentence_topic} is not present in the pattern pool",
-                )
-            if len(self.sentence_patterns) == 0:
-                self.handle_empty_patterns_set()
-            if sentence_topic not in self.sentence_patterns:
-                if (
-                    self._out_of_patterns_behavior
-                    == self.OutOfPatternsBehavior.RAISE_ERROR
-                ):
-                    raise NoPatternsAvailableError(
-                        sentence_topic, f"Ran out of pattern in topic {sentence_topic}"
-                    )
-                elif (
-                    self._out_of_patterns_behavior
-                    == self.OutOfPatternsBehavior.RESET_POOL
-                ):
-                    self.reset_sentence_patterns()
-                elif (
-                    self._out_of_patterns_behavior
-                    == self.OutOfPatternsBehavior.RANDOM_TOPIC
-                ):
-                    sentence_topic = random.choice(list(self.sentence_patterns.keys()))
-            full_text = full_text + self.generate_sentence(sentence_topic)
-        full_text = self.insert_space_between_sentences(full_text)
-        return full_text
+        return self.join_sentences(
+            itertools.islice(
+                self.iter_topic_sentences(sentence_topic), max(0, number_of_sentences)
+            )
+        )
 
     def handle_empty_patterns_set(self):
         """
@@ -292,8 +1173,10 @@ class BullshitGenerator:
             NoPatternsAvailableError: If no unused patterns are available and auto-reset is disabled
         """
         if not self._auto_reset_patterns:
-            raise NoPatternsAvailableError(message="Ran out of patterns")
-        self.reset_sentence_patterns()
+            raise self._count_error(
+                NoPatternsAvailableError(message="Ran out of patterns")
+            )
+        self._reset_pool("exhausted")
 
     # ---------------------------------------------------------------------------- #
     #                                 Main program                                 #
@@ -310,11 +1193,293 @@ class BullshitGenerator:
         Returns:
             str: Generated bullshit.
         """
-        if len(self.sentence_patterns) == 0:
-            self.handle_empty_patterns_set()
+        return self.join_sentences(self.ionize_iter(number_of_sentences, topic))
+
+    def ionize_batch(self, requests: Iterable[Tuple[int, Optional[str]]]) -> List[str]:
+        """
+        Generate bullshit for several requests in one call.
+        Patterns aren't repeated across requests, exactly as if ionize() had been called once per request.
+
+        Args:
+            requests (Iterable[Tuple[int, Optional[str]]]): Pairs of number of sentences and topic.
+                A topic of None picks one at random.
+
+        Raises:
+            InvalidTopicError: If any requested topic is invalid. No text is generated in that case.
+
+        Returns:
+            List[str]: Generated bullshit, one text per request.
+        """
+        requests = list(requests)
+        for topic in {topic for _, topic in requests if topic is not None}:
+            self.validate_topic(topic)
+        return [
+            self.join_sentences(self.ionize_iter(number_of_sentences, topic))
+            for number_of_sentences, topic in requests
+        ]
+
+    def ionize_to(
+        self,
+        fp: TextIO,
+        number_of_sentences: int = 1,
+        topic: Optional[str] = None,
+        chunk_size: int = 1000,
+        one_per_line: bool = False,
+    ):
+        """
+        Generate bullshit straight into a file, writing it in chunks as it is generated.
+
+        Args:
+            fp (TextIO): File to write to
+            number_of_sentences (int, optional): Number of sentences to be generated. Defaults to 1.
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+            chunk_size (int, optional): Number of sentences written at once. Defaults to 1000.
+            one_per_line (bool, optional): Write every sentence on its own line. Defaults to False.
+
+        Raises:
+            ValueError: If chunk_size is less than 1
+        """
+        self.write_sentences(
+            fp, self.ionize_iter(number_of_sentences, topic), chunk_size, one_per_line
+        )
+
+    async def agenerate(
+        self,
+        number_of_sentences: int = 1,
+        topic: Optional[str] = None,
+        chunk_size: int = 100,
+        executor: Optional["Executor"] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate bullshit without blocking the event loop, yielding control after every chunk of sentences.
+
+        Args:
+            number_of_sentences (int, optional): Number of sentences to be generated. Defaults to 1.
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+            chunk_size (int, optional): Number of sentences generated between yields to the event loop.
+                Defaults to 100.
+            executor (Executor, optional): Executor to generate chunks in, instead of the event loop's
+                thread. The generator must be thread-safe to be used with an executor.
+
+        Raises:
+            ValueError: If an executor is given but the generator isn't thread-safe, or if
+                chunk_size is less than 1
+
+        Yields:
+            str: Generated sentences. Use join_sentences() to assemble them into text.
+        """
+        if executor is not None and not self.thread_safe:
+            raise ValueError("Generating in an executor needs a thread-safe generator")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        import asyncio
+
+        sentences = self.ionize_iter(number_of_sentences, topic)
+        loop = asyncio.get_running_loop()
+        while True:
+            if executor is None:
+                chunk = list(itertools.islice(sentences, chunk_size))
+            else:
+                chunk = await loop.run_in_executor(
+                    executor, list, itertools.islice(sentences, chunk_size)
+                )
+            if not chunk:
+                return
+            for sentence in chunk:
+                yield sentence
+            await asyncio.sleep(0)
+
+    async def aionize(
+        self,
+        number_of_sentences: int = 1,
+        topic: Optional[str] = None,
+        chunk_size: int = 100,
+        executor: Optional["Executor"] = None,
+    ) -> str:
+        """
+        Generate bullshit without blocking the event loop.
+
+        Args:
+            number_of_sentences (int, optional): Number of sentences to be generated. Defaults to 1.
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+            chunk_size (int, optional): Number of sentences generated between yields to the event loop.
+                Defaults to 100.
+            executor (Executor, optional): Executor to generate chunks in, instead of the event loop's
+                thread. The generator must be thread-safe to be used with an executor.
+
+        Raises:
+            ValueError: If an executor is given but the generator isn't thread-safe, or if
+                chunk_size is less than 1
+
+        Returns:
+            str: Generated bullshit.
+        """
+        sentences = [
+            sentence
+            async for sentence in self.agenerate(
+                number_of_sentences, topic, chunk_size, executor
+            )
+        ]
+        return self.join_sentences(sentences)
+
+    def iter_sentences(self, topic: Optional[str] = None) -> Iterator[str]:
+        """
+        Endlessly generate bullshit, one sentence at a time.
+
+        Args:
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+
+        Yields:
+            str: Generated sentences. Use join_sentences() to assemble them into text.
+        """
         if topic is None:
-            topic = self.get_random_topic()
-        return self.generate_text(number_of_sentences, topic)
+            with self._lock:
+                if len(self._pool) == 0:
+                    self.handle_empty_patterns_set()
+                topic = self.get_random_topic()
+        yield from self.iter_topic_sentences(topic)
+
+    def ionize_iter(
+        self, number_of_sentences: int = 1, topic: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate bullshit lazily, one sentence at a time.
+
+        Args:
+            number_of_sentences (int, optional): Number of sentences to be generated. Defaults to 1.
+                Nothing is generated if it is zero or negative.
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+
+        Returns:
+            Iterator[str]: Generated sentences. Use join_sentences() to assemble them into text.
+        """
+        return itertools.islice(self.iter_sentences(topic), max(0, number_of_sentences))
+
+    # ---------------------------------------------------------------------------- #
+    #                              Distinct sentences                              #
+    # ---------------------------------------------------------------------------- #
+
+    def capacity(self, topic: Optional[str] = None) -> int:
+        """
+        Count the distinct sentences a topic can produce: the sum over its patterns of the product of
+        the sizes of the word lists each pattern uses.
+
+        Args:
+            topic (str, optional): Topic to count. Counts the whole corpus if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+
+        Returns:
+            int: Number of distinct expansions of the topic's patterns
+        """
+        bounds = self._expansion_space(topic)[1]
+        return bounds[-1] if bounds else 0
+
+    def generate_distinct(
+        self, number_of_sentences: int, topic: Optional[str] = None
+    ) -> List[str]:
+        """
+        Generate sentences that are guaranteed to be distinct expansions of the topic's patterns.
+        Every expansion is numbered, a sample of distinct numbers is drawn without replacement and
+        each number is turned back into its sentence, so the cost doesn't grow as the number of
+        sentences approaches the capacity. Words are picked uniformly, regardless of weights, and the
+        pattern pool isn't used. Texts can only coincide if the corpus itself has duplicate words or
+        patterns that expand to the same text.
+
+        Args:
+            number_of_sentences (int): Number of sentences to generate. None are generated if it
+                isn't positive.
+            topic (str, optional): Topic on which to generate sentences. Uses the whole corpus if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+            InsufficientCapacityError: If more sentences are requested than capacity(topic)
+
+        Returns:
+            List[str]: Generated sentences, in random order
+        """
+        templates, bounds = self._expansion_space(topic)
+        if number_of_sentences <= 0:
+            return []
+        total = bounds[-1] if bounds else 0
+        if number_of_sentences > total:
+            raise self._count_error(
+                InsufficientCapacityError(
+                    topic,
+                    total,
+                    f"Requested {number_of_sentences} distinct sentences, but only {total} exist",
+                )
+            )
+        if total <= sys.maxsize:
+            indices: Iterable[int] = self.rng.sample(range(total), number_of_sentences)
+        else:
+            # Collisions are vanishingly rare in spaces this large
+            seen: Set[int] = set()
+            while len(seen) < number_of_sentences:
+                seen.add(self.rng.randrange(total))
+            indices = self.rng.sample(list(seen), number_of_sentences)
+        return [_finish_sentence(unrank(templates, bounds, index)) for index in indices]
+
+    def sentence_at(self, topic: Optional[str], index: int) -> str:
+        """
+        Render the expansion with a given number. Expansions are numbered pattern by pattern in the
+        order of sentence_pool[topic], and within a pattern like itertools.product() over the word
+        lists of its placeholders. Costs O(placeholders) once the topic's expansions are counted.
+
+        Args:
+            topic (str, optional): Topic to enumerate. Enumerates the whole corpus, topic by topic, if None.
+            index (int): Number of the expansion, in range(capacity(topic)). Negative numbers count
+                from the end.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+            IndexError: If the number is out of range
+
+        Returns:
+            str: Sentence
+        """
+        return self.expansions(topic)[index]
+
+    def expansions(self, topic: Optional[str] = None) -> ExpansionRange:
+        """
+        Get a lazy view over every expansion of a topic, numbered as in sentence_at(). Nothing is
+        rendered until the view is indexed or iterated. Slicing returns a smaller view, e.g.
+        expansions("warn")[1_000_000:1_010_000], and split() cuts a view into disjoint ranges
+        for parallel workers. Views keep the patterns the generator had when they were taken, but
+        share its word lists, which add_words() may extend in place. Take a new view after changing
+        the corpus.
+
+        Args:
+            topic (str, optional): Topic to enumerate. Enumerates the whole corpus, topic by topic, if None.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the pattern pool
+
+        Returns:
+            ExpansionRange: Lazy view over the expansions
+        """
+        templates, bounds = self._expansion_space(topic)
+        return ExpansionRange(templates, bounds, _finish_sentence)
+
+    def _expansion_space(
+        self, topic: Optional[str]
+    ) -> Tuple[List[Template], List[int]]:
+        # Templates of a topic with their cumulative expansion counts, cached until the corpus changes
+        with self._lock:
+            if topic is not None:
+                self.validate_topic(topic)
+            space = self._expansion_spaces.get(topic)
+            if space is None:
+                if topic is None:
+                    templates = list(
+                        itertools.chain.from_iterable(self._templates.values())
+                    )
+                else:
+                    templates = list(self._templates[topic])
+                bounds = list(itertools.accumulate(expansion_counts(templates)))
+                space = self._expansion_spaces[topic] = (templates, bounds)
+            return space
 
 
 # ---------------------------------------------------------------------------- #
@@ -322,16 +1487,160 @@ class BullshitGenerator:
 # ---------------------------------------------------------------------------- #
 
 
-def ionize(number_of_sentences: int = 1, topic: Optional[str] = None) -> str:
+def _default_corpus() -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    # The default corpus is only imported on first use, which keeps `import nabg` fast
+    from .default_patterns import sentence_patterns
+    from .default_vocabulary import bullshit_words
+
+    return sentence_patterns, bullshit_words
+
+
+def __getattr__(name: str) -> Any:
+    # Lazy module attributes: the default patterns and vocabulary
+    if name == "patterns":
+        return _default_corpus()[0]
+    if name == "vocabulary":
+        return _default_corpus()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_default_generator: Optional[BullshitGenerator] = None
+_default_generator_lock = threading.Lock()
+_thread_local = threading.local()
+_per_thread_generators = False
+
+
+def get_default_generator() -> BullshitGenerator:
+    """
+    Get the cached new-age bullshit generator used by ionize().
+    The generator is built on first use and reused afterwards, either process-wide or per thread.
+
+    Returns:
+        BullshitGenerator: Generator using Seb Pearce's pattern and vocabulary set
+    """
+    global _default_generator
+    if _per_thread_generators:
+        bullshit_generator = getattr(_thread_local, "generator", None)
+        if bullshit_generator is None:
+            bullshit_generator = BullshitGenerator(*_default_corpus())
+            _thread_local.generator = bullshit_generator
+        return bullshit_generator
+    if _default_generator is None:
+        with _default_generator_lock:
+            if _default_generator is None:
+                _default_generator = BullshitGenerator(
+                    *_default_corpus(), thread_safe=True
+                )
+    return _default_generator
+
+
+def use_per_thread_generators(enabled: bool = True):
+    """
+    Choose whether each thread gets its own cached generator for ionize().
+
+    Args:
+        enabled (bool, optional): Use one generator per thread if True, one per process otherwise.
+            Defaults to True.
+    """
+    global _per_thread_generators
+    _per_thread_generators = enabled
+
+
+def ionize(
+    number_of_sentences: int = 1, topic: Optional[str] = None, fresh_pool: bool = False
+) -> str:
     """
     Generate new-age bullshit.
+    Patterns aren't repeated across calls until the pool of the cached generator runs out.
+
+    Args:
+        number_of_sentences (int, optional): Number of sentences to generate. Defaults to 1.
+        topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+        fresh_pool (bool, optional): Reset the pattern pool before generating, so that patterns
+            used by previous calls may repeat. The pool is the cached generator's, so the reset
+            also affects later calls from the rest of the process (or thread, with
+            use_per_thread_generators()). Defaults to False.
+    """
+    bullshit_generator = get_default_generator()
+    if not fresh_pool:
+        return bullshit_generator.ionize(number_of_sentences, topic)
+    # Hold the lock across both steps, so no other thread draws from the fresh pool in between
+    with bullshit_generator._lock:
+        bullshit_generator.reset_sentence_patterns()
+        return bullshit_generator.ionize(number_of_sentences, topic)
+
+
+def ionize_to(
+    fp: TextIO,
+    number_of_sentences: int = 1,
+    topic: Optional[str] = None,
+    chunk_size: int = 1000,
+    one_per_line: bool = False,
+):
+    """
+    Generate new-age bullshit straight into a file, writing it in chunks as it is generated.
+
+    Args:
+        fp (TextIO): File to write to
+        number_of_sentences (int, optional): Number of sentences to generate. Defaults to 1.
+        topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+        chunk_size (int, optional): Number of sentences written at once. Defaults to 1000.
+        one_per_line (bool, optional): Write every sentence on its own line. Defaults to False.
+
+    Raises:
+        ValueError: If chunk_size is less than 1
+    """
+    get_default_generator().ionize_to(
+        fp, number_of_sentences, topic, chunk_size, one_per_line
+    )
+
+
+def agenerate(
+    number_of_sentences: int = 1,
+    topic: Optional[str] = None,
+    chunk_size: int = 100,
+    executor: Optional["Executor"] = None,
+) -> AsyncIterator[str]:
+    """
+    Generate new-age bullshit without blocking the event loop, one sentence at a time.
 
     Args:
         number_of_sentences (int, optional): Number of sentences to generate. Defaults to 1.
         topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+        chunk_size (int, optional): Number of sentences generated between yields to the event loop.
+            Defaults to 100.
+        executor (Executor, optional): Executor to generate chunks in, instead of the event loop's thread.
+
+    Returns:
+        AsyncIterator[str]: Generated sentences
+    """
+    return get_default_generator().agenerate(
+        number_of_sentences, topic, chunk_size, executor
+    )
+
+
+async def aionize(
+    number_of_sentences: int = 1,
+    topic: Optional[str] = None,
+    chunk_size: int = 100,
+    executor: Optional["Executor"] = None,
+) -> str:
+    """
+    Generate new-age bullshit without blocking the event loop.
+
+    Args:
+        number_of_sentences (int, optional): Number of sentences to generate. Defaults to 1.
+        topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+        chunk_size (int, optional): Number of sentences generated between yields to the event loop.
+            Defaults to 100.
+        executor (Executor, optional): Executor to generate chunks in, instead of the event loop's thread.
+
+    Returns:
+        str: Generated bullshit.
     """
-    bullshit_generator = BullshitGenerator(patterns, vocabulary)
-    return bullshit_generator.ionize(number_of_sentences, topic)
+    return await get_default_generator().aionize(
+        number_of_sentences, topic, chunk_size, executor
+    )
 
 
 def list_topics() -> List[str]:
@@ -341,4 +1650,4 @@ def list_topics() -> List[str]:
     Returns:
         List[str]: List of available topics
     """
-    return list(patterns.keys())
+    return list(_default_corpus()[0].keys())
@@ -0,0 +1,120 @@
+"""
+Entry point of the nabg command.
+
+Shell pipelines run nabg many times over, so startup time matters. Plain generation requests,
+like `nabg -n 5 -t history`, are parsed here without importing click, which takes longer to
+import than generating the sentences. Everything else (subcommands, --help, --output, malformed
+options) is handed to the click interface in nabg.commands, which also reports the errors.
+"""
+
+import sys
+from typing import Any, Dict, List, Optional, TextIO
+
+# Options handled without click: option -> (parameter, type), with None for flags
+_OPTIONS = {
+    "-n": ("n", int),
+    "-t": ("topic", str),
+    "--topic": ("topic", str),
+    "-l": ("list_topics", None),
+    "--list-topics": ("list_topics", None),
+    "-j": ("jobs", int),
+    "--jobs": ("jobs", int),
+    "-s": ("seed", int),
+    "--seed": ("seed", int),
+    "--lines": ("lines", None),
+}
+
+
+def write_bullshit(
+    output: TextIO,
+    n: int = 1,
+    topic: Optional[str] = None,
+    list_topics: bool = False,
+    jobs: int = 1,
+    seed: Optional[int] = None,
+    lines: bool = False,
+):
+    """
+    Carry out a generation request of the nabg command.
+
+    Args:
+        output (TextIO): File to write the bullshit to
+        n (int, optional): Number of sentences to generate. Defaults to 1.
+        topic (str, optional): Topic on which to generate bullshit. Picks one at random if not provided.
+        list_topics (bool, optional): List the available topics instead. Defaults to False.
+        jobs (int, optional): Number of processes to generate sentences on. Defaults to 1.
+        seed (int, optional): Seed for reproducible output.
+        lines (bool, optional): Write one sentence per line. Defaults to False.
+    """
+    from . import bullshit_generator
+
+    if list_topics:
+        for topic in bullshit_generator.list_topics():
+            output.write(f"{topic}\n")
+        return
+    if jobs > 1 or seed is not None:
+        from .parallel import generate_parallel
+
+        sentences = generate_parallel(n, topic, workers=jobs, seed=seed)
+        bullshit_generator.BullshitGenerator.write_sentences(
+            output, sentences, one_per_line=lines
+        )
+    else:
+        bullshit_generator.ionize_to(output, n, topic, one_per_line=lines)
+    if not lines:
+        output.write("\n")
+
+
+def parse_args(args: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parse the arguments of a plain generation request.
+
+    Args:
+        args (List[str]): Command line arguments, without the program name
+
+    Returns:
+        Dict[str, Any]: Arguments for write_bullshit(), or None if click has to handle the request
+    """
+    parsed: Dict[str, Any] = {}
+    position = 0
+    while position < len(args):
+        option, equals, value = args[position].partition("=")
+        position += 1
+        if option not in _OPTIONS or (equals and not option.startswith("--")):
+            return None
+        name, convert = _OPTIONS[option]
+        if convert is None:
+            if equals:
+                return None
+            parsed[name] = True
+            continue
+        if not equals:
+            # Let click decide whether an option-like word is a value
+            if position == len(args) or args[position].startswith("-"):
+                return None
+            value = args[position]
+            position += 1
+        try:
+            parsed[name] = convert(value)
+        except ValueError:
+            return None
+    if parsed.get("jobs", 1) < 1:
+        return None
+    return parsed
+
+
+def run(argv: Optional[List[str]] = None):
+    """
+    Run the nabg command.
+
+    Args:
+        argv (List[str], optional): Command line arguments, without the program name. Defaults to sys.argv[1:].
+    """
+    args = sys.argv[1:] if argv is None else list(argv)
+    parsed = parse_args(args)
+    if parsed is None:
+        from .commands import main
+
+        main(args, prog_name="nabg")
+        return
+    write_bullshit(sys.stdout, **parsed)
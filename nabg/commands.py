@@ -0,0 +1,145 @@
+"""
+Command line interface of nabg, built with click. Plain generation requests are handled by
+nabg.cli without importing this module.
+"""
+
+from typing import Optional, TextIO
+
+import click
+import nabg.bullshit_generator as bullshit_generator
+from nabg.cli import write_bullshit
+
+
+@click.group(
+    invoke_without_command=True,
+    context_settings=dict(help_option_names=["-h", "--help"]),
+)
+@click.pass_context
+@click.option("-n", default=1, help="Number of sentences to generate.")
+@click.option(
+    "--topic", "-t", default=None, help="Topic on which to generate bullshit."
+)
+@click.option(
+    "--list-topics", "-l", is_flag=True, default=False, help="List available topics."
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes to generate sentences on. Output only depends on the seed.",
+)
+@click.option(
+    "--seed", "-s", default=None, type=int, help="Seed for reproducible output."
+)
+@click.option(
+    "--output",
+    "-o",
+    default="-",
+    type=click.File("w"),
+    help="File to write the bullshit to. Defaults to stdout.",
+)
+@click.option(
+    "--lines", is_flag=True, default=False, help="Write one sentence per line."
+)
+def main(
+    ctx: click.Context,
+    n: int,
+    topic: str,
+    list_topics: bool,
+    jobs: int,
+    seed: Optional[int],
+    output: TextIO,
+    lines: bool,
+):
+    """
+    Generate new-age bullshit.
+    """
+    if ctx.invoked_subcommand is not None:
+        return
+    write_bullshit(output, n, topic, list_topics, jobs, seed, lines)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", help="Host to listen on.")
+@click.option("--port", "-p", default=8000, help="Port to listen on.")
+@click.option("--verbose", "-v", is_flag=True, default=False, help="Log every request.")
+@click.option(
+    "--max-sentences",
+    default=10_000,
+    help="Most sentences served by a request to /ionize or a batch.",
+)
+@click.option(
+    "--max-stream-sentences",
+    default=1_000_000,
+    help="Most sentences served by a request to /stream.",
+)
+def serve(
+    host: str, port: int, verbose: bool, max_sentences: int, max_stream_sentences: int
+):
+    """
+    Serve new-age bullshit over HTTP.
+    """
+    from nabg.server import serve as serve_http
+
+    click.echo(f"Serving bullshit on http://{host}:{port}", err=True)
+    serve_http(
+        host,
+        port,
+        verbose=verbose,
+        max_sentences=max_sentences,
+        max_stream_sentences=max_stream_sentences,
+    )
+
+
+@main.command(name="compile")
+@click.option(
+    "--patterns",
+    default=None,
+    type=click.Path(exists=True),
+    help="Sentence patterns to compile. Defaults to the built-in patterns.",
+)
+@click.option(
+    "--vocabulary",
+    default=None,
+    type=click.Path(exists=True),
+    help="Vocabulary to compile. Defaults to the built-in vocabulary.",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    default=False,
+    help="Store word lists as compact buffers.",
+)
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(dir_okay=False, writable=True),
+    help="File to write the compiled corpus to.",
+)
+def compile_command(
+    patterns: Optional[str], vocabulary: Optional[str], compact: bool, output: str
+):
+    """
+    Compile a corpus into a binary snapshot that loads without parsing.
+    """
+    from nabg.compiled import compile_corpus, source_hash
+    from nabg.corpus import load_patterns, load_vocabulary
+    from nabg.wordlists import compact_vocabulary
+
+    sentence_patterns = (
+        load_patterns(patterns) if patterns else bullshit_generator.patterns
+    )
+    if vocabulary:
+        words = load_vocabulary(vocabulary, compact=compact)
+    else:
+        words = bullshit_generator.vocabulary
+        if compact:
+            words = compact_vocabulary(words)
+    # Snapshots of files are keyed by the files, so load_cached() can tell when they change
+    content_hash = (
+        source_hash(patterns, vocabulary) if patterns and vocabulary else None
+    )
+    compile_corpus(output, sentence_patterns, words, content_hash)
+    click.echo(f"Compiled corpus written to {output}", err=True)
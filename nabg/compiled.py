@@ -0,0 +1,269 @@
+"""
+Precompiled binary corpora.
+
+A compiled corpus is a validated snapshot of sentence patterns, their parsed templates and a
+vocabulary, so that loading it skips parsing JSON, parsing patterns and validating them.
+Layout of a compiled corpus file:
+
+    8 bytes   -- magic number, b"NABGCORP"
+    2 bytes   -- format version, big-endian
+    32 bytes  -- SHA-256 hash of the source corpus
+    16 bytes  -- tag of the Python implementation that wrote it (e.g. b"cpython-311"), NUL-padded
+    remainder -- marshal-encoded payload
+
+The source hash identifies the corpus the snapshot was compiled from, so stale snapshots can be
+detected without reading the payload. The marshal format isn't stable across Python versions, so
+snapshots written by another implementation or version are stale as well.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .bullshit_generator import BullshitGenerator, ParsedPattern, parse_pattern
+from .corpus import load_patterns, load_vocabulary
+from .errors import CompiledCorpusError, StaleCorpusError
+from .wordlists import CompactWordList, WeightedWordList
+
+__all__ = [
+    "FORMAT_VERSION",
+    "compile_corpus",
+    "corpus_hash",
+    "load_cached",
+    "read_compiled",
+    "source_hash",
+]
+
+MAGIC = b"NABGCORP"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct(">8sH32s16s")
+_MARSHAL_VERSION = 4
+_RUNTIME_TAG = (
+    sys.implementation.cache_tag
+    or f"{sys.implementation.name}-{sys.version_info[0]}{sys.version_info[1]}"
+).encode("ascii")[:16]
+
+
+def corpus_hash(
+    sentence_patterns: Dict[str, List[str]], vocabulary: Dict[str, Sequence[str]]
+) -> str:
+    """
+    Compute the content hash of an in-memory corpus.
+
+    Args:
+        sentence_patterns (Dict[str, List[str]]): The corpus of sentence patterns separated into topics.
+        vocabulary (Dict[str, Sequence[str]]): The vocabulary of terms separated into types.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash
+    """
+    digest = hashlib.sha256()
+    for lists in (sentence_patterns, vocabulary):
+        for key, values in lists.items():
+            digest.update(json.dumps([key, list(values)]).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def source_hash(*paths: str) -> str:
+    """
+    Compute the content hash of corpus files and directories, without parsing them.
+
+    Args:
+        *paths (str): Files or directories holding the corpus
+
+    Returns:
+        str: Hexadecimal SHA-256 hash
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            files = [
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name))
+            ]
+        else:
+            files = [path]
+        for file_path in files:
+            digest.update(os.path.basename(file_path).encode("utf-8") + b"\0")
+            with open(file_path, "rb") as fp:
+                for block in iter(lambda: fp.read(1 << 20), b""):
+                    digest.update(block)
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+def _encode_words(words: Sequence[str]) -> Tuple[Any, ...]:
+    if isinstance(words, WeightedWordList):
+        return ("weighted", _encode_words(words.words), words.weights.tobytes())
+    if isinstance(words, CompactWordList):
+        buffer, offsets = words.buffers()
+        return ("compact", bytes(buffer), offsets.typecode, offsets.tobytes())
+    return ("list", list(words))
+
+
+def _decode_words(encoded: Tuple[Any, ...]) -> Sequence[str]:
+    if encoded[0] == "weighted":
+        weights = array("d")
+        weights.frombytes(encoded[2])
+        return WeightedWordList(_decode_words(encoded[1]), weights)
+    if encoded[0] == "compact":
+        return CompactWordList.from_buffers(*encoded[1:])
+    return encoded[1]
+
+
+def compile_corpus(
+    path: str,
+    sentence_patterns: Dict[str, List[str]],
+    vocabulary: Dict[str, Sequence[str]],
+    content_hash: Optional[str] = None,
+):
+    """
+    Validate a corpus and write it as a compiled snapshot.
+
+    Args:
+        path (str): Path of the compiled corpus to write
+        sentence_patterns (Dict[str, List[str]]): The corpus of sentence patterns separated into topics.
+        vocabulary (Dict[str, Sequence[str]]): The vocabulary of terms separated into types.
+        content_hash (str, optional): Hash of the source corpus. Defaults to corpus_hash() of the corpus.
+
+    Raises:
+        InvalidVocabularyTypeError: If a pattern uses a type that has no words in the vocabulary
+    """
+    parsed_patterns = {
+        topic: [parse_pattern(pattern) for pattern in sentences]
+        for topic, sentences in sentence_patterns.items()
+    }
+    # Binding validates every pattern against the vocabulary
+    BullshitGenerator(sentence_patterns, vocabulary, parsed_patterns=parsed_patterns)
+    if content_hash is None:
+        content_hash = corpus_hash(sentence_patterns, vocabulary)
+    payload = {
+        "patterns": {
+            topic: list(sentences) for topic, sentences in sentence_patterns.items()
+        },
+        "parsed": parsed_patterns,
+        "vocabulary": {
+            vocab_type: _encode_words(words) for vocab_type, words in vocabulary.items()
+        },
+    }
+    temporary_path = f"{path}.tmp{os.getpid()}"
+    with open(temporary_path, "wb") as fp:
+        fp.write(
+            _HEADER.pack(
+                MAGIC, FORMAT_VERSION, bytes.fromhex(content_hash), _RUNTIME_TAG
+            )
+        )
+        marshal.dump(payload, fp, _MARSHAL_VERSION)
+    os.replace(temporary_path, path)
+
+
+def read_compiled(
+    path: str, expected_hash: Optional[str] = None
+) -> Tuple[
+    Dict[str, List[str]], Dict[str, List[ParsedPattern]], Dict[str, Sequence[str]]
+]:
+    """
+    Read a compiled corpus.
+
+    Args:
+        path (str): Path of the compiled corpus
+        expected_hash (str, optional): Hash the corpus must have been compiled from
+
+    Raises:
+        CompiledCorpusError: If the file isn't a compiled corpus of a supported version
+        StaleCorpusError: If the corpus was compiled from a source with a different hash, or by
+            another Python implementation or version
+
+    Returns:
+        Tuple[Dict[str, List[str]], Dict[str, List[ParsedPattern]], Dict[str, Sequence[str]]]: Sentence
+            patterns, parsed sentence patterns and vocabulary
+    """
+    with open(path, "rb") as fp:
+        header = fp.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise CompiledCorpusError(message=f"{path} is not a compiled corpus")
+        magic, version, content_hash, runtime_tag = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CompiledCorpusError(message=f"{path} is not a compiled corpus")
+        if version != FORMAT_VERSION:
+            raise CompiledCorpusError(
+                message=f"{path} has format version {version}, expected {FORMAT_VERSION}"
+            )
+        runtime_tag = runtime_tag.rstrip(b"\0")
+        if runtime_tag != _RUNTIME_TAG:
+            raise StaleCorpusError(
+                message=f"{path} was compiled by {runtime_tag.decode('ascii', 'replace')}, "
+                f"not {_RUNTIME_TAG.decode('ascii')}"
+            )
+        if expected_hash is not None and content_hash.hex() != expected_hash:
+            raise StaleCorpusError(message=f"{path} was compiled from another corpus")
+        try:
+            payload = marshal.load(fp)
+            sentence_patterns = payload["patterns"]
+            parsed_patterns = payload["parsed"]
+            if not isinstance(sentence_patterns, dict) or not isinstance(
+                parsed_patterns, dict
+            ):
+                raise TypeError("patterns must be dictionaries")
+            if set(parsed_patterns) != set(sentence_patterns):
+                raise ValueError("patterns and parsed patterns have different topics")
+            for topic, patterns in sentence_patterns.items():
+                if len(patterns) != len(parsed_patterns[topic]):
+                    raise ValueError(
+                        f"topic {topic!r} has {len(patterns)} patterns, "
+                        f"but {len(parsed_patterns[topic])} parsed"
+                    )
+            vocabulary = {
+                vocab_type: _decode_words(encoded)
+                for vocab_type, encoded in payload["vocabulary"].items()
+            }
+        except (
+            AttributeError,
+            EOFError,
+            IndexError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ) as error:
+            raise CompiledCorpusError(message=f"{path} is corrupt: {error!r}")
+    return sentence_patterns, parsed_patterns, vocabulary
+
+
+def load_cached(
+    patterns_path: str,
+    vocabulary_path: str,
+    cache_path: str,
+    compact: bool = False,
+    **kwargs: Any,
+) -> BullshitGenerator:
+    """
+    Create a BullshitGenerator from corpus files, through a compiled snapshot that is rebuilt
+    whenever the files change.
+
+    Args:
+        patterns_path (str): Path of the sentence patterns
+        vocabulary_path (str): Path of the vocabulary
+        cache_path (str): Path of the compiled snapshot
+        compact (bool, optional): Store word lists as CompactWordList. Defaults to False.
+        **kwargs: Further arguments for the constructor
+
+    Returns:
+        BullshitGenerator: Generator using the corpus
+    """
+    content_hash = source_hash(patterns_path, vocabulary_path)
+    try:
+        return BullshitGenerator.load_compiled(cache_path, content_hash, **kwargs)
+    except (OSError, CompiledCorpusError):
+        pass
+    sentence_patterns = load_patterns(patterns_path)
+    vocabulary = load_vocabulary(vocabulary_path, compact=compact)
+    compile_corpus(cache_path, sentence_patterns, vocabulary, content_hash)
+    return BullshitGenerator(sentence_patterns, vocabulary, **kwargs)
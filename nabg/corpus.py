@@ -0,0 +1,229 @@
+"""
+Load sentence patterns and vocabularies from files.
+
+Three formats are supported, chosen by the path:
+
+    directory   -- one UTF-8 file per topic or vocabulary type, named after it (e.g. adj.txt),
+                   with one pattern or word per line
+    *.jsonl     -- one JSON object per line, {"topic": ..., "pattern": ...} for patterns and
+                   {"type": ..., "word": ...} for vocabularies
+    *.json      -- a single object mapping every topic or type to a list of strings, like
+                   nabg.patterns and nabg.vocabulary
+
+Files are parsed as streams, so no more than one line or one string at a time is held on top
+of the loaded corpus. Large word files in a vocabulary directory can be memory-mapped instead
+of being loaded (see nabg.wordlists.MappedWordList).
+"""
+
+import json
+import os
+from json.decoder import scanstring
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from .wordlists import CompactWordList, MappedWordList
+
+__all__ = ["load_patterns", "load_vocabulary", "iter_json_lists"]
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JSONStream:
+    """
+    Buffered reader over a JSON text that tokenizes it a few characters at a time.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+        self.buffer = self.buffer[self.position :] + data
+        self.position = 0
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.position)
+
+    def peek(self) -> str:
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in _WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position : self.position + 1]
+            self._fill()
+
+    def take(self) -> str:
+        char = self.peek()
+        self.position += 1
+        return char
+
+    def expect(self, char: str):
+        if self.take() != char:
+            self.position -= 1
+            raise self._error(f"Expecting {char!r}")
+
+    def string(self) -> str:
+        self.expect('"')
+        while True:
+            try:
+                value, end = scanstring(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # The string may continue in the part of the file that hasn't been read yet
+                self.position -= 1
+                self._fill()
+                self.position += 1
+                continue
+            self.position = end
+            return value
+
+
+def iter_json_lists(
+    fp: TextIO, chunk_size: int = 1 << 16
+) -> Iterator[Tuple[str, Iterator[str]]]:
+    """
+    Stream a JSON object mapping keys to lists of strings.
+    Each list must be consumed before moving on to the next key.
+
+    Args:
+        fp (TextIO): File containing the JSON object
+        chunk_size (int, optional): Number of characters read at once. Defaults to 65536.
+
+    Raises:
+        json.JSONDecodeError: If the file isn't an object of lists of strings
+
+    Yields:
+        Tuple[str, Iterator[str]]: Every key, with an iterator over the strings of its list
+    """
+    stream = _JSONStream(fp, chunk_size)
+
+    def values() -> Iterator[str]:
+        stream.expect("[")
+        if stream.peek() == "]":
+            stream.take()
+            return
+        while True:
+            yield stream.string()
+            separator = stream.take()
+            if separator == "]":
+                return
+            if separator != ",":
+                stream.position -= 1
+                raise stream._error("Expecting ',' delimiter")
+
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.string()
+        stream.expect(":")
+        items = values()
+        yield key, items
+        for _ in items:
+            pass
+        separator = stream.take()
+        if separator == "}":
+            return
+        if separator != ",":
+            stream.position -= 1
+            raise stream._error("Expecting ',' delimiter")
+
+
+def _iter_lines(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            line = line.rstrip("\r\n")
+            if line:
+                yield line
+
+
+def _load_lists(
+    path: str, key_field: str, value_field: str, word_list: Callable = list
+) -> Dict[str, Sequence[str]]:
+    if os.path.isdir(path):
+        return {
+            os.path.splitext(name)[0]: word_list(_iter_lines(os.path.join(path, name)))
+            for name in sorted(os.listdir(path))
+            if os.path.isfile(os.path.join(path, name))
+        }
+    if path.endswith(".jsonl"):
+        # Append every record straight to the list of its key, so that compact lists never
+        # hold the whole file as strings
+        lists: Dict[str, Any] = {}
+        for line in _iter_lines(path):
+            record = json.loads(line)
+            key = record[key_field]
+            values = lists.get(key)
+            if values is None:
+                values = lists[key] = word_list()
+            values.append(record[value_field])
+        return lists
+    with open(path, encoding="utf-8") as fp:
+        return {key: word_list(values) for key, values in iter_json_lists(fp)}
+
+
+def load_patterns(path: str) -> Dict[str, List[str]]:
+    """
+    Load sentence patterns from a directory, a JSONL file or a JSON file.
+
+    Args:
+        path (str): Path of the patterns
+
+    Returns:
+        Dict[str, List[str]]: Sentence patterns separated into topics
+    """
+    return _load_lists(path, "topic", "pattern")
+
+
+def load_vocabulary(
+    path: str, mmap_threshold: Optional[int] = None, compact: bool = False
+) -> Dict[str, Sequence[str]]:
+    """
+    Load a vocabulary from a directory, a JSONL file or a JSON file.
+
+    Args:
+        path (str): Path of the vocabulary
+        mmap_threshold (int, optional): In a vocabulary directory, memory-map the word files of at
+            least this many bytes instead of loading them. Files are always loaded if not provided.
+        compact (bool, optional): Store loaded word lists as CompactWordList instead of lists of
+            strings. Defaults to False.
+
+    Returns:
+        Dict[str, Sequence[str]]: Vocabulary of terms separated into types
+    """
+    word_list = CompactWordList if compact else list
+    if not os.path.isdir(path):
+        if path.endswith(".jsonl"):
+            return _load_lists(path, "type", "word", word_list)
+        with open(path, encoding="utf-8") as fp:
+            return {key: word_list(words) for key, words in iter_json_lists(fp)}
+    vocabulary: Dict[str, Sequence[str]] = {}
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path):
+            continue
+        if mmap_threshold is not None and os.path.getsize(file_path) >= mmap_threshold:
+            words: Sequence[str] = MappedWordList(file_path)
+        else:
+            words = word_list(_iter_lines(file_path))
+        vocabulary[os.path.splitext(name)[0]] = words
+    return vocabulary
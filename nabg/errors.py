@@ -44,3 +44,87 @@ class NoPatternsAvailableError(Error):
 
     def __init__(self, topic: Optional[str] = None, message: Optional[str] = None):
         super().__init__(topic, message)
+
+
+class InvalidVocabularyTypeError(Error):
+    """
+    Raised when a sentence pattern uses a type that has no words in the vocabulary.
+
+    Attributes:
+        topic -- topic of the offending pattern; None if the pattern is not part of the pool
+        vocab_type -- vocabulary type which could not be found
+        message -- explanation of the error
+    """
+
+    def __init__(
+        self, topic: Optional[str], vocab_type: str, message: Optional[str] = None
+    ):
+        super().__init__(topic, message)
+        self.vocab_type = vocab_type
+
+
+class CompiledCorpusError(Error):
+    """
+    Raised when a compiled corpus can't be read.
+
+    Attributes:
+        topic -- always None
+        message -- explanation of the error
+    """
+
+    def __init__(self, topic: Optional[str] = None, message: Optional[str] = None):
+        super().__init__(topic, message)
+
+
+class StaleCorpusError(CompiledCorpusError):
+    """
+    Raised when a compiled corpus was compiled from a different source than expected.
+
+    Attributes:
+        topic -- always None
+        message -- explanation of the error
+    """
+
+
+class InvalidStateError(Error):
+    """
+    Raised when a saved generator state can't be restored.
+
+    Attributes:
+        topic -- always None
+        message -- explanation of the error
+    """
+
+    def __init__(self, topic: Optional[str] = None, message: Optional[str] = None):
+        super().__init__(topic, message)
+
+
+class InsufficientCapacityError(Error):
+    """
+    Raised when more distinct sentences are requested than the corpus can produce.
+
+    Attributes:
+        topic -- topic for which sentences were requested; None for the whole corpus
+        capacity -- number of distinct sentences the corpus can produce
+        message -- explanation of the error
+    """
+
+    def __init__(
+        self, topic: Optional[str], capacity: int, message: Optional[str] = None
+    ):
+        super().__init__(topic, message)
+        self.capacity = capacity
+
+
+class SharedPoolError(Error):
+    """
+    Raised when a generator on a shared pattern pool is asked to add, remove or weigh patterns,
+    which would change the pool under the other processes.
+
+    Attributes:
+        topic -- topic whose patterns were to be changed
+        message -- explanation of the error
+    """
+
+    def __init__(self, topic: Optional[str] = None, message: Optional[str] = None):
+        super().__init__(topic, message)
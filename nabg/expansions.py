@@ -0,0 +1,166 @@
+"""
+Random access to the expansions of sentence patterns.
+
+Every way of filling the placeholders of a pattern with words is an expansion. Expansions are
+numbered pattern by pattern, in corpus order, and within a pattern in the order of
+itertools.product() over the word lists of its placeholders. The i-th expansion is found with a
+binary search over the cumulative expansion counts of the patterns, after which i is read as a
+mixed-radix number whose digits are the positions of the words in their lists.
+"""
+
+import bisect
+import math
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from .bullshit_generator import Template
+
+__all__ = ["ExpansionRange", "expansion_counts", "unrank"]
+
+
+def expansion_counts(templates: Sequence["Template"]) -> List[int]:
+    """
+    Count the expansions of compiled templates.
+
+    Args:
+        templates (Sequence[Template]): Compiled templates
+
+    Returns:
+        List[int]: Product of the sizes of the word lists used by each template
+    """
+    return [math.prod(len(words) for words, _ in slots) for _, slots in templates]
+
+
+def unrank(templates: Sequence["Template"], bounds: Sequence[int], index: int) -> str:
+    """
+    Render the expansion with a given number.
+
+    Args:
+        templates (Sequence[Template]): Compiled templates
+        bounds (Sequence[int]): Cumulative expansion counts of the templates
+        index (int): Number of the expansion, in range(bounds[-1])
+
+    Returns:
+        str: Rendered expansion, before cleaning
+    """
+    position = bisect.bisect_right(bounds, index)
+    if position:
+        index -= bounds[position - 1]
+    text, slots = templates[position]
+    words = [""] * len(slots)
+    for slot in range(len(slots) - 1, -1, -1):
+        index, digit = divmod(index, len(slots[slot][0]))
+        words[slot] = slots[slot][0][digit]
+    parts = [text]
+    for word, (_, literal) in zip(words, slots):
+        parts.append(word)
+        parts.append(literal)
+    return "".join(parts)
+
+
+def _walk(template: "Template", offset: int, count: int) -> Iterator[str]:
+    # Render count consecutive expansions of a template, incrementing the digits like an odometer
+    text, slots = template
+    sizes = [len(words) for words, _ in slots]
+    digits = [0] * len(slots)
+    for slot in range(len(slots) - 1, -1, -1):
+        offset, digits[slot] = divmod(offset, sizes[slot])
+    for _ in range(count):
+        parts = [text]
+        for (words, literal), digit in zip(slots, digits):
+            parts.append(words[digit])
+            parts.append(literal)
+        yield "".join(parts)
+        slot = len(slots) - 1
+        while slot >= 0:
+            digits[slot] += 1
+            if digits[slot] < sizes[slot]:
+                break
+            digits[slot] = 0
+            slot -= 1
+
+
+class ExpansionRange:
+    """
+    Lazy, immutable view over a range of expansions. Indexing renders one expansion in
+    O(placeholders); slicing returns another view without rendering anything, so disjoint
+    slices can be handed to parallel workers. Views can be pickled.
+
+    Attributes:
+        indices (range): Numbers of the expansions in the view.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence["Template"],
+        bounds: Sequence[int],
+        finish: Callable[[str], str],
+        indices: Optional[range] = None,
+    ):
+        """
+        Constructor for ExpansionRange.
+
+        Args:
+            templates (Sequence[Template]): Compiled templates
+            bounds (Sequence[int]): Cumulative expansion counts of the templates
+            finish (Callable[[str], str]): Cleans a rendered expansion into a sentence
+            indices (range, optional): Numbers of the expansions in the view. Defaults to every expansion.
+        """
+        self._templates = templates
+        self._bounds = bounds
+        self._finish = finish
+        self.indices = (
+            indices if indices is not None else range(bounds[-1] if bounds else 0)
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Number of expansions in the view. Unlike len(), works beyond sys.maxsize.
+        """
+        start, stop, step = self.indices.start, self.indices.stop, self.indices.step
+        if step > 0:
+            return max(0, (stop - start + step - 1) // step)
+        return max(0, (start - stop - step - 1) // -step)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "ExpansionRange"]:
+        if isinstance(index, slice):
+            return ExpansionRange(
+                self._templates, self._bounds, self._finish, self.indices[index]
+            )
+        return self._finish(unrank(self._templates, self._bounds, self.indices[index]))
+
+    def __iter__(self) -> Iterator[str]:
+        indices, bounds = self.indices, self._bounds
+        if indices.step != 1:
+            for index in indices:
+                yield self._finish(unrank(self._templates, bounds, index))
+            return
+        index, stop = indices.start, indices.stop
+        while index < stop:
+            position = bisect.bisect_right(bounds, index)
+            base = bounds[position - 1] if position else 0
+            end = min(stop, bounds[position])
+            for sentence in _walk(self._templates[position], index - base, end - index):
+                yield self._finish(sentence)
+            index = end
+
+    def split(self, parts: int) -> List["ExpansionRange"]:
+        """
+        Split the view into contiguous, disjoint views of nearly equal sizes.
+
+        Args:
+            parts (int): Number of views
+
+        Returns:
+            List[ExpansionRange]: Views covering the whole view, in order
+        """
+        size = self.size
+        cuts = [size * part // parts for part in range(parts + 1)]
+        return [self[start:stop] for start, stop in zip(cuts, cuts[1:])]
+
+    def __repr__(self) -> str:
+        return f"ExpansionRange({self.indices!r})"
@@ -0,0 +1,280 @@
+"""
+Single-pass formatting of generated sentences.
+
+Every generated sentence is tidied up by three rules, which were historically applied with regular
+expressions over the whole sentence:
+
+    articles        -- "a" or "A" followed by a space and a lowercase vowel becomes "an" or "An"
+                       (r"(^|\\W)([Aa]) ([aeiou])")
+    capitalization  -- the first character is upper-cased
+    spacing         -- a space is inserted between "." or "?" and a word character
+                       (r"([\\.\\?])(\\w)")
+
+SentenceFormatter applies the rules while assembling a template, instead of scanning the sentence
+afterwards. The literal text of a template is formatted once for every kind of word that can border
+it, so that rendering only has to look at the first and last character of each chosen word to pick
+the right variant (e.g. "a " before a word starting with a vowel becomes "an "). Word lists are
+classified once: if a list holds a word that could take part in a rule through more than its first
+and last character (e.g. "a elephant" or "such a"), templates using it fall back to the regular
+expressions. Either way, the output is exactly that of the regular expressions.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .wordlists import WeightedWordList
+
+__all__ = [
+    "SentenceFormatter",
+    "clean_sentence",
+    "insert_space_between_sentences",
+    "is_regular_word",
+    "replace_a_with_an",
+]
+
+_ARTICLE = re.compile(r"(^|\W)([Aa]) ([aeiou])")
+_ARTICLE_START = re.compile(r"[Aa] [aeiou]")
+_SPACING = re.compile(r"([\.\?])(\w)")
+
+# Stand-ins for the words bordering a literal. Only their class matters to the rules:
+# what follows a literal is a lowercase vowel, another word character or anything else
+# (or the end of the sentence); what precedes it is a word character or anything else
+# (or the start of the sentence).
+_AFTER = ("e", "z", "-", "")
+_BEFORE = ("x", "-", "")
+_START = 2
+_END = 3
+
+# A literal is either formatted the same way whatever borders it, or has one variant
+# per (word before, word after) class, indexed by before * 4 + after.
+Piece = Union[str, Tuple[Optional[str], ...]]
+
+
+def replace_a_with_an(sentence: str) -> str:
+    """
+    Replace 'a [vowel]' with 'an [vowel]'.
+
+    Args:
+        sentence (str): Sentence to modify
+
+    Returns:
+        str: Sentence with 'a [vowel]' replaced with 'an [vowel]'
+    """
+    return _ARTICLE.sub(r"\1\2n \3", sentence)
+
+
+def insert_space_between_sentences(text: str) -> str:
+    """
+    Insert a space after periods and question marks.
+
+    Args:
+        text (str): Paragraph to be formatted
+
+    Returns:
+        str: Formatted paragraph.
+    """
+    return _SPACING.sub(r"\1 \2", text)
+
+
+def clean_sentence(sentence: str) -> str:
+    """
+    Fix articles and capitalize a generated sentence.
+
+    Args:
+        sentence (str): Generated sentence to clean up
+
+    Returns:
+        str: Cleaned-up sentence
+    """
+    result = replace_a_with_an(sentence)
+    return result[0].upper() + result[1:]
+
+
+def _is_word_char(char: str) -> bool:
+    # Same as re.match(r"\w", char)
+    return char.isalnum() or char == "_"
+
+
+def is_regular_word(word: str) -> bool:
+    """
+    Check whether a word can only take part in the formatting rules through its first and last
+    characters, so that the text around it can be formatted in advance.
+
+    Args:
+        word (str): Word to check
+
+    Returns:
+        bool: True if the word is regular
+    """
+    if not word or word[0] == " " or word[-1] in ".?":
+        return False
+    # Articles at the edges of the word, e.g. "such a", "a " or "a elephant"
+    if word[-1] in "Aa" and (len(word) == 1 or not _is_word_char(word[-2])):
+        return False
+    if word[-2:] in ("a ", "A "):
+        return False
+    if _ARTICLE_START.match(word):
+        return False
+    # Rules that apply within the word
+    return not (_ARTICLE.search("x" + word) or _SPACING.search(word))
+
+
+def _after_class(word: str) -> int:
+    char = word[0]
+    if char in "aeiou":
+        return 0
+    return 1 if char.isalnum() or char == "_" else 2
+
+
+def _before_class(word: str) -> int:
+    char = word[-1]
+    return 0 if char.isalnum() or char == "_" else 1
+
+
+def _format_literal(before: str, literal: str, after: str, capitalize: bool) -> str:
+    # Apply the rules to a literal between stand-ins, then cut the stand-ins off. The rules
+    # never insert anything into a stand-in, so the literal's text stays aligned.
+    text = insert_space_between_sentences(replace_a_with_an(before + literal + after))
+    text = text[len(before) : len(text) - len(after)]
+    if capitalize and text:
+        text = text[0].upper() + text[1:]
+    return text
+
+
+def _literal_piece(literal: str, first: bool, last: bool) -> Piece:
+    variants: List[Optional[str]] = [None] * 12
+    for before in (_START,) if first else (0, 1):
+        for after in (_END,) if last else (0, 1, 2):
+            variants[before * 4 + after] = _format_literal(
+                _BEFORE[before], literal, _AFTER[after], first
+            )
+    distinct = set(variant for variant in variants if variant is not None)
+    return distinct.pop() if len(distinct) == 1 else tuple(variants)
+
+
+class SentenceFormatter:
+    """
+    Renders compiled templates into formatted sentences, formatting literal text in advance.
+    Formatting plans are built when a template is first rendered and kept until invalidate().
+    """
+
+    def __init__(self):
+        """
+        Constructor for SentenceFormatter.
+        """
+        # Plans keyed by template id, stored with the template to guard against id reuse
+        self._plans: Dict[
+            int, Tuple[Any, Optional[Tuple[Piece, Tuple[Piece, ...]]]]
+        ] = {}
+        self._regular_lists: Dict[int, Tuple[Sequence[str], bool]] = {}
+
+    def invalidate(self):
+        """
+        Forget every plan and word list classification, e.g. after the corpus changed.
+        """
+        self._plans = {}
+        self._regular_lists = {}
+
+    def is_regular_list(self, words: Sequence[str]) -> bool:
+        """
+        Check whether every word of a list is regular (see is_regular_word()). The result is
+        computed once per list.
+
+        Args:
+            words (Sequence[str]): Word list to check
+
+        Returns:
+            bool: True if every word is regular
+        """
+        entry = self._regular_lists.get(id(words))
+        if entry is None or entry[0] is not words:
+            unweighted = words.words if isinstance(words, WeightedWordList) else words
+            entry = (words, all(map(is_regular_word, unweighted)))
+            self._regular_lists[id(words)] = entry
+        return entry[1]
+
+    def pick_words(self, template: Any, rng: Any) -> List[str]:
+        """
+        Pick a random word for every placeholder of a template.
+
+        Args:
+            template (Template): Compiled template
+            rng (random.Random): Random number generator
+
+        Returns:
+            List[str]: Picked words
+        """
+        choice = rng.choice
+        picked = []
+        for words, _ in template[1]:
+            if words.__class__ is WeightedWordList:
+                picked.append(words.pick(rng.random))
+            else:
+                picked.append(choice(words))
+        return picked
+
+    def format(self, template: Any, words: List[str]) -> str:
+        """
+        Assemble a template with picked words into a formatted sentence, the same as
+        insert_space_between_sentences(clean_sentence(rendered sentence)).
+
+        Args:
+            template (Template): Compiled template
+            words (List[str]): Word picked for every placeholder
+
+        Returns:
+            str: Formatted sentence
+        """
+        entry = self._plans.get(id(template))
+        if entry is None or entry[0] is not template:
+            entry = (template, self._plan(template))
+            self._plans[id(template)] = entry
+        plan = entry[1]
+        text, slots = template
+        if plan is None:
+            parts = [text]
+            for word, (_, literal) in zip(words, slots):
+                parts.append(word)
+                parts.append(literal)
+            return insert_space_between_sentences(clean_sentence("".join(parts)))
+        piece, pieces = plan
+        if not words:
+            return piece
+        parts = []
+        before = _START
+        for word, next_piece in zip(words, pieces):
+            if piece.__class__ is str:
+                parts.append(piece)
+            else:
+                parts.append(piece[before * 4 + _after_class(word)])
+            if before == _START and not text:
+                word = word[0].upper() + word[1:]
+            parts.append(word)
+            before = _before_class(word)
+            piece = next_piece
+        parts.append(piece if piece.__class__ is str else piece[before * 4 + _END])
+        return "".join(parts)
+
+    def render(self, template: Any, rng: Any) -> str:
+        """
+        Render a template with random words into a formatted sentence.
+
+        Args:
+            template (Template): Compiled template
+            rng (random.Random): Random number generator
+
+        Returns:
+            str: Formatted sentence
+        """
+        return self.format(template, self.pick_words(template, rng))
+
+    def _plan(self, template: Any) -> Optional[Tuple[Piece, Tuple[Piece, ...]]]:
+        text, slots = template
+        if not all(self.is_regular_list(words) for words, _ in slots):
+            return None
+        lead = _literal_piece(text, True, not slots)
+        pieces = tuple(
+            _literal_piece(literal, False, i == len(slots) - 1)
+            for i, (_, literal) in enumerate(slots)
+        )
+        return lead, pieces
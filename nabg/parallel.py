@@ -0,0 +1,142 @@
+"""
+Generate bullshit on several processes at once.
+
+The requested sentences are split into fixed-size chunks. Every chunk is generated by a
+freshly reset generator whose random number generator is seeded from the base seed and the
+chunk's position, and chunks are handed back in order. The output for a given seed therefore
+doesn't depend on how many worker processes are used or how they are scheduled.
+"""
+
+import collections
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from .bullshit_generator import BullshitGenerator
+from .default_patterns import sentence_patterns as default_patterns
+from .default_vocabulary import bullshit_words as default_vocabulary
+
+__all__ = ["generate_parallel"]
+
+# Generator owned by a worker process, built once by the pool initializer
+_worker_generator: Optional[BullshitGenerator] = None
+
+
+def _init_worker(
+    sentence_patterns: Dict[str, List[str]], vocabulary: Dict[str, List[str]]
+):
+    global _worker_generator
+    _worker_generator = BullshitGenerator(sentence_patterns, vocabulary)
+
+
+def _generate_chunk(
+    bullshit_generator: BullshitGenerator, topic: str, count: int, seed: str
+) -> List[str]:
+    bullshit_generator.rng.seed(seed)
+    bullshit_generator.reset_sentence_patterns()
+    return list(bullshit_generator.ionize_iter(count, topic))
+
+
+def _generate_worker_chunk(topic: str, count: int, seed: str) -> List[str]:
+    return _generate_chunk(_worker_generator, topic, count, seed)
+
+
+def generate_parallel(
+    number_of_sentences: int,
+    topic: Optional[str] = None,
+    workers: Optional[int] = None,
+    seed: Optional[Any] = None,
+    sentence_patterns: Optional[Dict[str, List[str]]] = None,
+    vocabulary: Optional[Dict[str, List[str]]] = None,
+    chunk_size: int = 10000,
+) -> Iterator[str]:
+    """
+    Generate bullshit on a pool of worker processes, streaming sentences back in a deterministic order.
+    Patterns aren't repeated within a chunk of sentences, but may repeat across chunks.
+
+    Args:
+        number_of_sentences (int): Number of sentences to generate
+        topic (str, optional): Topic on which to generate text. Picked at random from the seed if not provided.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        seed (Any, optional): Base seed. The same seed always yields the same sentences.
+            A random seed is used if not provided.
+        sentence_patterns (Dict[str, List[str]], optional): Corpus of sentence patterns. Defaults to
+            the new-age bullshit patterns.
+        vocabulary (Dict[str, List[str]], optional): Vocabulary of terms. Defaults to the new-age
+            bullshit vocabulary.
+        chunk_size (int, optional): Number of sentences generated per task. Defaults to 10000.
+
+    Raises:
+        InvalidTopicError: If the topic is not present in the pattern pool
+        ValueError: If workers or chunk_size is lower than 1
+
+    Returns:
+        Iterator[str]: Generated sentences. Use BullshitGenerator.join_sentences() to assemble them
+            into text.
+    """
+    if sentence_patterns is None:
+        sentence_patterns = default_patterns
+    if vocabulary is None:
+        vocabulary = default_vocabulary
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    bullshit_generator = BullshitGenerator(sentence_patterns, vocabulary)
+    if topic is None:
+        topic = random.Random(f"{seed}/topic").choice(bullshit_generator.list_topics())
+    bullshit_generator.validate_topic(topic)
+    # Arguments are checked above, when called, rather than on the first sentence
+    return _generate(
+        bullshit_generator,
+        number_of_sentences,
+        topic,
+        workers,
+        seed,
+        sentence_patterns,
+        vocabulary,
+        chunk_size,
+    )
+
+
+def _generate(
+    bullshit_generator: BullshitGenerator,
+    number_of_sentences: int,
+    topic: str,
+    workers: int,
+    seed: Any,
+    sentence_patterns: Dict[str, List[str]],
+    vocabulary: Dict[str, List[str]],
+    chunk_size: int,
+) -> Iterator[str]:
+    chunks = (
+        (topic, min(chunk_size, number_of_sentences - start), f"{seed}/{index}")
+        for index, start in enumerate(range(0, number_of_sentences, chunk_size))
+    )
+    if workers == 1:
+        for chunk in chunks:
+            yield from _generate_chunk(bullshit_generator, *chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(sentence_patterns, vocabulary),
+    ) as executor:
+        # Keep a bounded number of chunks in flight so memory stays flat for huge runs
+        window = 2 * workers
+        pending = collections.deque(
+            executor.submit(_generate_worker_chunk, *chunk)
+            for chunk in itertools.islice(chunks, window)
+        )
+        while pending:
+            sentences = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_generate_worker_chunk, *chunk))
+            yield from sentences
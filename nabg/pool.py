@@ -0,0 +1,480 @@
+"""
+Pool of unused sentence patterns for BullshitGenerator.
+
+Patterns are handed out as indices into each topic's list of patterns. Every topic walks
+through a pseudo-random permutation of its indices, given by a per-topic key, so the state
+of a topic is just a cursor and a key. Resetting the pool therefore costs O(topics), no
+matter how many patterns the corpus holds.
+
+Topics whose patterns are added or removed in the middle of a run can't be described by a
+permutation any more; their unused indices are kept in an explicit list until the next reset.
+Topics with pattern weights always keep such a list, ordered so that heavier patterns tend to
+be drawn earlier in the run.
+"""
+
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .sampling import AliasTable, weighted_order
+
+# Topics up to this size decode their permutation exactly from the key. 16! is below 2^45, so
+# reducing a 64-bit key modulo the number of permutations leaves a bias under 2^-19.
+_EXACT_SIZE = 16
+_FACTORIALS = [1]
+for _n in range(1, _EXACT_SIZE + 1):
+    _FACTORIALS.append(_FACTORIALS[-1] * _n)
+del _n
+# Larger topics use a Feistel network with round functions keyed by the full key
+_ROUNDS = 8
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+# Weighted topic draws that may land on exhausted topics before falling back to a linear pass
+_TOPIC_DRAWS = 8
+
+# Snapshot of a pool: the name, size, cursor, key and unused indices (None while the topic
+# walks its permutation) of every topic, followed by the available topics in their internal order.
+PoolState = Tuple[List[Tuple[str, int, int, int, Optional[List[int]]]], List[str]]
+
+
+def _mix(value: int) -> int:
+    # SplitMix64 finalizer: a bijection of 64-bit values with good avalanche
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def permute(index: int, size: int, key: int) -> int:
+    """
+    Map an index to its position in a keyed pseudo-random permutation of range(size).
+
+    Args:
+        index (int): Index to map, in range(size)
+        size (int): Number of elements in the permutation
+        key (int): 64-bit key selecting the permutation
+
+    Returns:
+        int: Permuted index, in range(size)
+    """
+    if size <= _EXACT_SIZE:
+        # Decode the key as the rank of a permutation (Lehmer code), so that every order of a
+        # small topic is equally likely, like with random.shuffle()
+        rank = key % _FACTORIALS[size]
+        items = list(range(size))
+        for position in range(index + 1):
+            digit, rank = divmod(rank, _FACTORIALS[size - 1 - position])
+            item = items.pop(digit)
+        return item
+    # Feistel rounds alternately update the high and low bits of the index, which may differ in
+    # width, so the network permutes range(2^bits) and cycle-walking takes under two steps on average
+    bits = max((size - 1).bit_length(), 2)
+    low_bits = bits // 2
+    low_mask = (1 << low_bits) - 1
+    high_mask = (1 << (bits - low_bits)) - 1
+    round_keys = [_mix((key + _GOLDEN64 * (r + 1)) & _MASK64) for r in range(_ROUNDS)]
+    while True:
+        high, low = index >> low_bits, index & low_mask
+        for round_number in range(0, _ROUNDS, 2):
+            high ^= _mix(low ^ round_keys[round_number]) & high_mask
+            low ^= _mix(high ^ round_keys[round_number + 1]) & low_mask
+        index = (high << low_bits) | low
+        # Cycle-walk until the index falls back into range(size)
+        if index < size:
+            return index
+
+
+def _weight_array(weights: Sequence[float], count: int) -> array:
+    weights = array("d", weights)
+    if len(weights) != count:
+        raise ValueError(f"Got {len(weights)} weights for {count} patterns")
+    if any(not 0 <= weight < float("inf") for weight in weights):
+        raise ValueError("Weights must be finite and non-negative")
+    return weights
+
+
+class PatternPool:
+    """
+    No-repeat pool of sentence pattern indices, separated into topics.
+
+    Attributes:
+        sizes (Dict[str, int]): Number of patterns in each topic.
+        rng (random.Random): Random number generator used to pick permutations and topics.
+    """
+
+    def __init__(self, sizes: Dict[str, int], rng: Optional[random.Random] = None):
+        """
+        Constructor for PatternPool.
+
+        Args:
+            sizes (Dict[str, int]): Number of patterns in each topic.
+            rng (random.Random, optional): Random number generator. A new one is created if not provided.
+        """
+        self.sizes = dict(sizes)
+        self.rng = rng if rng is not None else random.Random()
+        self._cursors: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}
+        # Unused indices of topics changed mid-run, in reverse drawing order
+        self._pending: Dict[str, List[int]] = {}
+        self._available: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._pattern_weights: Dict[str, array] = {}
+        self._topic_weights: Optional[Dict[str, float]] = None
+        self._topic_list: List[str] = []
+        self._topic_table: Optional[AliasTable] = None
+        self.reset()
+
+    def __len__(self) -> int:
+        """
+        Number of topics that have unused patterns remaining.
+        """
+        return len(self._available)
+
+    def reset(self):
+        """
+        Mark every pattern as unused and pick a new order for each topic.
+        """
+        getrandbits = self.rng.getrandbits
+        self._cursors = dict.fromkeys(self.sizes, 0)
+        self._keys = {topic: getrandbits(64) for topic in self.sizes}
+        self._pending = {}
+        for topic in self._pattern_weights:
+            self._pending[topic] = self._weighted_pending(
+                topic, range(self.sizes[topic])
+            )
+        self._available = [topic for topic, size in self.sizes.items() if size > 0]
+        self._positions = {topic: i for i, topic in enumerate(self._available)}
+
+    def shuffle(self):
+        """
+        Pick a new order for topics that haven't had any patterns drawn yet.
+        """
+        for topic, cursor in self._cursors.items():
+            if cursor == 0:
+                self._keys[topic] = self.rng.getrandbits(64)
+                if topic in self._pattern_weights:
+                    self._pending[topic] = self._weighted_pending(
+                        topic, range(self.sizes[topic])
+                    )
+                else:
+                    self._pending.pop(topic, None)
+
+    def set_topic_weights(self, weights: Optional[Dict[str, float]]):
+        """
+        Weigh the topics picked by random_topic(). Topics without a weight weigh 1.
+
+        Args:
+            weights (Dict[str, float], optional): Weight of every topic, or None to pick uniformly
+
+        Raises:
+            ValueError: If a weight is negative or not finite
+        """
+        topic_weights = None if weights is None else dict(weights)
+        # Build the table before changing anything, so that invalid weights leave the pool as it was
+        self._topic_list, self._topic_table = self._topic_table_for(topic_weights)
+        self._topic_weights = topic_weights
+
+    def set_pattern_weights(self, topic: str, weights: Optional[Sequence[float]]):
+        """
+        Weigh the patterns of a topic. Every pattern is still drawn once per run, but heavier
+        patterns tend to be drawn earlier. The patterns of the topic that are still unused are
+        reordered right away.
+
+        Args:
+            topic (str): Topic whose patterns to weigh
+            weights (Sequence[float], optional): Weight of every pattern, or None for a uniform order
+
+        Raises:
+            ValueError: If there isn't one weight per pattern, or if a weight is negative
+        """
+        size = self.sizes[topic]
+        if weights is None:
+            self._pattern_weights.pop(topic, None)
+            if self._cursors[topic] == 0:
+                self._pending.pop(topic, None)
+            return
+        weights = _weight_array(weights, size)
+        pending = self._materialize(topic, size)
+        self._pattern_weights[topic] = weights
+        self._pending[topic] = self._weighted_pending(topic, pending)
+
+    def is_available(self, topic: str) -> bool:
+        """
+        Check whether a topic has unused patterns remaining.
+
+        Args:
+            topic (str): Topic to check
+
+        Returns:
+            bool: True if the topic has unused patterns
+        """
+        return topic in self._positions
+
+    def available_topics(self) -> List[str]:
+        """
+        Get topics that have unused patterns remaining, in corpus order.
+
+        Returns:
+            List[str]: List of available topics
+        """
+        return [topic for topic in self.sizes if topic in self._positions]
+
+    def random_topic(self) -> str:
+        """
+        Choose a topic with unused patterns at random.
+
+        Raises:
+            IndexError: If no topic has unused patterns
+
+        Returns:
+            str: Randomly chosen topic
+        """
+        if self._topic_table is None:
+            return self.rng.choice(self._available)
+        random_float = self.rng.random
+        for _ in range(_TOPIC_DRAWS):
+            topic = self._topic_list[self._topic_table.sample(random_float)]
+            if topic in self._positions:
+                return topic
+        # Most of the weight sits on exhausted topics
+        weights = [self._topic_weights.get(topic, 1.0) for topic in self._available]
+        if not any(weights):
+            return self.rng.choice(self._available)
+        return self.rng.choices(self._available, weights)[0]
+
+    def remaining(self, topic: str) -> List[int]:
+        """
+        Get the unused pattern indices of a topic, in the order they will be drawn.
+
+        Args:
+            topic (str): Topic to inspect
+
+        Returns:
+            List[int]: Unused pattern indices
+        """
+        if topic in self._pending:
+            return self._pending[topic][::-1]
+        size, key = self.sizes[topic], self._keys[topic]
+        return [permute(i, size, key) for i in range(self._cursors[topic], size)]
+
+    def draw(self, topic: str) -> int:
+        """
+        Take the next unused pattern of a topic.
+
+        Args:
+            topic (str): Topic to draw from
+
+        Raises:
+            KeyError: If the topic has no unused patterns
+
+        Returns:
+            int: Index of the pattern within the topic
+        """
+        if topic not in self._positions:
+            raise KeyError(topic)
+        cursor = self._cursors[topic]
+        size = self.sizes[topic]
+        self._cursors[topic] = cursor + 1
+        if cursor + 1 == size:
+            self._remove_available(topic)
+        pending = self._pending.get(topic)
+        if pending is not None:
+            return pending.pop()
+        return permute(cursor, size, self._keys[topic])
+
+    def add(self, topic: str, count: int, weights: Optional[Sequence[float]] = None):
+        """
+        Append unused patterns to a topic, creating the topic if needed. The new patterns get the
+        indices following the topic's existing ones and are mixed into its unused patterns.
+
+        Args:
+            topic (str): Topic to extend
+            count (int): Number of patterns to add
+            weights (Sequence[float], optional): Weight of every new pattern. Defaults to 1 for
+                topics with pattern weights.
+
+        Raises:
+            ValueError: If there isn't one weight per new pattern, or if a weight is negative
+        """
+        # Validate the weights before changing anything
+        if weights is not None:
+            weights = _weight_array(weights, count)
+        if topic not in self.sizes:
+            self.sizes[topic] = 0
+            self._cursors[topic] = 0
+            self._keys[topic] = self.rng.getrandbits(64)
+            self._build_topic_table()
+        size = self.sizes[topic]
+        if weights is not None:
+            if topic not in self._pattern_weights:
+                self.set_pattern_weights(topic, [1.0] * size)
+        if topic in self._pattern_weights:
+            self._pattern_weights[topic].extend(
+                weights if weights is not None else [1.0] * count
+            )
+        self.sizes[topic] = size + count
+        if topic in self._pattern_weights:
+            pending = self._materialize(topic, size) + list(range(size, size + count))
+            self._pending[topic] = self._weighted_pending(topic, pending)
+        elif self._cursors[topic] or topic in self._pending:
+            pending = self._materialize(topic, size)
+            pending.extend(range(size, size + count))
+            self.rng.shuffle(pending)
+        # Untouched topics simply walk a permutation of the new size
+        if count and topic not in self._positions:
+            self._positions[topic] = len(self._available)
+            self._available.append(topic)
+
+    def remove(self, topic: str, indices: Iterable[int]):
+        """
+        Remove patterns from a topic, whether they have been used or not. The indices of the
+        remaining patterns shift down to stay contiguous, and a topic left without patterns is
+        removed from the pool.
+
+        Args:
+            topic (str): Topic to shrink
+            indices (Iterable[int]): Indices of the patterns to remove
+        """
+        size = self.sizes[topic]
+        removed = sorted(set(index for index in indices if 0 <= index < size))
+        if not removed:
+            return
+        if not self._cursors[topic] and topic not in self._pending:
+            self.sizes[topic] = size - len(removed)
+            if self.sizes[topic] == 0:
+                self._remove_available(topic)
+                for state in (self.sizes, self._cursors, self._keys):
+                    del state[topic]
+                self._build_topic_table()
+            return
+        # New index of every pattern, or None for removed patterns
+        remap: List[Optional[int]] = []
+        shift = 0
+        for index in range(size):
+            if shift < len(removed) and removed[shift] == index:
+                remap.append(None)
+                shift += 1
+            else:
+                remap.append(index - shift)
+        pending = [
+            remap[index]
+            for index in self._materialize(topic, size)
+            if remap[index] is not None
+        ]
+        self._pending[topic] = pending
+        if topic in self._pattern_weights:
+            self._pattern_weights[topic] = array(
+                "d",
+                (
+                    weight
+                    for index, weight in enumerate(self._pattern_weights[topic])
+                    if remap[index] is not None
+                ),
+            )
+        self.sizes[topic] = size - len(removed)
+        self._cursors[topic] = self.sizes[topic] - len(pending)
+        if not pending and topic in self._positions:
+            self._remove_available(topic)
+        if self.sizes[topic] == 0:
+            for state in (self.sizes, self._cursors, self._keys, self._pending):
+                del state[topic]
+            self._pattern_weights.pop(topic, None)
+            self._build_topic_table()
+
+    def get_state(self) -> PoolState:
+        """
+        Take a snapshot of the pool, which set_state() restores on a pool of the same topics.
+        Topic and pattern weights are configuration, not state, and aren't included.
+
+        Returns:
+            PoolState: Snapshot of the pool
+        """
+        topics = [
+            (
+                topic,
+                size,
+                self._cursors[topic],
+                self._keys[topic],
+                list(self._pending[topic]) if topic in self._pending else None,
+            )
+            for topic, size in self.sizes.items()
+        ]
+        return topics, list(self._available)
+
+    def set_state(self, state: PoolState):
+        """
+        Restore a snapshot taken by get_state(). The pool then draws exactly what the snapshotted
+        pool would have drawn, given the same random number generator state.
+
+        Args:
+            state (PoolState): Snapshot of a pool
+
+        Raises:
+            ValueError: If the snapshot was taken on a pool with other topics or sizes, or is inconsistent
+        """
+        topics, available = state
+        if [(topic, size) for topic, size, _, _, _ in topics] != list(
+            self.sizes.items()
+        ):
+            raise ValueError("The snapshot was taken on a pool with other topics")
+        for topic, size, cursor, _, pending in topics:
+            if not 0 <= cursor <= size or (
+                pending is not None
+                and (
+                    len(pending) != size - cursor
+                    or any(not 0 <= i < size for i in pending)
+                )
+            ):
+                raise ValueError(f"Inconsistent snapshot of topic {topic}")
+        if sorted(available) != sorted(
+            topic for topic, size, cursor, _, _ in topics if cursor < size
+        ):
+            raise ValueError("Inconsistent snapshot of available topics")
+        self._cursors = {topic: cursor for topic, _, cursor, _, _ in topics}
+        self._keys = {topic: key for topic, _, _, key, _ in topics}
+        self._pending = {
+            topic: list(pending)
+            for topic, _, _, _, pending in topics
+            if pending is not None
+        }
+        self._available = list(available)
+        self._positions = {topic: i for i, topic in enumerate(self._available)}
+
+    def _materialize(self, topic: str, size: int) -> List[int]:
+        # Switch the topic from its permutation of range(size) to an explicit list of unused indices
+        pending = self._pending.get(topic)
+        if pending is None:
+            key = self._keys[topic]
+            pending = [
+                permute(i, size, key)
+                for i in range(size - 1, self._cursors[topic] - 1, -1)
+            ]
+            self._pending[topic] = pending
+        return pending
+
+    def _weighted_pending(self, topic: str, indices: Iterable[int]) -> List[int]:
+        # Unused indices in reverse drawing order, heaviest patterns drawn first
+        order = weighted_order(
+            list(indices), self._pattern_weights[topic], self.rng.random
+        )
+        order.reverse()
+        return order
+
+    def _build_topic_table(self):
+        self._topic_list, self._topic_table = self._topic_table_for(self._topic_weights)
+
+    def _topic_table_for(
+        self, topic_weights: Optional[Dict[str, float]]
+    ) -> Tuple[List[str], Optional[AliasTable]]:
+        if topic_weights is None:
+            return self._topic_list, None
+        topic_list = list(self.sizes)
+        weights = [topic_weights.get(topic, 1.0) for topic in topic_list]
+        return topic_list, AliasTable(weights) if any(weights) else None
+
+    def _remove_available(self, topic: str):
+        # Swap the exhausted topic with the last one so removal is O(1)
+        position = self._positions.pop(topic)
+        last = self._available.pop()
+        if last != topic:
+            self._available[position] = last
+            self._positions[last] = position
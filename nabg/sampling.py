@@ -0,0 +1,91 @@
+"""
+Weighted random sampling for BullshitGenerator.
+
+Weighted choices use Vose's alias method: building a table over n weights costs O(n), after
+which every draw costs O(1) and a single random number, no matter how many entries there are.
+"""
+
+import math
+from array import array
+from typing import Callable, List, Sequence
+
+
+class AliasTable:
+    """
+    Alias table over a sequence of non-negative weights.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Constructor for AliasTable.
+
+        Args:
+            weights (Sequence[float]): Weight of every index. Weights need not sum to one.
+
+        Raises:
+            ValueError: If a weight is negative or not finite, or if no weight is positive
+        """
+        size = len(weights)
+        total = math.fsum(weights)
+        if any(not 0 <= weight < math.inf for weight in weights) or not total > 0:
+            raise ValueError("Weights must be finite, non-negative and not all zero")
+        self._probabilities = array("d", (weight * size / total for weight in weights))
+        self._aliases = array("I" if size <= 0xFFFFFFFF else "Q", range(size))
+        probabilities, aliases = self._probabilities, self._aliases
+        small = [i for i in range(size) if probabilities[i] < 1.0]
+        large = [i for i in range(size) if probabilities[i] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large[-1]
+            aliases[less] = more
+            probabilities[more] -= 1.0 - probabilities[less]
+            if probabilities[more] < 1.0:
+                small.append(large.pop())
+        # Whatever is left over is 1 up to rounding errors
+        for i in small + large:
+            probabilities[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._probabilities)
+
+    def sample(self, random: Callable[[], float]) -> int:
+        """
+        Draw a random index.
+
+        Args:
+            random (Callable[[], float]): Source of uniform floats in [0, 1), like random.Random.random
+
+        Returns:
+            int: Index drawn with probability proportional to its weight
+        """
+        scaled = random() * len(self._probabilities)
+        index = int(scaled)
+        if scaled - index < self._probabilities[index]:
+            return index
+        return self._aliases[index]
+
+
+def weighted_order(
+    indices: Sequence[int], weights: Sequence[float], random: Callable[[], float]
+) -> List[int]:
+    """
+    Randomly order indices without replacement, so that heavier indices tend to come first
+    (Efraimidis-Spirakis sampling). Indices with weight zero always come last.
+
+    Args:
+        indices (Sequence[int]): Indices to order
+        weights (Sequence[float]): Weight of every index, indexed by the index itself
+        random (Callable[[], float]): Source of uniform floats in [0, 1)
+
+    Returns:
+        List[int]: The indices in drawing order
+    """
+
+    def key(index: int) -> float:
+        weight = weights[index]
+        if weight <= 0:
+            return -math.inf
+        # log(u) / w orders the same as u ** (1 / w), without underflowing
+        return math.log(1.0 - random()) / weight
+
+    keys = {index: key(index) for index in indices}
+    return sorted(indices, key=keys.__getitem__, reverse=True)
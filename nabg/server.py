@@ -0,0 +1,265 @@
+"""
+HTTP server for bullshit generation, built on the standard library.
+
+A single long-lived, thread-safe generator serves every request, so the no-repeat pattern
+pool of each topic stays warm across requests and connections. Endpoints:
+
+    GET  /topics                       -- JSON list of available topics
+    GET  /ionize?n=N&topic=T           -- N sentences as plain text
+    GET  /stream?n=N&topic=T&lines=1   -- N sentences as a chunked plain text stream
+    POST /batch                        -- JSON list of {"n": N, "topic": T} objects in,
+                                          JSON list of texts out
+
+Requests for more sentences than the server's limits are rejected with 400 Bad Request, so a
+single request can't keep the server generating indefinitely. /ionize and /batch build their
+response in memory and have a lower limit than /stream.
+"""
+
+import itertools
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .bullshit_generator import BullshitGenerator, patterns, vocabulary
+from .errors import InvalidTopicError, NoPatternsAvailableError
+
+__all__ = ["BullshitServer", "BullshitRequestHandler", "serve"]
+
+# Default limits on the number of sentences of a request
+MAX_SENTENCES = 10_000
+MAX_STREAM_SENTENCES = 1_000_000
+
+
+class _ChunkedWriter:
+    """
+    File-like object writing everything it receives as HTTP/1.1 chunks.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, data: str):
+        encoded = data.encode("utf-8")
+        if encoded:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(encoded), encoded))
+
+    def close(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class BullshitRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for BullshitServer. Connections are kept alive between requests.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which would otherwise stall every
+    # keep-alive response on delayed ACKs.
+    disable_nagle_algorithm = True
+    server: "BullshitServer"
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        bullshit_generator = self.server.bullshit_generator
+        try:
+            if url.path == "/topics":
+                self._send_json(bullshit_generator.list_topics())
+            elif url.path == "/ionize":
+                n, topic = self._parse_request(query, self.server.max_sentences)
+                self._send_text(bullshit_generator.ionize(n, topic))
+            elif url.path == "/stream":
+                n, topic = self._parse_request(query, self.server.max_stream_sentences)
+                self._stream(n, topic, query.get("lines", ["0"])[0] == "1")
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+        except ValueError as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+        except InvalidTopicError as error:
+            self._send_error(HTTPStatus.NOT_FOUND, error.message)
+        except NoPatternsAvailableError as error:
+            self._send_error(HTTPStatus.CONFLICT, error.message)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            return
+        if not length.strip().isdecimal():
+            # The body can't be skipped, so the connection can't be reused
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"Invalid Content-Length {length!r}"
+            )
+            return
+        try:
+            body = self.rfile.read(int(length))
+            if url.path != "/batch":
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+                return
+            requests = [
+                self._check_request(
+                    item.get("n", 1), item.get("topic"), self.server.max_sentences
+                )
+                for item in json.loads(body)
+            ]
+            if sum(n for n, _ in requests) > self.server.max_sentences:
+                raise ValueError(
+                    f"at most {self.server.max_sentences} sentences per batch"
+                )
+            self._send_json(self.server.bullshit_generator.ionize_batch(requests))
+        except (ValueError, TypeError, AttributeError) as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Malformed batch: {error}")
+        except InvalidTopicError as error:
+            self._send_error(HTTPStatus.NOT_FOUND, error.message)
+        except NoPatternsAvailableError as error:
+            self._send_error(HTTPStatus.CONFLICT, error.message)
+
+    def _parse_request(
+        self, query: Dict[str, List[str]], limit: int
+    ) -> Tuple[int, Optional[str]]:
+        n = query.get("n", ["1"])[0]
+        try:
+            n = int(n)
+        except ValueError:
+            raise ValueError(f"n must be an integer, got {n!r}") from None
+        return self._check_request(n, query.get("topic", [None])[0], limit)
+
+    def _check_request(
+        self, n: Any, topic: Any, limit: int
+    ) -> Tuple[int, Optional[str]]:
+        # Batch items are JSON, where 2.9, "3" and true are not counts
+        if not isinstance(n, int) or isinstance(n, bool):
+            raise ValueError(f"n must be an integer, got {n!r}")
+        if n < 0:
+            raise ValueError("n must not be negative")
+        if n > limit:
+            raise ValueError(f"n must be at most {limit}")
+        if topic is not None and not isinstance(topic, str):
+            raise ValueError(f"topic must be a string, got {topic!r}")
+        return n, topic
+
+    def _stream(self, n: int, topic: Optional[str], lines: bool):
+        bullshit_generator = self.server.bullshit_generator
+        sentences = bullshit_generator.ionize_iter(n, topic)
+        # Generate the first sentence up front so that errors can still be reported
+        # with a proper status code.
+        first = list(itertools.islice(sentences, 1))
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        writer = _ChunkedWriter(self.wfile)
+        bullshit_generator.write_sentences(
+            writer, itertools.chain(first, sentences), one_per_line=lines
+        )
+        writer.close()
+
+    def _send_text(self, text: str, status: HTTPStatus = HTTPStatus.OK):
+        self._send_body(text.encode("utf-8"), "text/plain; charset=utf-8", status)
+
+    def _send_json(self, value: Any, status: HTTPStatus = HTTPStatus.OK):
+        self._send_body(json.dumps(value).encode("utf-8"), "application/json", status)
+
+    def _send_error(self, status: HTTPStatus, message: Optional[str]):
+        self._send_json({"error": message}, status)
+
+    def _send_body(self, body: bytes, content_type: str, status: HTTPStatus):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BullshitServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server sharing one long-lived generator between all requests.
+
+    Attributes:
+        bullshit_generator (BullshitGenerator): Thread-safe generator serving every request.
+        verbose (bool): Whether to log every request to stderr.
+        max_sentences (int): Most sentences served by a request to /ionize or a batch.
+        max_stream_sentences (int): Most sentences served by a request to /stream.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        bullshit_generator: Optional[BullshitGenerator] = None,
+        verbose: bool = False,
+        max_sentences: int = MAX_SENTENCES,
+        max_stream_sentences: int = MAX_STREAM_SENTENCES,
+    ):
+        """
+        Constructor for BullshitServer.
+
+        Args:
+            address (Tuple[str, int]): Host and port to listen on
+            bullshit_generator (BullshitGenerator, optional): Thread-safe generator to serve requests with.
+                Defaults to a new-age bullshit generator.
+            verbose (bool, optional): Log every request to stderr. Defaults to False.
+            max_sentences (int, optional): Most sentences served by a request to /ionize or a batch.
+                Defaults to 10,000.
+            max_stream_sentences (int, optional): Most sentences served by a request to /stream.
+                Defaults to 1,000,000.
+
+        Raises:
+            ValueError: If the generator isn't thread-safe
+        """
+        if bullshit_generator is None:
+            bullshit_generator = BullshitGenerator(
+                patterns, vocabulary, thread_safe=True
+            )
+        if not bullshit_generator.thread_safe:
+            raise ValueError("The server needs a thread-safe generator")
+        self.bullshit_generator = bullshit_generator
+        self.verbose = verbose
+        self.max_sentences = max_sentences
+        self.max_stream_sentences = max_stream_sentences
+        super().__init__(address, BullshitRequestHandler)
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    bullshit_generator: Optional[BullshitGenerator] = None,
+    verbose: bool = False,
+    max_sentences: int = MAX_SENTENCES,
+    max_stream_sentences: int = MAX_STREAM_SENTENCES,
+):
+    """
+    Serve bullshit over HTTP until interrupted.
+
+    Args:
+        host (str, optional): Host to listen on. Defaults to 127.0.0.1.
+        port (int, optional): Port to listen on. Defaults to 8000.
+        bullshit_generator (BullshitGenerator, optional): Thread-safe generator to serve requests with.
+            Defaults to a new-age bullshit generator.
+        verbose (bool, optional): Log every request to stderr. Defaults to False.
+        max_sentences (int, optional): Most sentences served by a request to /ionize or a batch.
+            Defaults to 10,000.
+        max_stream_sentences (int, optional): Most sentences served by a request to /stream.
+            Defaults to 1,000,000.
+    """
+    with BullshitServer(
+        (host, port),
+        bullshit_generator,
+        verbose,
+        max_sentences,
+        max_stream_sentences,
+    ) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
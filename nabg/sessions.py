@@ -0,0 +1,446 @@
+"""
+Shared corpora and lightweight generation sessions, for serving many users at once.
+
+A BullshitGenerator compiles its own templates and keeps its own formatting plans, so one
+generator per user costs memory in proportion to the corpus. A Corpus is compiled once and never
+changes, so any number of sessions can share it. A Session holds only what differs between users:
+its position in the pattern pool and its random number generator. SessionCache keeps the sessions
+of recently active users and evicts idle ones.
+"""
+
+import collections
+import itertools
+import random
+import threading
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .bullshit_generator import BullshitGenerator, ParsedPattern
+from .errors import InvalidStateError, InvalidTopicError, NoPatternsAvailableError
+from .expansions import ExpansionRange
+from .pool import PatternPool
+from .state import decode_state, encode_state
+
+__all__ = ["Corpus", "Session", "SessionCache"]
+
+OutOfPatternsBehavior = BullshitGenerator.OutOfPatternsBehavior
+
+
+class Corpus:
+    """
+    Immutable, compiled corpus of sentence patterns and vocabulary, shared by sessions.
+    Reading from a corpus is thread-safe.
+    """
+
+    def __init__(
+        self,
+        sentence_patterns: Dict[str, List[str]],
+        vocabulary: Dict[str, List[str]],
+        parsed_patterns: Optional[Dict[str, List[ParsedPattern]]] = None,
+        topic_weights: Optional[Dict[str, float]] = None,
+        pattern_weights: Optional[Dict[str, Sequence[float]]] = None,
+    ):
+        """
+        Constructor for Corpus.
+
+        Args:
+            sentence_patterns (Dict[str, List[str]]): The corpus of sentence patterns separated into topics.
+            vocabulary (Dict[str, List[str]]): The vocabulary of terms separated into types.
+            parsed_patterns (Dict[str, List[ParsedPattern]], optional): The sentence patterns already parsed
+                with parse_pattern(), to skip parsing.
+            topic_weights (Dict[str, float], optional): Weights of topics chosen at random by sessions
+                (see BullshitGenerator.set_topic_weights()).
+            pattern_weights (Dict[str, Sequence[float]], optional): Weights of the sentence patterns of
+                some topics (see BullshitGenerator.set_pattern_weights()).
+
+        Raises:
+            InvalidVocabularyTypeError: If a pattern uses a type that has no words in the vocabulary
+            ValueError: If a weight is negative or not finite, or if the weights of a topic don't match
+                its patterns
+        """
+        sentence_patterns = {
+            topic: tuple(sentences) for topic, sentences in sentence_patterns.items()
+        }
+        vocabulary = {
+            vocab_type: tuple(words) if isinstance(words, list) else words
+            for vocab_type, words in vocabulary.items()
+        }
+        # The generator compiles the corpus once and serves read-only queries afterwards. It is
+        # never handed out, so its corpus never changes.
+        self._generator = BullshitGenerator(
+            sentence_patterns,
+            vocabulary,
+            parsed_patterns=parsed_patterns,
+            topic_weights=topic_weights,
+            pattern_weights=pattern_weights,
+        )
+        self._templates, self._formatter = self._generator._frozen_templates()
+        self._sizes = {
+            topic: len(templates) for topic, templates in self._templates.items()
+        }
+        self._topic_weights = None if topic_weights is None else dict(topic_weights)
+        self._pattern_weights = {
+            topic: tuple(weights) for topic, weights in (pattern_weights or {}).items()
+        }
+        self.sentence_patterns: Mapping[str, Sequence[str]] = MappingProxyType(
+            sentence_patterns
+        )
+        self.vocabulary: Mapping[str, Sequence[str]] = MappingProxyType(
+            self._generator.vocabulary
+        )
+
+    def list_topics(self) -> List[str]:
+        """
+        Get the topics of the corpus.
+
+        Returns:
+            List[str]: List of topics
+        """
+        return list(self.sentence_patterns)
+
+    def capacity(self, topic: Optional[str] = None) -> int:
+        """
+        Count the distinct sentences a topic can produce (see BullshitGenerator.capacity()).
+
+        Args:
+            topic (str, optional): Topic to count. Counts every topic if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the corpus
+
+        Returns:
+            int: Number of distinct sentences
+        """
+        return self._generator.capacity(topic)
+
+    def expansions(self, topic: Optional[str] = None) -> ExpansionRange:
+        """
+        Get a lazy view over every expansion of a topic (see BullshitGenerator.expansions()).
+
+        Args:
+            topic (str, optional): Topic to enumerate. Enumerates every topic, in corpus order, if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the corpus
+
+        Returns:
+            ExpansionRange: View over the expansions
+        """
+        return self._generator.expansions(topic)
+
+    def session(
+        self,
+        seed: Optional[Any] = None,
+        rng: Optional[random.Random] = None,
+        out_of_patterns: OutOfPatternsBehavior = OutOfPatternsBehavior.RANDOM_TOPIC,
+        auto_reset: bool = True,
+    ) -> "Session":
+        """
+        Start a session on the corpus.
+
+        Args:
+            seed (Any, optional): Seed for the session's random number generator. Ignored if rng is provided.
+            rng (random.Random, optional): Random number generator to use instead of a seeded one.
+            out_of_patterns (BullshitGenerator.OutOfPatternsBehavior, optional): What to do when a
+                requested topic runs out of patterns. Defaults to RANDOM_TOPIC.
+            auto_reset (bool, optional): Start a new run once every pattern has been used, instead of
+                raising a NoPatternsAvailableError. Defaults to True.
+
+        Returns:
+            Session: New session, with every pattern unused
+        """
+        return Session(self, seed, rng, out_of_patterns, auto_reset)
+
+
+class Session:
+    """
+    One user's no-repeat run over a shared corpus: a pattern pool and a random number generator.
+    Patterns aren't repeated within a run of a session, whatever other sessions do. A session is
+    not thread-safe; give every thread its own, or serialize access to it.
+
+    Attributes:
+        corpus (Corpus): The corpus the session draws from.
+        rng (random.Random): The random number generator behind every random choice of the session.
+    """
+
+    __slots__ = ("corpus", "rng", "_pool", "_out_of_patterns", "_auto_reset")
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        seed: Optional[Any] = None,
+        rng: Optional[random.Random] = None,
+        out_of_patterns: OutOfPatternsBehavior = OutOfPatternsBehavior.RANDOM_TOPIC,
+        auto_reset: bool = True,
+    ):
+        """
+        Constructor for Session. Sessions are usually started with Corpus.session().
+
+        Args:
+            corpus (Corpus): The corpus to draw from
+            seed (Any, optional): Seed for the session's random number generator. Ignored if rng is provided.
+            rng (random.Random, optional): Random number generator to use instead of a seeded one.
+            out_of_patterns (BullshitGenerator.OutOfPatternsBehavior, optional): What to do when a
+                requested topic runs out of patterns. Defaults to RANDOM_TOPIC.
+            auto_reset (bool, optional): Start a new run once every pattern has been used, instead of
+                raising a NoPatternsAvailableError. Defaults to True.
+        """
+        self.corpus = corpus
+        self.rng = rng if rng is not None else random.Random(seed)
+        self._pool = PatternPool(corpus._sizes, self.rng)
+        if corpus._topic_weights is not None:
+            self._pool.set_topic_weights(corpus._topic_weights)
+        for topic, weights in corpus._pattern_weights.items():
+            self._pool.set_pattern_weights(topic, weights)
+        self._out_of_patterns = out_of_patterns
+        self._auto_reset = auto_reset
+
+    def list_available_topics(self) -> List[str]:
+        """
+        Get topics that have unused patterns remaining in the run.
+
+        Returns:
+            List[str]: List of available topics
+        """
+        return self._pool.available_topics()
+
+    def reset(self):
+        """
+        Start a new run, marking every pattern as unused.
+        """
+        self._pool.reset()
+
+    def get_state(self) -> bytes:
+        """
+        Save the progress of the session's run (see BullshitGenerator.get_state()).
+
+        Raises:
+            ValueError: If the session's random number generator isn't a random.Random
+
+        Returns:
+            bytes: Saved state, to be restored with set_state()
+        """
+        return encode_state(self._pool.get_state(), self.rng.getstate())
+
+    def set_state(self, state: bytes):
+        """
+        Restore the progress of a run saved by get_state(), possibly by a session on a copy of the
+        corpus in another process.
+
+        Args:
+            state (bytes): Saved state
+
+        Raises:
+            InvalidStateError: If the state is corrupt or was saved on another corpus
+        """
+        pool_state, rng_state = decode_state(state, list(self.corpus._sizes.items()))
+        try:
+            self._pool.set_state(pool_state)
+        except ValueError as error:
+            raise InvalidStateError(message=f"Corrupt session state: {error}")
+        self.rng.setstate(rng_state)
+
+    def generate_sentence(self, topic: str) -> str:
+        """
+        Generate a single sentence on a particular topic.
+
+        Args:
+            topic (str): Topic on which to generate a sentence
+
+        Raises:
+            KeyError: If the topic is invalid or has no unused patterns
+
+        Returns:
+            str: Generated sentence
+        """
+        template = self.corpus._templates[topic][self._pool.draw(topic)]
+        return self.corpus._formatter.render(template, self.rng)
+
+    def iter_sentences(self, topic: Optional[str] = None) -> Iterator[str]:
+        """
+        Endlessly generate sentences, switching topics as the out-of-patterns behavior dictates.
+
+        Args:
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the corpus
+            NoPatternsAvailableError: If the session runs out of patterns and may not reset
+
+        Yields:
+            str: Generated sentences. Use BullshitGenerator.join_sentences() to assemble them into text.
+        """
+        pool = self._pool
+        if topic is None:
+            if len(pool) == 0:
+                self._handle_exhausted()
+            topic = pool.random_topic()
+        elif topic not in self.corpus._templates:
+            raise InvalidTopicError(
+                topic, f"Topic {topic} is not present in the pattern pool"
+            )
+        templates, render = self.corpus._templates, self.corpus._formatter.render
+        while True:
+            topic = self._resolve_topic(topic)
+            yield render(templates[topic][pool.draw(topic)], self.rng)
+
+    def ionize(self, number_of_sentences: int = 1, topic: Optional[str] = None) -> str:
+        """
+        Generate bullshit.
+
+        Args:
+            number_of_sentences (int, optional): Number of sentences to be generated. Defaults to 1.
+            topic (str, optional): Topic on which to generate text. Picks one at random if not provided.
+
+        Raises:
+            InvalidTopicError: If the topic is not present in the corpus
+            NoPatternsAvailableError: If the session runs out of patterns and may not reset
+
+        Returns:
+            str: Generated bullshit.
+        """
+        return BullshitGenerator.join_sentences(
+            itertools.islice(self.iter_sentences(topic), max(0, number_of_sentences))
+        )
+
+    def _resolve_topic(self, topic: str) -> str:
+        # Same rules as BullshitGenerator.resolve_sentence_topic(), without statistics or hooks
+        return BullshitGenerator._choose_topic(
+            self._pool,
+            topic,
+            self._out_of_patterns,
+            self._handle_exhausted,
+            self._pool.reset,
+        )
+
+    def _handle_exhausted(self):
+        if not self._auto_reset:
+            raise NoPatternsAvailableError(message="Ran out of patterns")
+        self._pool.reset()
+
+
+class SessionCache:
+    """
+    Least-recently-used cache of sessions on a shared corpus, keyed by user. Sessions are started
+    on first use, and the least recently used session is evicted once the cache is full, so an
+    evicted user starts a new run. The cache is thread-safe; the sessions it returns are not.
+
+    Attributes:
+        corpus (Corpus): The corpus sessions draw from.
+        max_sessions (int): Number of sessions kept at most.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        max_sessions: int = 10_000,
+        on_evict: Optional[Callable[[Hashable, Session], Any]] = None,
+        **session_kwargs: Any,
+    ):
+        """
+        Constructor for SessionCache.
+
+        Args:
+            corpus (Corpus): The corpus to start sessions on
+            max_sessions (int, optional): Number of sessions kept at most. Defaults to 10,000.
+            on_evict (Callable[[Hashable, Session], Any], optional): Called with the key and the session
+                of every evicted session, e.g. to persist it.
+            **session_kwargs: Further arguments for Corpus.session(), except seed and rng
+
+        Raises:
+            ValueError: If max_sessions is less than 1
+        """
+        if max_sessions < 1:
+            raise ValueError("A session cache must hold at least one session")
+        self.corpus = corpus
+        self.max_sessions = max_sessions
+        self._on_evict = on_evict
+        self._session_kwargs = session_kwargs
+        self._sessions: "collections.OrderedDict[Hashable, Session]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._sessions
+
+    def get(self, key: Hashable) -> Session:
+        """
+        Get the session of a user, starting one if the user has none, and mark it as recently used.
+
+        Args:
+            key (Hashable): Key of the user
+
+        Returns:
+            Session: The user's session
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+            session = self.corpus.session(**self._session_kwargs)
+            evicted = self._store(key, session)
+        self._notify(evicted)
+        return session
+
+    def put(self, key: Hashable, session: Session):
+        """
+        Store a session for a user, e.g. one restored after eviction, and mark it as recently used.
+
+        Args:
+            key (Hashable): Key of the user
+            session (Session): The user's session
+        """
+        with self._lock:
+            evicted = self._store(key, session)
+        self._notify(evicted)
+
+    def evict(self, key: Hashable) -> Optional[Session]:
+        """
+        Remove the session of a user, without calling on_evict.
+
+        Args:
+            key (Hashable): Key of the user
+
+        Returns:
+            Session: The removed session, or None if the user had none
+        """
+        with self._lock:
+            return self._sessions.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every session, without calling on_evict.
+        """
+        with self._lock:
+            self._sessions.clear()
+
+    def _store(self, key: Hashable, session: Session) -> List[Tuple[Hashable, Session]]:
+        # Insert a session as the most recently used one, and evict sessions beyond the limit
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            evicted.append(self._sessions.popitem(last=False))
+        return evicted
+
+    def _notify(self, evicted: List[Tuple[Hashable, Session]]):
+        # Callbacks run outside the lock, so they may use the cache
+        if self._on_evict is not None:
+            for key, session in evicted:
+                self._on_evict(key, session)
@@ -0,0 +1,444 @@
+"""
+Pattern pool shared between processes.
+
+Every topic of a pool walks a keyed permutation of its patterns, so its state is three 64-bit
+words: size, cursor and key. SharedPatternPool keeps these words in a multiprocessing.shared_memory
+block, so that generators in several processes (e.g. the workers of a prefork server) draw from a
+single no-repeat pool. Layout of the block:
+
+    4 bytes   -- magic number, b"NBSP"
+    1 byte    -- format version
+    3 bytes   -- padding
+    8 bytes   -- fingerprint of the topic names and sizes
+    8 bytes   -- number of topics
+    then 64-bit words, in native byte order:
+        number of topics with unused patterns
+        size, cursor and key of every topic, in corpus order
+
+Python has no atomic operations on shared memory, so every change to the block is made under a
+multiprocessing.RLock that the processes share. Drawing a pattern holds the lock for a few
+microseconds; filling in words happens outside of it. A generator built on a shared pool uses that
+lock for all of its pool operations, which makes resolving the topic of a sentence and drawing its
+pattern atomic across processes.
+"""
+
+import multiprocessing
+import random
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence
+
+from .errors import SharedPoolError
+from .pool import _TOPIC_DRAWS, PoolState, permute
+from .sampling import AliasTable
+from .state import topics_fingerprint
+
+__all__ = ["SharedPatternPool"]
+
+MAGIC = b"NBSP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sB3x8sQ")
+_WORD = 8
+
+
+class SharedPatternPool:
+    """
+    No-repeat pool of sentence pattern indices in shared memory, drawn from by several processes.
+    Pass it to BullshitGenerator(pool=...) in every process. Patterns can't be added, removed or
+    weighed, but topics can be.
+
+    Each generator works on its own view of the pool (see bind()), with the generator's random
+    number generator and topic weights, so generators on one pool don't affect each other's
+    choices. Only the used patterns are shared.
+
+    The creating process owns the shared memory block and should unlink() it once every process is
+    done. Other processes share the lock, so they are started by the creating process: they either
+    inherit the pool by forking, receive it as an argument of a new multiprocessing.Process, or
+    attach() to it by name with the inherited lock.
+
+    Attributes:
+        sizes (Dict[str, int]): Number of patterns in each topic.
+        rng (random.Random): Random number generator used to pick permutations and topics.
+        name (str): Name of the shared memory block.
+        lock (multiprocessing.RLock): Lock guarding the block, shared by every process.
+    """
+
+    def __init__(
+        self,
+        sizes: Dict[str, int],
+        name: Optional[str] = None,
+        lock: Optional[Any] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Constructor for SharedPatternPool. Creates a new shared memory block with every pattern unused.
+
+        Args:
+            sizes (Dict[str, int]): Number of patterns in each topic.
+            name (str, optional): Name of the shared memory block. A unique name is picked if not provided.
+            lock (multiprocessing.RLock, optional): Lock guarding the block. A new one is created if not provided.
+            rng (random.Random, optional): Random number generator. A new one is created if not provided.
+
+        Raises:
+            FileExistsError: If a shared memory block with that name already exists
+        """
+        size = _HEADER.size + _WORD * (1 + 3 * len(sizes))
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(
+            block.buf,
+            0,
+            MAGIC,
+            FORMAT_VERSION,
+            topics_fingerprint(list(sizes.items())),
+            len(sizes),
+        )
+        self._open(block, sizes, lock or multiprocessing.RLock(), rng)
+        self._owner = True
+        self._borrowed = False
+        words = self._words
+        for topic, offset in self._offsets.items():
+            words[offset] = sizes[topic]
+        self.reset()
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        sizes: Dict[str, int],
+        lock: Any,
+        rng: Optional[random.Random] = None,
+    ) -> "SharedPatternPool":
+        """
+        Attach to a pool created by another process, e.g. in a forked worker that only knows its name.
+
+        Args:
+            name (str): Name of the shared memory block
+            sizes (Dict[str, int]): Number of patterns in each topic, as given to the creating process
+            lock (multiprocessing.RLock): Lock of the pool, as given to or created by the creating process
+            rng (random.Random, optional): Random number generator. A new one is created if not provided.
+
+        Raises:
+            FileNotFoundError: If there is no shared memory block with that name
+            ValueError: If the block isn't a pattern pool, or holds other topics
+
+        Returns:
+            SharedPatternPool: The attached pool
+        """
+        block = shared_memory.SharedMemory(name=name)
+        pool = cls.__new__(cls)
+        pool._open(block, sizes, lock, rng)
+        pool._owner = False
+        pool._borrowed = False
+        return pool
+
+    def bind(self, rng: random.Random) -> "SharedPatternPool":
+        """
+        Get a view of the pool with its own random number generator and topic weights. Views
+        share the used patterns and the lock with the pool, and stay valid as long as it is open.
+        BullshitGenerator(pool=...) draws through a view bound to its own generator.
+
+        Args:
+            rng (random.Random): Random number generator of the view
+
+        Returns:
+            SharedPatternPool: View of the pool
+        """
+        view = self.__class__.__new__(self.__class__)
+        view._block = self._block
+        view._words = self._words
+        view.sizes = self.sizes
+        view.name = self.name
+        view.lock = self.lock
+        view.rng = rng
+        view._offsets = self._offsets
+        view._topic_weights = None
+        view._topic_list = self._topic_list
+        view._topic_table = None
+        view._owner = False
+        # The view doesn't release the block it borrows, and keeps the pool that does alive
+        view._borrowed = True
+        view._parent = self
+        return view
+
+    def _open(
+        self,
+        block: shared_memory.SharedMemory,
+        sizes: Dict[str, int],
+        lock: Any,
+        rng: Optional[random.Random],
+    ):
+        magic, version, fingerprint, count = _HEADER.unpack_from(block.buf)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            block.close()
+            raise ValueError(f"{block.name} is not a shared pattern pool")
+        if fingerprint != topics_fingerprint(list(sizes.items())):
+            block.close()
+            raise ValueError(f"{block.name} is a pattern pool of other topics")
+        self._block = block
+        end = _HEADER.size + _WORD * (1 + 3 * count)
+        self._words = block.buf[_HEADER.size : end].cast("Q")
+        self.sizes = dict(sizes)
+        self.name = block.name
+        self.lock = lock
+        self.rng = rng if rng is not None else random.Random()
+        # Offset of the size of every topic; the cursor and key follow it
+        self._offsets = {topic: 1 + 3 * i for i, topic in enumerate(sizes)}
+        self._topic_weights: Optional[Dict[str, float]] = None
+        self._topic_list: List[str] = list(sizes)
+        self._topic_table: Optional[AliasTable] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only picklable while spawning a process, like the lock
+        return {"name": self.name, "sizes": self.sizes, "lock": self.lock}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        block = shared_memory.SharedMemory(name=state["name"])
+        self._open(block, state["sizes"], state["lock"], None)
+        self._owner = False
+        self._borrowed = False
+
+    def __enter__(self) -> "SharedPatternPool":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __del__(self):
+        # Release the view of the block before the block itself is collected
+        if getattr(self, "_words", None) is not None:
+            self.close()
+
+    def close(self):
+        """
+        Detach this process from the pool. The pool can't be used by this process afterwards.
+        """
+        if self._words is not None:
+            if not self._borrowed:
+                self._words.release()
+                self._block.close()
+            self._words = None
+
+    def unlink(self):
+        """
+        Destroy the shared memory block once every process has closed it. Called by the creating process.
+        """
+        self._block.unlink()
+
+    def __len__(self) -> int:
+        """
+        Number of topics that have unused patterns remaining.
+        """
+        return self._words[0]
+
+    def reset(self):
+        """
+        Mark every pattern as unused and pick a new order for each topic, for every process.
+        """
+        getrandbits = self.rng.getrandbits
+        with self.lock:
+            words = self._words
+            available = 0
+            for offset in self._offsets.values():
+                words[offset + 1] = 0
+                words[offset + 2] = getrandbits(64)
+                available += words[offset] > 0
+            words[0] = available
+
+    def shuffle(self):
+        """
+        Pick a new order for topics that haven't had any patterns drawn yet.
+        """
+        with self.lock:
+            words = self._words
+            for offset in self._offsets.values():
+                if words[offset + 1] == 0:
+                    words[offset + 2] = self.rng.getrandbits(64)
+
+    def set_topic_weights(self, weights: Optional[Dict[str, float]]):
+        """
+        Weigh the topics picked by random_topic() in this process. Topics without a weight weigh 1.
+
+        Args:
+            weights (Dict[str, float], optional): Weight of every topic, or None to pick uniformly
+
+        Raises:
+            ValueError: If a weight is negative or not finite
+        """
+        topic_weights = None if weights is None else dict(weights)
+        topic_table = None
+        if topic_weights is not None:
+            table_weights = [
+                topic_weights.get(topic, 1.0) for topic in self._topic_list
+            ]
+            if any(table_weights):
+                topic_table = AliasTable(table_weights)
+        self._topic_weights, self._topic_table = topic_weights, topic_table
+
+    def set_pattern_weights(self, topic: str, weights: Optional[Sequence[float]]):
+        """
+        Patterns of a shared pool are always drawn in a uniformly random order.
+
+        Args:
+            topic (str): Topic whose patterns to weigh
+            weights (Sequence[float], optional): Must be None
+
+        Raises:
+            SharedPoolError: If weights are given
+        """
+        if weights is not None:
+            raise SharedPoolError(topic, "Patterns of a shared pool can't be weighed")
+
+    def is_available(self, topic: str) -> bool:
+        """
+        Check whether a topic has unused patterns remaining.
+
+        Args:
+            topic (str): Topic to check
+
+        Returns:
+            bool: True if the topic has unused patterns
+        """
+        offset = self._offsets.get(topic)
+        return offset is not None and self._words[offset + 1] < self._words[offset]
+
+    def available_topics(self) -> List[str]:
+        """
+        Get topics that have unused patterns remaining, in corpus order.
+
+        Returns:
+            List[str]: List of available topics
+        """
+        words = self._words
+        return [
+            topic
+            for topic, offset in self._offsets.items()
+            if words[offset + 1] < words[offset]
+        ]
+
+    def random_topic(self) -> str:
+        """
+        Choose a topic with unused patterns at random.
+
+        Raises:
+            IndexError: If no topic has unused patterns
+
+        Returns:
+            str: Randomly chosen topic
+        """
+        if self._topic_table is not None:
+            for _ in range(_TOPIC_DRAWS):
+                topic = self._topic_list[self._topic_table.sample(self.rng.random)]
+                if self.is_available(topic):
+                    return topic
+        available = self.available_topics()
+        if self._topic_table is None:
+            return self.rng.choice(available)
+        # Most of the weight sits on exhausted topics
+        weights = [self._topic_weights.get(topic, 1.0) for topic in available]
+        if not any(weights):
+            return self.rng.choice(available)
+        return self.rng.choices(available, weights)[0]
+
+    def remaining(self, topic: str) -> List[int]:
+        """
+        Get the unused pattern indices of a topic, in the order they will be drawn.
+
+        Args:
+            topic (str): Topic to inspect
+
+        Returns:
+            List[int]: Unused pattern indices
+        """
+        offset = self._offsets[topic]
+        with self.lock:
+            size, cursor, key = self._words[offset : offset + 3]
+        return [permute(i, size, key) for i in range(cursor, size)]
+
+    def draw(self, topic: str) -> int:
+        """
+        Take the next unused pattern of a topic, so that no other process can take it.
+
+        Args:
+            topic (str): Topic to draw from
+
+        Raises:
+            KeyError: If the topic has no unused patterns
+
+        Returns:
+            int: Index of the pattern within the topic
+        """
+        offset = self._offsets[topic]
+        words = self._words
+        with self.lock:
+            size, cursor = words[offset], words[offset + 1]
+            if cursor >= size:
+                raise KeyError(topic)
+            words[offset + 1] = cursor + 1
+            if cursor + 1 == size:
+                words[0] -= 1
+            key = words[offset + 2]
+        return permute(cursor, size, key)
+
+    def add(self, topic: str, count: int, weights: Optional[Sequence[float]] = None):
+        """
+        Patterns can't be added to a shared pool.
+
+        Raises:
+            SharedPoolError: Always
+        """
+        raise SharedPoolError(topic, "Patterns can't be added to a shared pool")
+
+    def remove(self, topic: str, indices: Sequence[int]):
+        """
+        Patterns can't be removed from a shared pool.
+
+        Raises:
+            SharedPoolError: Always
+        """
+        raise SharedPoolError(topic, "Patterns can't be removed from a shared pool")
+
+    def get_state(self) -> PoolState:
+        """
+        Take a snapshot of the pool (see PatternPool.get_state()).
+
+        Returns:
+            PoolState: Snapshot of the pool
+        """
+        words = self._words
+        with self.lock:
+            topics = [
+                (topic, words[offset], words[offset + 1], words[offset + 2], None)
+                for topic, offset in self._offsets.items()
+            ]
+        available = [topic for topic, size, cursor, _, _ in topics if cursor < size]
+        return topics, available
+
+    def set_state(self, state: PoolState):
+        """
+        Restore a snapshot taken by get_state(), for every process.
+
+        Args:
+            state (PoolState): Snapshot of a pool
+
+        Raises:
+            ValueError: If the snapshot was taken on a pool with other topics or sizes, or holds
+                topics that weren't walking a permutation
+        """
+        topics, _ = state
+        if [(topic, size) for topic, size, _, _, _ in topics] != list(
+            self.sizes.items()
+        ):
+            raise ValueError("The snapshot was taken on a pool with other topics")
+        for topic, size, cursor, _, pending in topics:
+            if not 0 <= cursor <= size or pending is not None:
+                raise ValueError(f"Snapshot of topic {topic} can't be shared")
+        words = self._words
+        with self.lock:
+            for topic, size, cursor, key, _ in topics:
+                offset = self._offsets[topic]
+                words[offset + 1] = cursor
+                words[offset + 2] = key
+            words[0] = sum(cursor < size for _, size, cursor, _, _ in topics)
@@ -0,0 +1,178 @@
+"""
+Compact snapshots of a generator's run, to resume it in another process.
+
+A snapshot holds the position of every topic in its permutation of patterns and the state of the
+random number generator, never the patterns themselves. Topics are identified by their order in
+the corpus, which a fingerprint of the topic names and sizes guards. Layout of a snapshot:
+
+    4 bytes   -- magic number, b"NBST"
+    1 byte    -- format version
+    8 bytes   -- fingerprint of the topic names and sizes
+    2500 bytes -- Mersenne Twister state (624 words and the position in them), big-endian
+    1 byte    -- 1 if a Gaussian value is cached, followed by the value as an 8-byte double
+    then, for every topic in corpus order:
+        varint    -- cursor
+        8 bytes   -- permutation key
+        varint    -- 0 while the topic walks its permutation, otherwise 1 + the number of unused
+                     indices, followed by the indices as varints in reverse drawing order
+    varint    -- number of available topics, followed by their positions in corpus order as varints
+
+A topic that hasn't been changed or weighed costs about ten bytes.
+"""
+
+import hashlib
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .errors import InvalidStateError
+from .pool import PoolState
+
+__all__ = ["decode_state", "encode_state", "topics_fingerprint"]
+
+MAGIC = b"NBST"
+# Version 2: permutation keys select different orders than in version 1
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct(">4sB8s")
+_MT_WORDS = 625
+_MT_STATE = struct.Struct(f">{_MT_WORDS}I")
+_KEY = struct.Struct(">Q")
+_GAUSS = struct.Struct(">d")
+# Version of random.Random's state tuple
+_RANDOM_VERSION = 3
+
+
+def topics_fingerprint(topics: Sequence[Tuple[str, int]]) -> bytes:
+    """
+    Fingerprint the topics of a pool.
+
+    Args:
+        topics (Sequence[Tuple[str, int]]): Name and size of every topic, in corpus order
+
+    Returns:
+        bytes: 8-byte fingerprint
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for topic, size in topics:
+        digest.update(f"{len(topic)}:{topic}:{size};".encode("utf-8"))
+    return digest.digest()
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_state(pool_state: PoolState, rng_state: Tuple[Any, ...]) -> bytes:
+    """
+    Encode a snapshot of a pool and a random number generator.
+
+    Args:
+        pool_state (PoolState): Snapshot of the pool, from PatternPool.get_state()
+        rng_state (Tuple[Any, ...]): State of a random.Random, from getstate()
+
+    Raises:
+        ValueError: If the random number generator state isn't a Mersenne Twister state
+
+    Returns:
+        bytes: Encoded snapshot
+    """
+    topics, available = pool_state
+    version, words, gauss_next = rng_state
+    if version != _RANDOM_VERSION or len(words) != _MT_WORDS:
+        raise ValueError("Only random.Random states can be saved")
+    fingerprint = topics_fingerprint([(topic, size) for topic, size, _, _, _ in topics])
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, fingerprint))
+    out += _MT_STATE.pack(*words)
+    if gauss_next is None:
+        out.append(0)
+    else:
+        out.append(1)
+        out += _GAUSS.pack(gauss_next)
+    positions: Dict[str, int] = {}
+    for position, (topic, _, cursor, key, pending) in enumerate(topics):
+        positions[topic] = position
+        _write_varint(out, cursor)
+        out += _KEY.pack(key)
+        if pending is None:
+            _write_varint(out, 0)
+        else:
+            _write_varint(out, len(pending) + 1)
+            for index in pending:
+                _write_varint(out, index)
+    _write_varint(out, len(available))
+    for topic in available:
+        _write_varint(out, positions[topic])
+    return bytes(out)
+
+
+def decode_state(
+    data: bytes, topics: Sequence[Tuple[str, int]]
+) -> Tuple[PoolState, Tuple[Any, ...]]:
+    """
+    Decode a snapshot taken on a pool of the given topics.
+
+    Args:
+        data (bytes): Encoded snapshot
+        topics (Sequence[Tuple[str, int]]): Name and size of every topic of the pool, in corpus order
+
+    Raises:
+        InvalidStateError: If the data isn't a snapshot, or was taken on a pool with other topics
+
+    Returns:
+        Tuple[PoolState, Tuple[Any, ...]]: Snapshot of the pool and state of the random number generator
+    """
+    if len(data) < _HEADER.size + _MT_STATE.size + 1:
+        raise InvalidStateError(message="Not a generator state")
+    magic, version, fingerprint = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise InvalidStateError(message="Not a generator state")
+    if version != FORMAT_VERSION:
+        raise InvalidStateError(message=f"Unsupported state format version {version}")
+    if fingerprint != topics_fingerprint(topics):
+        raise InvalidStateError(message="The state was saved on another corpus")
+    try:
+        offset = _HEADER.size
+        words = _MT_STATE.unpack_from(data, offset)
+        offset += _MT_STATE.size
+        gauss_next: Optional[float] = None
+        if data[offset]:
+            (gauss_next,) = _GAUSS.unpack_from(data, offset + 1)
+            offset += _GAUSS.size
+        offset += 1
+        topic_states = []
+        for topic, size in topics:
+            cursor, offset = _read_varint(data, offset)
+            (key,) = _KEY.unpack_from(data, offset)
+            offset += _KEY.size
+            count, offset = _read_varint(data, offset)
+            pending: Optional[List[int]] = None
+            if count:
+                pending = []
+                for _ in range(count - 1):
+                    index, offset = _read_varint(data, offset)
+                    pending.append(index)
+            topic_states.append((topic, size, cursor, key, pending))
+        count, offset = _read_varint(data, offset)
+        available = []
+        for _ in range(count):
+            position, offset = _read_varint(data, offset)
+            available.append(topics[position][0])
+    except (IndexError, struct.error) as error:
+        raise InvalidStateError(message=f"Truncated generator state: {error}")
+    if offset != len(data):
+        raise InvalidStateError(message="Trailing data after generator state")
+    return (topic_states, available), (_RANDOM_VERSION, words, gauss_next)
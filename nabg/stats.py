@@ -0,0 +1,58 @@
+"""
+Runtime statistics for BullshitGenerator.
+"""
+
+import collections
+from typing import Any, Dict
+
+
+class GeneratorStats:
+    """
+    Counters describing what a generator has done since it was created or its statistics were reset.
+
+    Attributes:
+        sentences (Dict[str, int]): Number of sentences generated per topic.
+        resets (Dict[str, int]): Number of pool resets per reason. Reasons are "manual" for explicit
+            calls to reset_sentence_patterns(), "exhausted" when every pattern had been used up and
+            "out_of_patterns" when a topic ran out of patterns with the RESET_POOL behavior.
+        topic_fallbacks (int): Number of times the RANDOM_TOPIC behavior switched topics.
+        errors (Dict[str, int]): Number of errors raised per exception class.
+        timings (Dict[str, float]): Seconds spent per stage of sentence generation ("draw" for picking
+            patterns, "render" for picking words and "clean" for assembling and formatting the sentence).
+            Only collected while timing is enabled.
+    """
+
+    STAGES = ("draw", "render", "clean")
+
+    def __init__(self):
+        """
+        Constructor for GeneratorStats.
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every counter.
+        """
+        self.sentences: Dict[str, int] = collections.Counter()
+        self.resets: Dict[str, int] = collections.Counter()
+        self.topic_fallbacks = 0
+        self.errors: Dict[str, int] = collections.Counter()
+        self.timings: Dict[str, float] = dict.fromkeys(self.STAGES, 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the counters.
+
+        Returns:
+            Dict[str, Any]: Counters keyed by name, plus totals of sentences and resets
+        """
+        return {
+            "sentences": dict(self.sentences),
+            "sentences_total": sum(self.sentences.values()),
+            "resets": dict(self.resets),
+            "resets_total": sum(self.resets.values()),
+            "topic_fallbacks": self.topic_fallbacks,
+            "errors": dict(self.errors),
+            "timings": dict(self.timings),
+        }
@@ -0,0 +1,254 @@
+"""
+Word list backends that can stand in for the lists of a vocabulary.
+
+Any sequence of strings can be used as a word list: the generator only needs len() and
+indexing. The backends below store words far more compactly than a list of Python strings.
+"""
+
+import mmap
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+from .sampling import AliasTable
+
+
+class CompactWordList(Sequence):
+    """
+    Word list stored as one UTF-8 buffer plus an array of word offsets, instead of one Python
+    string per word. Only the chosen word is decoded when it is picked.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        """
+        Constructor for CompactWordList.
+
+        Args:
+            words (Iterable[str], optional): Words to store. Consumed as a stream.
+        """
+        self._buffer = bytearray()
+        # 32-bit offsets until the buffer outgrows them
+        self._offsets = array("I", [0])
+        self.extend(words)
+
+    @classmethod
+    def from_buffers(
+        cls, buffer: bytes, typecode: str, offsets: bytes
+    ) -> "CompactWordList":
+        """
+        Create a CompactWordList from the buffers of another one, without re-encoding the words.
+
+        Args:
+            buffer (bytes): UTF-8 buffer of the words
+            typecode (str): Array typecode of the offsets
+            offsets (bytes): Raw offsets, starting with 0
+
+        Returns:
+            CompactWordList: Word list sharing the given buffers
+        """
+        words = cls()
+        words._buffer = bytearray(buffer)
+        words._offsets = array(typecode)
+        words._offsets.frombytes(offsets)
+        return words
+
+    def buffers(self) -> Tuple[bytearray, array]:
+        """
+        Get the UTF-8 buffer and the offsets the words are stored in.
+
+        Returns:
+            Tuple[bytearray, array]: Buffer and offsets
+        """
+        return self._buffer, self._offsets
+
+    def append(self, word: str):
+        """
+        Append a word to the list.
+
+        Args:
+            word (str): Word to append
+        """
+        self._buffer += word.encode("utf-8")
+        end = len(self._buffer)
+        if end > 0xFFFFFFFF and self._offsets.typecode == "I":
+            self._offsets = array("Q", self._offsets)
+        self._offsets.append(end)
+
+    def extend(self, words: Iterable[str]):
+        """
+        Append words to the list.
+
+        Args:
+            words (Iterable[str]): Words to append. Consumed as a stream.
+        """
+        for word in words:
+            self.append(word)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the buffer and the offsets.
+        """
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return self._buffer[self._offsets[index] : self._offsets[index + 1]].decode(
+            "utf-8"
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        buffer, offsets = self._buffer, self._offsets
+        for i in range(len(offsets) - 1):
+            yield buffer[offsets[i] : offsets[i + 1]].decode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"CompactWordList({len(self)} words, {self.nbytes} bytes)"
+
+
+def compact_vocabulary(
+    vocabulary: Dict[str, Iterable[str]],
+) -> Dict[str, CompactWordList]:
+    """
+    Convert every word list of a vocabulary into a CompactWordList.
+
+    Args:
+        vocabulary (Dict[str, Iterable[str]]): Vocabulary of terms separated into types
+
+    Returns:
+        Dict[str, CompactWordList]: The same vocabulary with compact word lists
+    """
+    return {
+        vocab_type: CompactWordList(words) for vocab_type, words in vocabulary.items()
+    }
+
+
+class WeightedWordList(Sequence):
+    """
+    Word list whose words are picked with probability proportional to their weights.
+    Picking a word costs O(1), however many words there are.
+
+    Attributes:
+        words (Sequence[str]): The words, in any word list backend.
+        weights (array): Weight of every word.
+    """
+
+    def __init__(self, words: Sequence[str], weights: Iterable[float]):
+        """
+        Constructor for WeightedWordList.
+
+        Args:
+            words (Sequence[str]): Words to pick from
+            weights (Iterable[float]): Weight of every word
+
+        Raises:
+            ValueError: If there isn't one weight per word, if a weight is negative or if every
+                weight is zero
+        """
+        self.words = words
+        self.weights = array("d", weights)
+        if len(self.weights) != len(words):
+            raise ValueError(f"Got {len(self.weights)} weights for {len(words)} words")
+        self._table = AliasTable(self.weights)
+
+    @classmethod
+    def from_mapping(cls, weighted_words: Dict[str, float]) -> "WeightedWordList":
+        """
+        Create a WeightedWordList from a mapping of words to weights.
+
+        Args:
+            weighted_words (Dict[str, float]): Weight of every word
+
+        Returns:
+            WeightedWordList: Weighted word list
+        """
+        return cls(list(weighted_words), weighted_words.values())
+
+    def pick(self, random: Callable[[], float]) -> str:
+        """
+        Pick a random word according to the weights.
+
+        Args:
+            random (Callable[[], float]): Source of uniform floats in [0, 1), like random.Random.random
+
+        Returns:
+            str: Picked word
+        """
+        return self.words[self._table.sample(random)]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getitem__(self, index: int) -> str:
+        return self.words[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __repr__(self) -> str:
+        return f"WeightedWordList({self.words!r})"
+
+
+class MappedWordList(Sequence):
+    """
+    Read-only word list backed by a memory-mapped file with one word per line.
+    Only the offsets of the lines are kept in memory; a word is decoded when it is picked.
+
+    Attributes:
+        path (str): Path of the mapped file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor for MappedWordList. Blank lines are skipped.
+
+        Args:
+            path (str): Path of a UTF-8 file with one word per line
+        """
+        self.path = path
+        with open(path, "rb") as fp:
+            try:
+                self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                self._map = b""
+        self._starts = array("Q")
+        self._ends = array("Q")
+        find = self._map.find
+        size = len(self._map)
+        start = 0
+        while start < size:
+            end = find(b"\n", start)
+            if end == -1:
+                end = size
+            stripped_end = end - 1 if end > start and self._map[end - 1] == 13 else end
+            if stripped_end > start:
+                self._starts.append(start)
+                self._ends.append(stripped_end)
+            start = end + 1
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._map[self._starts[index] : self._ends[index]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for start, end in zip(self._starts, self._ends):
+            yield self._map[start:end].decode("utf-8")
+
+    def __reduce__(self):
+        return MappedWordList, (self.path,)
+
+    def __repr__(self) -> str:
+        return f"MappedWordList({self.path!r}, {len(self)} words)"
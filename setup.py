@@ -23,13 +23,16 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=["click > 7.0"],
-    extras_require={"dev": ["pytest>=6.2.2"]},
+    extras_require={
+        "dev": ["pytest>=6.2.2"],
+        "bench": ["pytest>=6.2.2", "pytest-benchmark>=3.2"],
+    },
     url="https://github.com/naveen-u/nabg",
     author="Naveen Unnikrishnan",
     author_email="naveenunnikrishnan98@gmail.com",
     entry_points={
         "console_scripts": [
-            "nabg=nabg.__main__:main",
+            "nabg=nabg.cli:run",
         ]
     },
 )
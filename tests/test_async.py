@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nabg
+from nabg import BullshitGenerator
+
+PATTERNS = {f"topic{t}": [f"Pattern {t}-{i}." for i in range(300)] for t in range(3)}
+
+
+async def collect(bullshit_generator, topic, executor=None):
+    return [
+        sentence
+        async for sentence in bullshit_generator.agenerate(
+            150, topic, chunk_size=10, executor=executor
+        )
+    ]
+
+
+def test_coroutines_sharing_a_generator_never_repeat_patterns():
+    async def run():
+        bullshit_generator = BullshitGenerator(PATTERNS, {})
+        bullshit_generator.disable_auto_reset()
+        return await asyncio.gather(
+            *(collect(bullshit_generator, f"topic{i % 3}") for i in range(6))
+        )
+
+    sentences = [sentence for result in asyncio.run(run()) for sentence in result]
+    assert len(sentences) == 900
+    assert len(set(sentences)) == 900, "A pattern was handed out twice"
+
+
+def test_generation_in_an_executor_never_repeats_patterns():
+    async def run(executor):
+        bullshit_generator = BullshitGenerator(PATTERNS, {}, thread_safe=True)
+        bullshit_generator.disable_auto_reset()
+        return await asyncio.gather(
+            *(collect(bullshit_generator, f"topic{i % 3}", executor) for i in range(6))
+        )
+
+    with ThreadPoolExecutor(4) as executor:
+        results = asyncio.run(run(executor))
+    sentences = [sentence for result in results for sentence in result]
+    assert len(set(sentences)) == 900, "A pattern was handed out twice"
+
+
+def test_executor_requires_thread_safe_generator():
+    async def run():
+        with ThreadPoolExecutor(1) as executor:
+            await BullshitGenerator(PATTERNS, {}).aionize(5, executor=executor)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_agenerate_rejects_empty_chunks():
+    async def run():
+        return [
+            s async for s in BullshitGenerator(PATTERNS, {}).agenerate(5, chunk_size=0)
+        ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_module_aionize_returns_text():
+    result = asyncio.run(nabg.aionize(3))
+    assert type(result) == str and len(result) != 0, "aionize() returned nothing"
@@ -0,0 +1,112 @@
+import json
+import marshal
+
+import pytest
+from click.testing import CliRunner
+
+from nabg import BullshitGenerator, compiled, patterns, vocabulary
+from nabg.commands import main
+from nabg.compiled import compile_corpus, corpus_hash, load_cached, source_hash
+from nabg.errors import (
+    CompiledCorpusError,
+    InvalidVocabularyTypeError,
+    StaleCorpusError,
+)
+from nabg.wordlists import CompactWordList, compact_vocabulary
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_compiled_corpus_generates_the_same_sentences(tmp_path, compact):
+    words = compact_vocabulary(vocabulary) if compact else vocabulary
+    path = str(tmp_path / "corpus.nabgc")
+    compile_corpus(path, patterns, words)
+
+    loaded = BullshitGenerator.load_compiled(
+        path, corpus_hash(patterns, vocabulary), seed=7
+    )
+    assert loaded.sentence_pool == patterns
+    assert isinstance(loaded.vocabulary["adj"], CompactWordList) == compact
+    assert {k: list(v) for k, v in loaded.vocabulary.items()} == vocabulary
+    original = BullshitGenerator(patterns, vocabulary, seed=7)
+    assert loaded.ionize(50) == original.ionize(50)
+
+
+def test_compiled_corpus_is_validated_and_checked(tmp_path):
+    path = tmp_path / "corpus.nabgc"
+    with pytest.raises(InvalidVocabularyTypeError):
+        compile_corpus(str(path), {"t": ["${missing}"]}, vocabulary)
+    assert not path.exists()
+
+    compile_corpus(str(path), patterns, vocabulary)
+    with pytest.raises(StaleCorpusError):
+        BullshitGenerator.load_compiled(str(path), "0" * 64)
+
+    path.write_bytes(b"NABGCORP" + path.read_bytes()[8:50])
+    with pytest.raises(CompiledCorpusError):
+        BullshitGenerator.load_compiled(str(path))
+    path.write_bytes(b"not a corpus at all, not at all, not at all, nope")
+    with pytest.raises(CompiledCorpusError):
+        BullshitGenerator.load_compiled(str(path))
+
+
+def test_compiled_corpus_of_another_shape_or_python_is_rejected(tmp_path):
+    path = tmp_path / "corpus.nabgc"
+    content_hash = bytes(32)
+    mismatched = [
+        {"patterns": {"t": ["A."]}, "parsed": {}, "vocabulary": {}},
+        {"patterns": {"t": ["A.", "B."]}, "parsed": {"t": [()]}, "vocabulary": {}},
+    ]
+    for payload in (
+        {},
+        [],
+        {"patterns": [], "parsed": {}, "vocabulary": {}},
+        7,
+        *mismatched,
+    ):
+        path.write_bytes(
+            compiled._HEADER.pack(
+                compiled.MAGIC,
+                compiled.FORMAT_VERSION,
+                content_hash,
+                compiled._RUNTIME_TAG,
+            )
+            + marshal.dumps(payload)
+        )
+        with pytest.raises(CompiledCorpusError):
+            BullshitGenerator.load_compiled(str(path))
+
+    compile_corpus(str(path), patterns, vocabulary)
+    data = bytearray(path.read_bytes())
+    tag = compiled._HEADER.size - 16
+    data[tag : tag + 16] = b"cpython-27".ljust(16, b"\0")
+    path.write_bytes(bytes(data))
+    with pytest.raises(StaleCorpusError):
+        BullshitGenerator.load_compiled(str(path))
+
+
+def test_cache_is_rebuilt_when_the_sources_change(tmp_path):
+    patterns_path = tmp_path / "patterns.json"
+    vocabulary_path = tmp_path / "vocabulary.json"
+    cache_path = str(tmp_path / "cache.nabgc")
+    patterns_path.write_text(json.dumps({"t": ["${adj} ${nPerson}."]}))
+    vocabulary_path.write_text(json.dumps({"adj": ["old"], "nPerson": ["one"]}))
+
+    generator = load_cached(str(patterns_path), str(vocabulary_path), cache_path)
+    assert generator.ionize(1) == "Old one."
+    content_hash = source_hash(str(patterns_path), str(vocabulary_path))
+    assert BullshitGenerator.load_compiled(cache_path, content_hash).ionize(1) == (
+        "Old one."
+    )
+
+    vocabulary_path.write_text(json.dumps({"adj": ["new"], "nPerson": ["one"]}))
+    generator = load_cached(str(patterns_path), str(vocabulary_path), cache_path)
+    assert generator.ionize(1) == "New one."
+
+
+def test_compile_command(tmp_path):
+    path = str(tmp_path / "default.nabgc")
+    result = CliRunner().invoke(main, ["compile", "--compact", "-o", path])
+    assert result.exit_code == 0, result.output
+    generator = BullshitGenerator.load_compiled(path)
+    assert generator.sentence_pool == patterns
+    assert isinstance(generator.vocabulary["adj"], CompactWordList)
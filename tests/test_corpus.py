@@ -0,0 +1,77 @@
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.corpus import iter_json_lists, load_patterns, load_vocabulary
+from nabg.wordlists import CompactWordList, MappedWordList
+
+
+def write_directory(path, lists):
+    path.mkdir()
+    for key, values in lists.items():
+        (path / f"{key}.txt").write_text("\n".join(values) + "\n", encoding="utf-8")
+
+
+def test_json_lists_are_streamed_across_chunk_boundaries():
+    text = json.dumps({"a": ['say "hi"\\n', "été"], "empty": [], "b": ["x"]})
+    for chunk_size in (1, 2, 3, 7, 1 << 16):
+        lists = {
+            key: list(values)
+            for key, values in iter_json_lists(io.StringIO(text), chunk_size)
+        }
+        assert lists == {"a": ['say "hi"\\n', "été"], "empty": [], "b": ["x"]}
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_lists(io.StringIO('{"a": ["x" "y"]}')))
+
+
+def test_corpus_formats_load_the_default_corpus(tmp_path):
+    (tmp_path / "patterns.json").write_text(json.dumps(patterns, indent=2))
+    assert load_patterns(str(tmp_path / "patterns.json")) == patterns
+
+    with open(tmp_path / "vocabulary.jsonl", "w") as fp:
+        for vocab_type, words in vocabulary.items():
+            for word in words:
+                fp.write(json.dumps({"type": vocab_type, "word": word}) + "\n")
+    assert load_vocabulary(str(tmp_path / "vocabulary.jsonl")) == vocabulary
+
+    write_directory(tmp_path / "vocabulary", vocabulary)
+    loaded = load_vocabulary(str(tmp_path / "vocabulary"))
+    assert loaded == {key: vocabulary[key] for key in sorted(vocabulary)}
+
+
+def test_generator_from_files_with_memory_mapped_words(tmp_path):
+    write_directory(tmp_path / "patterns", patterns)
+    write_directory(tmp_path / "vocabulary", vocabulary)
+    bullshit_generator = BullshitGenerator.from_files(
+        str(tmp_path / "patterns"), str(tmp_path / "vocabulary"), mmap_threshold=0
+    )
+    words = bullshit_generator.vocabulary["nCosmos"]
+    assert isinstance(words, MappedWordList)
+    assert list(words) == vocabulary["nCosmos"] and words[-1] == "dreamtime"
+    assert len(bullshit_generator.ionize(50)) != 0
+
+
+def test_compact_jsonl_vocabulary_is_built_while_streaming(tmp_path):
+    path = tmp_path / "vocabulary.jsonl"
+    words = [f"word{i}" for i in range(50000)]
+    with open(path, "w") as fp:
+        for i, word in enumerate(words):
+            fp.write(json.dumps({"type": f"t{i % 2}", "word": word}) + "\n")
+
+    def peak(compact):
+        tracemalloc.start()
+        try:
+            loaded = load_vocabulary(str(path), compact=compact)
+            return loaded, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    compact, compact_peak = peak(True)
+    plain, plain_peak = peak(False)
+    assert isinstance(compact["t0"], CompactWordList)
+    assert list(compact["t0"]) == plain["t0"] == words[::2]
+    # No list of strings of the whole file is held on the way
+    assert compact_peak < plain_peak / 2
@@ -0,0 +1,49 @@
+import pytest
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.errors import InsufficientCapacityError, InvalidTopicError
+
+
+def test_capacity_counts_every_expansion():
+    bullshit_generator = BullshitGenerator(
+        {"t": ["${a} ${b}.", "${a}!", "Plain."], "u": ["${b}?"]},
+        {"a": ["x", "y", "z"], "b": ["1", "2"]},
+    )
+    assert bullshit_generator.capacity("t") == 3 * 2 + 3 + 1
+    assert bullshit_generator.capacity() == 10 + 2
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.capacity("missing")
+
+
+def test_generate_distinct_exhausts_the_capacity_without_repeats():
+    bullshit_generator = BullshitGenerator(
+        {"t": ["${a} ${b}.", "${a}!", "Plain."]},
+        {"a": ["x", "y", "z"], "b": ["1", "2"]},
+        seed=4,
+    )
+    sentences = bullshit_generator.generate_distinct(10, "t")
+    assert sorted(sentences) == sorted(
+        [f"{a.upper()} {b}." for a in "xyz" for b in "12"]
+        + ["X!", "Y!", "Z!", "Plain."]
+    )
+    with pytest.raises(InsufficientCapacityError) as error:
+        bullshit_generator.generate_distinct(11, "t")
+    assert error.value.capacity == 10
+    assert bullshit_generator.generate_distinct(0, "t") == []
+    assert bullshit_generator.generate_distinct(-3, "t") == []
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.generate_distinct(-3, "missing")
+
+
+def test_generate_distinct_handles_huge_capacities():
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, seed=9)
+    sentences = bullshit_generator.generate_distinct(2000)
+    assert len(set(sentences)) == 2000
+    assert sentences == BullshitGenerator(
+        patterns, vocabulary, seed=9
+    ).generate_distinct(2000)
+
+    words = {"w": [f"w{i}" for i in range(100)]}
+    bullshit_generator = BullshitGenerator({"t": [" ".join(["${w}"] * 12)]}, words)
+    assert bullshit_generator.capacity() == 100**12
+    assert len(set(bullshit_generator.generate_distinct(1000))) == 1000
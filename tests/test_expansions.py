@@ -0,0 +1,55 @@
+import itertools
+import pickle
+
+import pytest
+
+from nabg import BullshitGenerator
+from nabg.errors import InvalidTopicError
+
+
+def make_generator():
+    return BullshitGenerator(
+        {"t": ["${a} ${b}.", "Plain."], "u": ["${b}?"]},
+        {"a": ["x", "y", "z"], "b": ["1", "2"]},
+    )
+
+
+def test_expansions_are_enumerated_in_product_order():
+    bullshit_generator = make_generator()
+    expected = [f"{a.upper()} {b}." for a, b in itertools.product("xyz", "12")]
+    expected.append("Plain.")
+    assert list(bullshit_generator.expansions("t")) == expected
+    assert [bullshit_generator.sentence_at("t", i) for i in range(7)] == expected
+    assert bullshit_generator.sentence_at("t", -1) == "Plain."
+    assert list(bullshit_generator.expansions()) == expected + ["1?", "2?"]
+    with pytest.raises(IndexError):
+        bullshit_generator.sentence_at("t", 7)
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.sentence_at("missing", 0)
+
+
+def test_slices_and_splits_are_lazy_and_disjoint():
+    bullshit_generator = make_generator()
+    expansions = bullshit_generator.expansions()
+    everything = list(expansions)
+    assert list(expansions[2:8]) == everything[2:8]
+    assert list(expansions[::-3]) == everything[::-3]
+    for parts in (1, 2, 4, 9):
+        pieces = expansions.split(parts)
+        assert [s for piece in pieces for s in piece] == everything
+    assert list(pickle.loads(pickle.dumps(expansions[3:5]))) == everything[3:5]
+
+    bullshit_generator.add_words("b", ["3"])
+    assert bullshit_generator.capacity("t") == 3 * 3 + 1
+    assert bullshit_generator.sentence_at("t", 2) == "X 3."
+
+
+def test_expansions_beyond_sys_maxsize():
+    words = {"w": [f"w{i}" for i in range(100)]}
+    bullshit_generator = BullshitGenerator({"t": [" ".join(["${w}"] * 12)]}, words)
+    expansions = bullshit_generator.expansions("t")
+    assert expansions.size == 100**12
+    assert expansions[-1] == "W99" + " w99" * 11
+    window = expansions[10**20 : 10**20 + 3]
+    assert window.size == 3
+    assert list(window) == ["W0 w1" + " w0" * 9 + f" w{i}" for i in range(3)]
@@ -0,0 +1,80 @@
+import random
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.formatter import (
+    SentenceFormatter,
+    clean_sentence,
+    insert_space_between_sentences,
+    is_regular_word,
+)
+
+
+def reference(template, words):
+    text, slots = template
+    parts = [text]
+    for word, (_, literal) in zip(words, slots):
+        parts.append(word)
+        parts.append(literal)
+    return insert_space_between_sentences(clean_sentence("".join(parts)))
+
+
+def test_default_corpus_matches_regular_expressions():
+    bullshit_generator = BullshitGenerator(patterns, vocabulary)
+    formatter = SentenceFormatter()
+    rng = random.Random(0)
+    for templates in bullshit_generator._templates.values():
+        for template in templates:
+            for _ in range(20):
+                words = formatter.pick_words(template, rng)
+                assert formatter.format(template, words) == reference(template, words)
+
+
+def test_random_corpora_match_regular_expressions():
+    rng = random.Random(1)
+    alphabet = ["a", "A", " ", "e", "u", "x", "Z", ".", "?", "-", "_", "1", "é", "an"]
+
+    def fragment(low):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, 4)))
+
+    formatter = SentenceFormatter()
+    for _ in range(3000):
+        word_lists = [[fragment(1) for _ in range(3)] for _ in range(rng.randint(0, 3))]
+        template = (fragment(0), tuple((words, fragment(0)) for words in word_lists))
+        for _ in range(5):
+            words = formatter.pick_words(template, rng)
+            if not template[0] and not any(
+                words + [literal for _, literal in template[1]]
+            ):
+                continue
+            assert formatter.format(template, words) == reference(template, words)
+
+
+def test_irregular_words_fall_back_to_regular_expressions():
+    for word in ["a elephant", "such a", "a ", " apple", "e.g.", "x.y", "and a orange"]:
+        assert not is_regular_word(word)
+    for word in ["apple", "a resonance cascade", "ultra-", '"living"', "b"]:
+        assert is_regular_word(word)
+    bullshit_generator = BullshitGenerator(
+        {"t": ["${det} ${noun} is ${det}${adj}."]},
+        {"det": ["a", "such a"], "noun": ["apple", "e.g.tree"], "adj": [" idea"]},
+    )
+    assert (
+        bullshit_generator._formatter._plan(bullshit_generator._templates["t"][0])
+        is None
+    )
+    sentences = set()
+    for seed in range(50):
+        bullshit_generator.rng.seed(seed)
+        bullshit_generator.reset_sentence_patterns()
+        sentences.add(bullshit_generator.generate_sentence("t"))
+    assert "Such an e. g. tree is an idea." in sentences
+    assert "An apple is such an idea." in sentences
+
+
+def test_generated_sentences_are_formatted():
+    bullshit_generator = BullshitGenerator(
+        {"t": ["${a} ${w}.${w}?"]}, {"a": ["a"], "w": ["owl", "emu"]}
+    )
+    sentence = bullshit_generator.generate_sentence("t")
+    assert sentence.startswith("An ")
+    assert ". " in sentence and sentence.endswith("?")
@@ -0,0 +1,65 @@
+import pytest
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.errors import InvalidTopicError, InvalidVocabularyTypeError
+from nabg.wordlists import CompactWordList
+
+
+def test_added_patterns_join_the_run_and_used_patterns_stay_used():
+    bullshit_generator = BullshitGenerator({"t": ["A.", "B.", "C."]}, {}, seed=1)
+    bullshit_generator.disable_auto_reset()
+    bullshit_generator.raise_error_when_out_of_patterns()
+    first = bullshit_generator.ionize(2, "t")
+    bullshit_generator.add_patterns("t", ["D.", "E."])
+    assert bullshit_generator.remove_patterns("t", ["A.", "Z."]) == 1
+    rest = bullshit_generator.ionize(
+        len(bullshit_generator.sentence_patterns["t"]), "t"
+    )
+    used = first.split() + rest.split()
+    assert sorted(used) == sorted(set(used))
+    assert set(rest.split()) == {"B.", "C.", "D.", "E."} - set(first.split())
+
+    bullshit_generator.add_patterns("new", ["N."])
+    assert bullshit_generator.ionize(1, "new") == "N."
+    assert bullshit_generator.remove_patterns("new", ["N."]) == 1
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.ionize(1, "new")
+
+
+def test_words_are_added_and_removed_in_place():
+    bullshit_generator = BullshitGenerator(
+        {"t": ["${adj}."]}, {"adj": CompactWordList(["old"])}
+    )
+    bullshit_generator.add_words("adj", ["new"])
+    assert bullshit_generator.remove_words("adj", ["old"]) == 1
+    assert isinstance(bullshit_generator.vocabulary["adj"], CompactWordList)
+    assert bullshit_generator.ionize(3, "t") == "New. New. New."
+    with pytest.raises(InvalidVocabularyTypeError):
+        bullshit_generator.remove_words("adj", ["new"])
+    with pytest.raises(InvalidVocabularyTypeError):
+        bullshit_generator.add_patterns("t", ["Fine.", "${missing}."])
+    assert bullshit_generator.sentence_pool["t"] == ["${adj}."]
+
+
+def test_changes_do_not_leak_into_the_default_corpus():
+    default_adjectives = list(vocabulary["adj"])
+    default_topics = list(patterns)
+    bullshit_generator = BullshitGenerator(patterns, vocabulary)
+    bullshit_generator.add_words("adj", ["zany"])
+    bullshit_generator.add_patterns("zany", ["${adj}."])
+    bullshit_generator.remove_patterns(default_topics[0], patterns[default_topics[0]])
+    assert vocabulary["adj"] == default_adjectives
+    assert list(patterns) == default_topics
+    assert default_topics[0] not in bullshit_generator.list_topics()
+
+
+def test_partial_removal_does_not_leak_into_the_default_corpus():
+    default_patterns = {topic: list(sentences) for topic, sentences in patterns.items()}
+    bullshit_generator = BullshitGenerator(patterns, vocabulary)
+    warn = patterns["warn"]
+    assert bullshit_generator.remove_patterns("warn", warn[:1]) == 1
+    assert patterns == default_patterns
+    assert bullshit_generator.sentence_pool["warn"] == warn[1:]
+    remaining = BullshitGenerator(patterns, vocabulary).sentence_patterns
+    assert remaining.keys() == default_patterns.keys()
+    assert all(len(remaining[t]) == len(default_patterns[t]) for t in remaining)
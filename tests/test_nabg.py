@@ -1,7 +1,134 @@
+import io
+import threading
+
+import pytest
+
 import nabg
+from nabg import BullshitGenerator
+from nabg.errors import InvalidTopicError, InvalidVocabularyTypeError
 
 
 def test_nab_ionize_returns_correctly():
     result = nabg.ionize()
     assert type(result) == str, "ionize() didn't return text"
     assert len(nabg.ionize()) != 0, "ionize() returned nothing"
+
+
+def test_unknown_vocabulary_type_is_rejected_at_construction():
+    with pytest.raises(InvalidVocabularyTypeError) as excinfo:
+        BullshitGenerator({"topic": ["A ${missing} sentence."]}, {"adj": ["nice"]})
+    assert excinfo.value.topic == "topic", "Error didn't report the pattern's topic"
+    assert excinfo.value.vocab_type == "missing", "Error didn't report the type"
+
+
+def test_compiled_templates_render_like_patterns():
+    bullshit_generator = BullshitGenerator(
+        {"topic": ["Nothing is impossible.", "A ${adj} ${noun}."]},
+        {"adj": ["nice"], "noun": ["day"]},
+    )
+    assert (
+        bullshit_generator.replace_vocab_patterns("A ${adj} ${noun}.") == "A nice day."
+    )
+    assert (
+        bullshit_generator.replace_vocab_patterns("Nothing is impossible.")
+        == "Nothing is impossible."
+    )
+    assert bullshit_generator.ionize(2, "topic") in (
+        "A nice day. Nothing is impossible.",
+        "Nothing is impossible. A nice day.",
+    )
+
+
+def test_join_sentences_matches_insert_space_between_sentences():
+    sentences = ["Who are we? Where are we.", "Go.", "!Stop.", "why?", "Now."]
+    assert BullshitGenerator.join_sentences(
+        sentences
+    ) == BullshitGenerator.insert_space_between_sentences(
+        "".join(sentences)
+    ), "join_sentences() didn't space sentences like insert_space_between_sentences()"
+
+
+def test_ionize_iter_yields_requested_number_of_sentences():
+    bullshit_generator = BullshitGenerator(nabg.patterns, nabg.vocabulary)
+    sentences = list(bullshit_generator.ionize_iter(200, "warn"))
+    assert len(sentences) == 200, "ionize_iter() yielded the wrong number of sentences"
+    assert all(sentence[0].isupper() for sentence in sentences)
+
+
+def test_negative_counts_generate_nothing():
+    bullshit_generator = BullshitGenerator(nabg.patterns, nabg.vocabulary)
+    assert bullshit_generator.ionize(-1) == ""
+    assert bullshit_generator.ionize(0, "warn") == ""
+    assert bullshit_generator.generate_text(-5, "warn") == ""
+    assert list(bullshit_generator.ionize_iter(-3)) == []
+    output = io.StringIO()
+    bullshit_generator.ionize_to(output, -2)
+    assert output.getvalue() == ""
+    assert nabg.Corpus(nabg.patterns, nabg.vocabulary).session().ionize(-1) == ""
+
+
+def test_ionize_batch_does_not_repeat_patterns_across_requests():
+    bullshit_generator = BullshitGenerator(
+        {"topic": ["One.", "Two.", "Three.", "Four."]}, {}
+    )
+    bullshit_generator.disable_auto_reset()
+    bullshit_generator.raise_error_when_out_of_patterns()
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.ionize_batch([(1, "topic"), (1, "missing")])
+    texts = bullshit_generator.ionize_batch([(2, "topic"), (1, None), (1, "topic")])
+    assert len(texts) == 3, "ionize_batch() didn't return one text per request"
+    sentences = " ".join(texts).split(" ")
+    assert sorted(sentences) == ["Four.", "One.", "Three.", "Two."]
+
+
+def test_module_ionize_reuses_default_generator():
+    bullshit_generator = nabg.get_default_generator()
+    nabg.ionize(3, fresh_pool=True)
+    assert nabg.get_default_generator() is bullshit_generator
+
+
+def test_per_thread_default_generators():
+    generators = []
+    nabg.use_per_thread_generators()
+    try:
+        thread = threading.Thread(
+            target=lambda: generators.append(nabg.get_default_generator())
+        )
+        thread.start()
+        thread.join()
+        generators.append(nabg.get_default_generator())
+    finally:
+        nabg.use_per_thread_generators(False)
+    assert generators[0] is not generators[1], "Threads shared a default generator"
+
+
+def test_same_seed_gives_identical_output():
+    first = BullshitGenerator(nabg.patterns, nabg.vocabulary, seed=42)
+    second = BullshitGenerator(nabg.patterns, nabg.vocabulary, seed=42)
+    other = BullshitGenerator(nabg.patterns, nabg.vocabulary, seed=43)
+    text = first.ionize(100)
+    assert second.ionize(100) == text, "Generators with the same seed diverged"
+    assert other.ionize(100) != text, "Generators with different seeds matched"
+
+
+def test_ionize_to_writes_same_text_as_ionize():
+    output = io.StringIO()
+    BullshitGenerator(nabg.patterns, nabg.vocabulary, seed=3).ionize_to(
+        output, 100, "hope", chunk_size=7
+    )
+    expected = BullshitGenerator(nabg.patterns, nabg.vocabulary, seed=3).ionize(
+        100, "hope"
+    )
+    assert output.getvalue() == expected, "ionize_to() output differs from ionize()"
+
+    output = io.StringIO()
+    nabg.ionize_to(output, 5, one_per_line=True)
+    assert len(output.getvalue().splitlines()) == 5
+
+
+def test_ionize_to_rejects_empty_chunks():
+    bullshit_generator = BullshitGenerator(nabg.patterns, nabg.vocabulary)
+    for chunk_size in (0, -1):
+        with pytest.raises(ValueError):
+            bullshit_generator.ionize_to(io.StringIO(), 5, chunk_size=chunk_size)
+    assert len(bullshit_generator.list_available_topics()) == len(nabg.patterns)
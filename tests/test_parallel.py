@@ -0,0 +1,34 @@
+import pytest
+from click.testing import CliRunner
+
+from nabg import generate_parallel
+from nabg.commands import main
+from nabg.errors import InvalidTopicError
+
+
+def test_parallel_output_depends_only_on_seed():
+    sequential = list(generate_parallel(250, "hope", workers=1, seed=7, chunk_size=40))
+    parallel = list(generate_parallel(250, "hope", workers=2, seed=7, chunk_size=40))
+    assert len(sequential) == 250, "generate_parallel() yielded the wrong count"
+    assert parallel == sequential, "Output changed with the number of workers"
+    assert list(generate_parallel(250, "hope", workers=1, seed=8, chunk_size=40)) != (
+        sequential
+    )
+
+
+def test_parallel_rejects_invalid_topic():
+    with pytest.raises(InvalidTopicError):
+        list(generate_parallel(10, "missing", workers=1))
+
+
+@pytest.mark.parametrize(
+    "arguments", [{"workers": 0}, {"workers": -1}, {"chunk_size": 0}]
+)
+def test_parallel_checks_arguments_when_called(arguments):
+    with pytest.raises(ValueError):
+        generate_parallel(10, "hope", **arguments)
+
+
+def test_jobs_must_be_positive():
+    result = CliRunner().invoke(main, ["-j", "0"])
+    assert result.exit_code == 2 and "--jobs" in result.output
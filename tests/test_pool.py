@@ -0,0 +1,135 @@
+import collections
+import random
+import sys
+import threading
+
+import pytest
+
+from nabg import BullshitGenerator
+from nabg.pool import PatternPool, permute
+
+
+def test_permute_is_a_permutation():
+    for size in (1, 2, 3, 15, 16, 17, 1000):
+        for key in (0, 1, 0xDEADBEEF, 2**64 - 1):
+            assert sorted(permute(i, size, key) for i in range(size)) == list(
+                range(size)
+            ), f"permute() isn't a permutation of range({size}) for key {key}"
+
+
+def chi_square(counts, cells):
+    expected = sum(counts.values()) / cells
+    return sum(
+        (counts.get(cell, 0) - expected) ** 2 / expected for cell in range(cells)
+    )
+
+
+def test_permute_is_uniform():
+    rng = random.Random(0)
+
+    def order(size):
+        key = rng.getrandbits(64)
+        return tuple(permute(i, size, key) for i in range(size))
+
+    # Every order of a small topic is reachable and about equally likely, like with random.shuffle()
+    orders = collections.Counter(order(5) for _ in range(24000))
+    assert len(orders) == 120
+    assert min(orders.values()) > 140 and max(orders.values()) < 260
+    # 20000 uniform orders of 10 elements repeat about 55 times
+    assert len({order(10) for _ in range(20000)}) > 19850
+    for size in (2, 8, 10, 17, 40, 300):
+        first = collections.Counter(
+            permute(0, size, rng.getrandbits(64)) for _ in range(200 * size)
+        )
+        # Far above the 99.99th percentile of the chi-square distribution
+        assert chi_square(first, size) < size - 1 + 6 * (2 * (size - 1)) ** 0.5 + 10
+
+
+def test_pool_hands_out_every_pattern_once_before_reset():
+    pool = PatternPool({"a": 10, "b": 3, "empty": 0})
+    assert pool.available_topics() == ["a", "b"]
+    drawn = [pool.draw("a") for _ in range(10)]
+    assert sorted(drawn) == list(range(10)), "Pool repeated a pattern"
+    assert not pool.is_available("a")
+    assert pool.available_topics() == ["b"]
+    assert pool.random_topic() == "b"
+    pool.reset()
+    assert pool.available_topics() == ["a", "b"]
+
+
+def test_available_topics_track_used_patterns():
+    bullshit_generator = BullshitGenerator(
+        {"one": ["A.", "B."], "two": ["C."], "three": ["D.", "E."]}, {}
+    )
+    assert bullshit_generator.list_available_topics() == ["one", "two", "three"]
+    bullshit_generator.generate_text(1, "two")
+    assert bullshit_generator.list_available_topics() == ["one", "three"]
+    bullshit_generator.generate_text(1, "one")
+    assert bullshit_generator.sentence_patterns["three"] != []
+    assert len(bullshit_generator.sentence_patterns["one"]) == 1
+    bullshit_generator.reset_sentence_patterns()
+    assert bullshit_generator.list_available_topics() == ["one", "two", "three"]
+
+
+def test_thread_safe_generator_never_repeats_patterns_before_reset():
+    topics = {f"topic{t}": [f"Pattern {t}-{i}." for i in range(500)] for t in range(4)}
+    bullshit_generator = BullshitGenerator(topics, {}, thread_safe=True)
+    bullshit_generator.disable_auto_reset()
+    sentences = []
+
+    def worker(topic):
+        for sentence in bullshit_generator.ionize_iter(250, topic):
+            sentences.append(sentence)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=worker, args=(f"topic{i % 4}",)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(sentences) == 2000
+    assert len(set(sentences)) == 2000, "A pattern was handed out twice"
+    assert bullshit_generator.list_available_topics() == []
+
+
+def test_pool_keeps_used_patterns_used_when_topics_change():
+    pool = PatternPool({"a": 10})
+    drawn = [pool.draw("a") for _ in range(4)]
+    pool.add("a", 5)
+    assert sorted(pool.remaining("a")) == sorted(set(range(15)) - set(drawn))
+
+    # Removing indices shifts the ones above them down
+    pool.remove("a", [0, 14])
+    expected = sorted(i - (i > 0) for i in set(range(1, 14)) - set(drawn))
+    assert sorted(pool.remaining("a")) == expected
+    assert pool.sizes["a"] == 13
+    drawn = [pool.draw("a") for _ in range(len(expected))]
+    assert sorted(drawn) == expected
+    assert not pool.is_available("a")
+
+    pool.add("b", 2)
+    assert pool.available_topics() == ["b"]
+    pool.remove("b", [0, 1])
+    assert "b" not in pool.sizes and pool.available_topics() == []
+
+
+def test_invalid_weights_leave_the_pool_unchanged():
+    def make_generator(seed):
+        return BullshitGenerator({"t": ["A.", "B."]}, {}, seed=seed)
+
+    bullshit_generator = make_generator(1)
+    with pytest.raises(ValueError):
+        bullshit_generator.add_patterns("new", ["X."], weights=[1, 2])
+    with pytest.raises(ValueError):
+        bullshit_generator.set_topic_weights({"t": -1})
+    assert bullshit_generator.list_available_topics() == ["t"]
+    assert "new" not in bullshit_generator.list_topics()
+    restored = make_generator(2)
+    restored.set_state(bullshit_generator.get_state())
+    assert restored.ionize(2) == bullshit_generator.ionize(2)
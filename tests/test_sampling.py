@@ -0,0 +1,71 @@
+import collections
+import random
+
+import pytest
+
+from nabg import BullshitGenerator
+from nabg.compiled import compile_corpus
+from nabg.sampling import AliasTable
+from nabg.wordlists import CompactWordList, WeightedWordList
+
+
+def test_alias_table_samples_in_proportion_to_weights():
+    weights = [1, 0, 3, 6]
+    table = AliasTable(weights)
+    rng = random.Random(0)
+    counts = collections.Counter(table.sample(rng.random) for _ in range(100000))
+    assert counts[1] == 0, "Sampled an index with weight zero"
+    for index, weight in enumerate(weights):
+        assert abs(counts[index] / 100000 - weight / 10) < 0.01
+    for bad_weights in ([], [0, 0], [1, -1], [float("nan")]):
+        with pytest.raises(ValueError):
+            AliasTable(bad_weights)
+
+
+def test_weighted_words_and_topics(tmp_path):
+    vocabulary = {
+        "adj": WeightedWordList(CompactWordList(["rare", "common", "never"]), [1, 9, 0])
+    }
+    patterns = {"light": ["${adj}."], "heavy": [f"H{i}." for i in range(1000)]}
+    bullshit_generator = BullshitGenerator(
+        patterns, vocabulary, seed=3, topic_weights={"light": 0, "heavy": 1}
+    )
+    words = collections.Counter(
+        bullshit_generator.retrieve_random_word_of_type("adj") for _ in range(10000)
+    )
+    assert words["never"] == 0
+    assert 0.85 < words["common"] / 10000 < 0.95
+    topics = {bullshit_generator.get_random_topic() for _ in range(1000)}
+    assert topics == {"heavy"}
+
+    path = str(tmp_path / "weighted.nabgc")
+    compile_corpus(path, patterns, vocabulary)
+    loaded = BullshitGenerator.load_compiled(path).vocabulary["adj"]
+    assert list(loaded.weights) == [1, 9, 0]
+    assert isinstance(loaded.words, CompactWordList)
+
+
+def test_heavier_patterns_come_up_earlier_in_a_run():
+    patterns = {"t": [f"P{i}." for i in range(100)]}
+    weights = [100.0] * 10 + [1.0] * 90
+    heavy = 0
+    for seed in range(8):
+        bullshit_generator = BullshitGenerator(
+            patterns, {}, seed=seed, pattern_weights={"t": weights}
+        )
+        bullshit_generator.disable_auto_reset()
+        bullshit_generator.raise_error_when_out_of_patterns()
+        first = bullshit_generator.ionize(10, "t").split()
+        heavy += sum(int(p[1:-1]) < 10 for p in first)
+    # About 8.3 of the first 10 patterns are heavy on average
+    assert heavy >= 8 * 7
+    rest = bullshit_generator.ionize(90, "t").split()
+    assert sorted(first + rest) == sorted(patterns["t"])
+
+    # Weighted topics and words keep their weights as the corpus changes
+    bullshit_generator.reset_sentence_patterns()
+    bullshit_generator.add_patterns("t", ["New."], weights=[1e9])
+    assert bullshit_generator.ionize(1, "t") == "New."
+    bullshit_generator.add_words("adj", ["a", "b"], weights=[0, 1])
+    assert bullshit_generator.remove_words("adj", ["a"]) == 1
+    assert list(bullshit_generator.vocabulary["adj"].weights) == [1]
@@ -0,0 +1,86 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from nabg.server import BullshitServer
+
+
+@pytest.fixture
+def connection():
+    server = BullshitServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection(*server.server_address)
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def request(connection, method, path, body=None):
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, response.read().decode("utf-8")
+
+
+def test_single_batch_and_stream_endpoints_share_a_connection(connection):
+    status, text = request(connection, "GET", "/ionize?n=3&topic=warn")
+    assert status == 200 and text, "/ionize returned nothing"
+
+    status, body = request(
+        connection, "POST", "/batch", json.dumps([{"n": 2, "topic": "hope"}, {"n": 1}])
+    )
+    assert status == 200 and len(json.loads(body)) == 2
+
+    status, text = request(connection, "GET", "/stream?n=2500&lines=1")
+    assert status == 200 and len(text.splitlines()) == 2500
+
+
+def test_errors_are_reported_with_status_codes(connection):
+    assert request(connection, "GET", "/ionize?topic=missing")[0] == 404
+    assert request(connection, "GET", "/ionize?n=many")[0] == 400
+    assert request(connection, "POST", "/batch", "[1]")[0] == 400
+    assert request(connection, "GET", "/nowhere")[0] == 404
+
+
+@pytest.mark.parametrize("query", ["n=2.9", "n=-1", "n=true"])
+def test_counts_must_be_integers(connection, query):
+    assert request(connection, "GET", f"/ionize?{query}")[0] == 400
+
+
+@pytest.mark.parametrize(
+    "item", [{"n": 2.9}, {"n": True}, {"n": "3"}, {"n": 1, "topic": 5}]
+)
+def test_batch_items_are_type_checked(connection, item):
+    assert request(connection, "POST", "/batch", json.dumps([item]))[0] == 400
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [("", 411), ("Content-Length: -1\r\n", 400), ("Content-Length: ten\r\n", 400)],
+)
+def test_content_length_is_checked(connection, header, status):
+    with socket.create_connection((connection.host, connection.port), timeout=5) as raw:
+        raw.sendall(f"POST /batch HTTP/1.1\r\nHost: nabg\r\n{header}\r\n[]".encode())
+        response = raw.makefile("rb").readline().decode("ascii")
+    assert response.split()[1] == str(status)
+
+
+def test_requests_above_the_limits_are_rejected():
+    server = BullshitServer(("127.0.0.1", 0), max_sentences=5, max_stream_sentences=8)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection(*server.server_address)
+    try:
+        assert request(connection, "GET", "/ionize?n=5")[0] == 200
+        status, body = request(connection, "GET", "/ionize?n=6")
+        assert status == 400 and "at most 5" in json.loads(body)["error"]
+        assert request(connection, "GET", "/stream?n=8")[0] == 200
+        assert request(connection, "GET", "/stream?n=9")[0] == 400
+        batch = json.dumps([{"n": 3}, {"n": 3}])
+        assert request(connection, "POST", "/batch", batch)[0] == 400
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,97 @@
+import tracemalloc
+
+import pytest
+
+from nabg import BullshitGenerator, Corpus, SessionCache, patterns, vocabulary
+from nabg.errors import InvalidTopicError, NoPatternsAvailableError
+
+Behavior = BullshitGenerator.OutOfPatternsBehavior
+
+
+def make_corpus():
+    return Corpus({"t": ["A.", "B.", "C."], "u": ["${w}?"]}, {"w": ["x", "y"]})
+
+
+def test_session_matches_generator_with_same_seed():
+    corpus = Corpus(patterns, vocabulary)
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, seed=7)
+    session = corpus.session(seed=7)
+    assert session.ionize(200) == bullshit_generator.ionize(200)
+    assert session.ionize(5, "warn") == bullshit_generator.ionize(5, "warn")
+    # Past the end of the topic, where both apply the same out-of-patterns rules
+    assert session.ionize(300, "warn") == bullshit_generator.ionize(300, "warn")
+    session = corpus.session(seed=8, out_of_patterns=Behavior.RESET_POOL)
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, seed=8)
+    bullshit_generator.reset_pool_when_out_of_patterns()
+    assert session.ionize(300, "warn") == bullshit_generator.ionize(300, "warn")
+
+
+def test_sessions_have_independent_runs():
+    corpus = make_corpus()
+    first, second = corpus.session(seed=1), corpus.session(seed=2)
+    assert {first.generate_sentence("t") for _ in range(3)} == {"A.", "B.", "C."}
+    assert {second.generate_sentence("t") for _ in range(3)} == {"A.", "B.", "C."}
+    assert first.list_available_topics() == ["u"]
+    first.reset()
+    assert first.list_available_topics() == ["t", "u"]
+
+
+def test_out_of_patterns_behaviors():
+    corpus = make_corpus()
+    session = corpus.session(out_of_patterns=Behavior.RAISE_ERROR)
+    sentences = session.iter_sentences("t")
+    for _ in range(3):
+        next(sentences)
+    with pytest.raises(NoPatternsAvailableError):
+        next(sentences)
+    session = corpus.session(out_of_patterns=Behavior.RESET_POOL)
+    assert session.ionize(6, "t").count(".") == 6
+    session = corpus.session()
+    assert session.ionize(4, "t").endswith("?")
+    session = corpus.session(auto_reset=False)
+    session.ionize(4)
+    with pytest.raises(NoPatternsAvailableError):
+        session.ionize(1)
+    with pytest.raises(InvalidTopicError):
+        session.ionize(1, "missing")
+
+
+def test_corpus_is_frozen():
+    sentences = ["A."]
+    corpus = Corpus({"t": sentences}, {})
+    sentences.append("B.")
+    assert corpus.sentence_patterns["t"] == ("A.",)
+    with pytest.raises(TypeError):
+        corpus.sentence_patterns["u"] = ("C.",)
+    assert corpus.capacity() == 1
+    assert list(corpus.expansions("t")) == ["A."]
+
+
+def test_sessions_are_small():
+    corpus = Corpus(patterns, vocabulary)
+    tracemalloc.start()
+    sessions = [corpus.session() for _ in range(500)]
+    for session in sessions:
+        session.ionize(3)
+    size = tracemalloc.get_traced_memory()[0] / len(sessions)
+    tracemalloc.stop()
+    assert size < 10_000
+
+
+def test_session_cache_evicts_least_recently_used():
+    evicted = []
+    cache = SessionCache(
+        make_corpus(), max_sessions=2, on_evict=lambda key, _: evicted.append(key)
+    )
+    first = cache.get("a")
+    cache.get("b")
+    assert cache.get("a") is first
+    cache.get("c")
+    assert evicted == ["b"] and "b" not in cache and len(cache) == 2
+    cache.put("b", first)
+    assert evicted == ["b", "a"] and cache.get("b") is first
+    assert cache.evict("b") is first and cache.evict("b") is None
+    cache.clear()
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        SessionCache(make_corpus(), max_sessions=0)
@@ -0,0 +1,106 @@
+import multiprocessing
+import random
+
+import pytest
+
+from nabg import BullshitGenerator, SharedPatternPool, patterns, vocabulary
+from nabg.errors import NoPatternsAvailableError, SharedPoolError
+
+SIZES = {topic: len(sentences) for topic, sentences in patterns.items()}
+
+
+def generate_sentences(pool, topic, count, results):
+    # Runs in a worker process. A pattern drawn twice would leave one more unused in the pool.
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, pool=pool)
+    bullshit_generator.raise_error_when_out_of_patterns()
+    results.put([bullshit_generator.generate_sentence(topic) for _ in range(count)])
+
+
+@pytest.fixture
+def pool():
+    with SharedPatternPool(SIZES) as pool:
+        yield pool
+
+
+def test_generators_on_one_pool_never_repeat_patterns(pool):
+    first = BullshitGenerator(patterns, vocabulary, pool=pool, seed=1)
+    second = BullshitGenerator(patterns, vocabulary, pool=pool, seed=2)
+    first.raise_error_when_out_of_patterns()
+    second.raise_error_when_out_of_patterns()
+    for _ in range(SIZES["warn"] // 2):
+        first.generate_sentence("warn")
+        second.generate_sentence("warn")
+    if SIZES["warn"] % 2:
+        first.generate_sentence("warn")
+    assert pool.remaining("warn") == []
+    with pytest.raises(NoPatternsAvailableError):
+        second.ionize(1, "warn")
+    assert "warn" not in first.list_available_topics()
+    assert len(pool) == len(SIZES) - 1
+    pool.reset()
+    assert "warn" in second.list_available_topics()
+
+
+def test_shared_pool_restrictions(pool):
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, pool=pool)
+    assert bullshit_generator.thread_safe
+    with pytest.raises(SharedPoolError):
+        bullshit_generator.add_patterns("warn", ["Something ${nPerson}."])
+    with pytest.raises(SharedPoolError):
+        bullshit_generator.remove_patterns("warn", patterns["warn"][:1])
+    with pytest.raises(SharedPoolError):
+        bullshit_generator.set_pattern_weights("warn", [1] * SIZES["warn"])
+    assert bullshit_generator.sentence_pool["warn"] == patterns["warn"]
+    assert bullshit_generator.stats()["errors"] == {"SharedPoolError": 3}
+    with pytest.raises(ValueError):
+        BullshitGenerator({"warn": patterns["warn"]}, vocabulary, pool=pool)
+
+
+def test_generators_keep_their_own_random_choices():
+    def first_run(build_second):
+        with SharedPatternPool(SIZES, rng=random.Random(0)) as pool:
+            first = BullshitGenerator(patterns, vocabulary, pool=pool, seed=1)
+            if build_second:
+                second = BullshitGenerator(patterns, vocabulary, pool=pool, seed=2)
+                second.set_topic_weights({"warn": 0})
+                assert second.rng is not first.rng and pool.rng is not first.rng
+            return first.ionize(5)
+
+    assert first_run(False) == first_run(True)
+
+
+def test_attach_and_state(pool):
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, pool=pool, seed=5)
+    bullshit_generator.ionize(20)
+    state = bullshit_generator.get_state()
+    attached = SharedPatternPool.attach(pool.name, SIZES, pool.lock)
+    assert attached.available_topics() == pool.available_topics()
+    assert attached.get_state() == pool.get_state()
+    expected = bullshit_generator.ionize(50)
+    bullshit_generator.set_state(state)
+    assert bullshit_generator.ionize(50) == expected
+    attached.close()
+    with pytest.raises(ValueError):
+        SharedPatternPool.attach(pool.name, {"warn": 1}, pool.lock)
+
+
+def test_processes_share_the_pool():
+    context = multiprocessing.get_context("spawn")
+    topic, workers = "hope", 3
+    per_worker = SIZES[topic] // workers
+    results = context.Queue()
+    with SharedPatternPool(SIZES, lock=context.RLock()) as pool:
+        processes = [
+            context.Process(
+                target=generate_sentences, args=(pool, topic, per_worker, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        counts = [len(results.get(timeout=60)) for _ in processes]
+        for process in processes:
+            process.join()
+        assert counts == [per_worker] * workers
+        remaining = pool.remaining(topic)
+    assert len(remaining) == SIZES[topic] - per_worker * workers
@@ -0,0 +1,112 @@
+import io
+import os
+import subprocess
+import sys
+
+import nabg
+from nabg.cli import parse_args, write_bullshit
+
+# Budgets in milliseconds, about ten times what lazy imports take on a developer machine, so
+# that they only catch gross regressions; test_import_does_not_load_heavy_modules() and the
+# check for click below catch the precise ones. Slow CI runners can scale them with
+# NABG_TIME_BUDGET_SCALE.
+TIME_BUDGET_SCALE = float(os.environ.get("NABG_TIME_BUDGET_SCALE", "1"))
+IMPORT_BUDGET = 100 * TIME_BUDGET_SCALE
+CLI_BUDGET = 400 * TIME_BUDGET_SCALE
+
+HEAVY_MODULES = [
+    "asyncio",
+    "click",
+    "concurrent.futures",
+    "multiprocessing",
+    "nabg.bullshit_generator",
+    "nabg.default_patterns",
+    "nabg.default_vocabulary",
+]
+
+
+def run_python(*args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(nabg.__file__)))
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_time(*args):
+    # Milliseconds spent in top-level imports according to -X importtime, best of 3 runs
+    best = None
+    for _ in range(3):
+        total = 0
+        for line in run_python("-X", "importtime", *args).stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and not fields[2].startswith("  "):
+                if fields[1].strip().isdigit():
+                    total += int(fields[1])
+        best = total if best is None else min(best, total)
+    return best / 1000
+
+
+def test_import_does_not_load_heavy_modules():
+    loaded = run_python(
+        "-c",
+        f"import sys, nabg; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+    )
+    assert loaded.stdout.strip() == "[]"
+
+
+def test_import_time_is_within_budget():
+    assert import_time("-c", "import nabg") < IMPORT_BUDGET
+
+
+def test_cli_startup_is_within_budget():
+    assert import_time("-m", "nabg", "-n", "1") < CLI_BUDGET
+    loaded = run_python(
+        "-c",
+        "import sys; from nabg.cli import run; run(['-n', '2', '--lines']); "
+        "print('click' in sys.modules)",
+    )
+    assert loaded.stdout.splitlines()[-1] == "False"
+    assert len(loaded.stdout.splitlines()) == 3
+
+
+def test_lazy_attributes():
+    assert nabg.patterns is nabg.bullshit_generator.patterns
+    assert nabg.generate_parallel.__module__ == "nabg.parallel"
+    assert {"BullshitGenerator", "ionize", "vocabulary"} <= set(dir(nabg))
+    try:
+        nabg.missing
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("nabg.missing should not exist")
+
+
+def test_topics_are_listed_to_the_output():
+    output = io.StringIO()
+    write_bullshit(output, list_topics=True)
+    assert output.getvalue().splitlines() == nabg.list_topics()
+
+
+def test_plain_requests_are_parsed_without_click():
+    assert parse_args([]) == {}
+    assert parse_args(["-n", "5", "--topic=history", "--lines"]) == {
+        "n": 5,
+        "topic": "history",
+        "lines": True,
+    }
+    assert parse_args(["-l", "-s", "3", "-j", "2"]) == {
+        "list_topics": True,
+        "seed": 3,
+        "jobs": 2,
+    }
+    for args in (
+        ["-n", "x"],
+        ["-n"],
+        ["-t", "-l"],
+        ["--help"],
+        ["serve"],
+        ["-o", "f"],
+        ["-j", "0"],
+    ):
+        assert parse_args(args) is None
@@ -0,0 +1,73 @@
+import pytest
+
+from nabg import BullshitGenerator, Corpus, patterns, vocabulary
+from nabg.errors import InvalidStateError
+
+
+def test_restored_generator_continues_the_run():
+    bullshit_generator = BullshitGenerator(patterns, vocabulary, seed=3)
+    bullshit_generator.ionize(37)
+    bullshit_generator.rng.gauss(0, 1)
+    state = bullshit_generator.get_state()
+    assert len(state) < 2600 + 12 * len(patterns)
+    restored = BullshitGenerator(patterns, vocabulary, seed=4)
+    restored.set_state(state)
+    assert restored.ionize(300) == bullshit_generator.ionize(300)
+    assert restored.rng.gauss(0, 1) == bullshit_generator.rng.gauss(0, 1)
+
+
+def test_state_of_changed_and_weighted_topics():
+    def make_generator(seed):
+        bullshit_generator = BullshitGenerator(
+            {"t": ["A.", "B.", "C.", "D."], "u": ["E."]},
+            {},
+            seed=seed,
+            pattern_weights={"u": [1]},
+        )
+        bullshit_generator.set_topic_weights({"t": 3})
+        return bullshit_generator
+
+    bullshit_generator = make_generator(1)
+    bullshit_generator.ionize(2, "t")
+    bullshit_generator.add_patterns("t", ["F.", "G."])
+    bullshit_generator.set_pattern_weights("t", [1, 2, 3, 4, 5, 6])
+    state = bullshit_generator.get_state()
+    restored = make_generator(2)
+    restored.add_patterns("t", ["F.", "G."])
+    restored.set_pattern_weights("t", [1, 2, 3, 4, 5, 6])
+    restored.set_state(state)
+    assert restored.sentence_patterns == bullshit_generator.sentence_patterns
+    assert restored.ionize(40) == bullshit_generator.ionize(40)
+
+
+def test_sessions_and_generators_share_states():
+    corpus = Corpus(patterns, vocabulary)
+    session = corpus.session(seed=5)
+    session.ionize(10)
+    restored = corpus.session()
+    restored.set_state(session.get_state())
+    bullshit_generator = BullshitGenerator(patterns, vocabulary)
+    bullshit_generator.set_state(session.get_state())
+    expected = session.ionize(50)
+    assert restored.ionize(50) == expected
+    assert bullshit_generator.ionize(50) == expected
+
+
+def test_invalid_states_are_rejected():
+    bullshit_generator = BullshitGenerator(patterns, vocabulary)
+    state = bullshit_generator.get_state()
+    other = BullshitGenerator({"t": ["A."]}, {})
+    before = other.get_state()
+    for invalid in (
+        b"",
+        b"garbage" * 500,
+        state[:-1],
+        state + b"\0",
+        b"NBST\1" + state[5:],
+        b"NBST\3" + state[5:],
+    ):
+        with pytest.raises(InvalidStateError):
+            bullshit_generator.set_state(invalid)
+    with pytest.raises(InvalidStateError):
+        other.set_state(state)
+    assert other.get_state() == before
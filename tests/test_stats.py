@@ -0,0 +1,86 @@
+import pytest
+
+from nabg import BullshitGenerator
+from nabg.errors import InvalidTopicError, InvalidVocabularyTypeError
+
+
+def make_generator():
+    return BullshitGenerator({"one": ["A.", "B."], "two": ["C."]}, {}, seed=1)
+
+
+def test_stats_count_sentences_resets_fallbacks_and_errors():
+    bullshit_generator = make_generator()
+    bullshit_generator.generate_text(3, "one")
+    bullshit_generator.generate_text(2, "two")
+    with pytest.raises(InvalidTopicError):
+        bullshit_generator.generate_text(1, "missing")
+    stats = bullshit_generator.stats()
+    assert stats["sentences_total"] == 5
+    assert stats["sentences"]["one"] + stats["sentences"]["two"] == 5
+    assert stats["topic_fallbacks"] >= 1, "Topic fallback wasn't counted"
+    assert stats["resets"] == {"exhausted": 1}
+    assert stats["errors"] == {"InvalidTopicError": 1}
+    assert stats["timings"] == {"draw": 0.0, "render": 0.0, "clean": 0.0}
+
+    bullshit_generator.reset_stats()
+    assert bullshit_generator.stats()["sentences_total"] == 0
+
+
+def test_stats_count_errors_while_changing_the_corpus():
+    bullshit_generator = make_generator()
+    with pytest.raises(InvalidVocabularyTypeError):
+        bullshit_generator.add_patterns("one", ["${missing}."])
+    with pytest.raises(InvalidVocabularyTypeError):
+        bullshit_generator.replace_vocab_patterns("${missing}.")
+    with pytest.raises(ValueError):
+        bullshit_generator.add_patterns("one", ["D."], weights=[1, 2])
+    assert bullshit_generator.stats()["errors"] == {
+        "InvalidVocabularyTypeError": 2,
+        "ValueError": 1,
+    }
+
+
+def test_every_rejected_call_is_counted_once():
+    bullshit_generator = make_generator()
+    rejected = [
+        lambda: bullshit_generator.set_topic_weights({"missing": 1}),
+        lambda: bullshit_generator.set_topic_weights({"one": -1}),
+        lambda: bullshit_generator.set_pattern_weights("missing", [1]),
+        lambda: bullshit_generator.set_pattern_weights("one", [1]),
+        lambda: bullshit_generator.remove_patterns("missing", ["A."]),
+        lambda: bullshit_generator.add_words("w", ["x"], weights=[1, 2]),
+    ]
+    for call in rejected:
+        with pytest.raises((InvalidTopicError, ValueError)):
+            call()
+    assert bullshit_generator.stats()["errors"] == {
+        "InvalidTopicError": 3,
+        "ValueError": 3,
+    }
+
+
+def test_hooks_and_timing():
+    bullshit_generator = make_generator()
+    events = []
+    on_sentence = lambda topic, sentence: events.append(("sentence", topic, sentence))
+    bullshit_generator.add_hook(BullshitGenerator.Hook.ON_SENTENCE, on_sentence)
+    bullshit_generator.add_hook(
+        BullshitGenerator.Hook.ON_TOPIC_FALLBACK,
+        lambda requested, topic: events.append(("fallback", requested, topic)),
+    )
+    bullshit_generator.add_hook(
+        BullshitGenerator.Hook.ON_RESET, lambda reason: events.append(("reset", reason))
+    )
+    bullshit_generator.enable_timing()
+    bullshit_generator.generate_text(2, "two")
+    assert events[0] == ("sentence", "two", "C.")
+    assert events[1][:2] == ("fallback", "two")
+    assert events[2][0] == "sentence"
+    bullshit_generator.reset_sentence_patterns()
+    assert events[-1] == ("reset", "manual")
+    assert bullshit_generator.stats()["timings"]["render"] > 0
+
+    bullshit_generator.remove_hook(BullshitGenerator.Hook.ON_SENTENCE, on_sentence)
+    count = len(events)
+    bullshit_generator.generate_text(1, "one")
+    assert len(events) == count, "Removed hook was called"
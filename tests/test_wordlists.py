@@ -0,0 +1,30 @@
+import sys
+
+from nabg import BullshitGenerator, patterns, vocabulary
+from nabg.wordlists import CompactWordList, compact_vocabulary
+
+
+def test_compact_word_list_behaves_like_a_list():
+    words = ["cosmos", "quantum soup", "", "été", "multiverse"]
+    compact = CompactWordList(iter(words))
+    assert len(compact) == len(words)
+    assert list(compact) == words
+    assert [compact[i] for i in range(-len(words), len(words))] == words * 2
+    assert compact[1:3] == words[1:3] and "été" in compact
+
+
+def test_compact_word_list_uses_less_memory_than_a_list():
+    words = [f"word{i}" for i in range(100000)]
+    list_bytes = sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)
+    compact = CompactWordList(words)
+    compact_bytes = sys.getsizeof(compact._buffer) + sys.getsizeof(compact._offsets)
+    assert compact.nbytes <= compact_bytes
+    assert (
+        compact_bytes * 4 < list_bytes
+    ), f"CompactWordList uses {compact_bytes} bytes, a list {list_bytes} bytes"
+
+
+def test_generator_accepts_compact_vocabulary():
+    first = BullshitGenerator(patterns, vocabulary, seed=9)
+    second = BullshitGenerator(patterns, compact_vocabulary(vocabulary), seed=9)
+    assert first.ionize(200) == second.ionize(200), "Compact vocabulary changed output"